@@ -0,0 +1,152 @@
+from collections import OrderedDict
+import time
+from typing import Any, Awaitable, Callable, Protocol
+
+from app.core import settings
+from app.schemas import UserWithBalaceResponseSchema
+
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> str | None:
+        ...
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        ...
+
+    async def delete(self, *keys: str) -> None:
+        ...
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU cache, an entry lives for ttl seconds at most.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    async def get(self, key: str) -> str | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        self.entries[key] = (value, time.monotonic() + ttl)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.entries.pop(key, None)
+
+
+class RedisCacheBackend:
+    """
+    Cache shared by all workers, needs the redis package.
+    """
+
+    def __init__(self, url: str) -> None:
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> str | None:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        await self.client.set(key, value, ex=ttl)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*keys)
+
+
+UserLoader = Callable[[], Awaitable[Any]]
+
+
+class UserCache:
+    """
+    Read-through cache of users with their balances, keyed by user id,
+    so changes known by user id invalidate the entry directly.
+
+    Invalidation bumps the version of the user id, a user loaded
+    while its version changed is returned but not cached, so a load
+    racing with an update does not put the old state back.
+    The in-process backend is coherent within one worker, with several
+    workers the shared backend is used or ttl bounds staleness.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.versions: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _user_key(self, user_id: str) -> str:
+        return f"user:{user_id}"
+
+    async def get_or_load(
+        self, user_id: str, load: UserLoader
+    ) -> UserWithBalaceResponseSchema | None:
+        """
+        Return the cached user, or load it with load() and cache it.
+        Missing users are not cached.
+        """
+
+        cached = await self.backend.get(self._user_key(user_id))
+        if cached is not None:
+            self.hits += 1
+            return UserWithBalaceResponseSchema.parse_raw(cached)
+        self.misses += 1
+        version = self.versions.get(user_id)
+        user = await load()
+        if user is None:
+            return None
+        user = UserWithBalaceResponseSchema.from_orm(user)
+        if self.versions.get(user_id) == version:
+            await self.backend.set(
+                self._user_key(user_id), user.json(), self.ttl
+            )
+        return user
+
+    async def invalidate(self, *user_ids: str) -> None:
+        if len(self.versions) > settings.USER_CACHE_SIZE:
+            self.versions = {}
+        for user_id in user_ids:
+            self.versions[user_id] = self.versions.get(user_id, 0) + 1
+        self.invalidations += len(user_ids)
+        await self.backend.delete(*map(self._user_key, user_ids))
+
+    def get_metrics(self) -> dict[str, int | float]:
+        requests = self.hits + self.misses
+        metrics = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "invalidations": self.invalidations,
+        }
+        if isinstance(self.backend, MemoryCacheBackend):
+            metrics["size"] = len(self.backend)
+        return metrics
+
+
+def get_cache_backend() -> CacheBackend:
+    if settings.USER_CACHE_URL:
+        return RedisCacheBackend(settings.USER_CACHE_URL)
+    return MemoryCacheBackend(settings.USER_CACHE_SIZE)
+
+
+user_cache = UserCache(get_cache_backend(), settings.USER_CACHE_TTL)
@@ -1,9 +1,11 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import UserCache, user_cache
+from app.core.exceptions import PermissionDeniedException
 from app.db import async_session
-from app.models import User
 from app.repositories import UserRepository, BalanceRepository
+from app.schemas import UserWithBalaceResponseSchema
 from app.services import AuthService, EmailService, PaymentService
 from app.core.utils import oauth2_scheme
 
@@ -46,6 +48,18 @@ async def get_payment_service(
 async def get_request_user(
     token: str = Depends(oauth2_scheme),
     auth_service: AuthService = Depends(get_auth_service),
-) -> User:
-    user = await auth_service.get_current_active_user(token)
+) -> UserWithBalaceResponseSchema:
+    user = await auth_service.get_cached_active_user(token)
     return user
+
+
+async def get_request_superuser(
+    user: UserWithBalaceResponseSchema = Depends(get_request_user),
+) -> UserWithBalaceResponseSchema:
+    if not user.is_superuser:
+        raise PermissionDeniedException()
+    return user
+
+
+async def get_user_cache() -> UserCache:
+    return user_cache
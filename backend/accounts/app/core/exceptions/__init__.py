@@ -2,6 +2,7 @@ from app.core.exceptions.auth import (  # noqa: F401
     InvalidCredentialsException,
     InvalidTokenException,
     EmailDoesNotExistException,
+    PasswordHashingBusyException,
 )
 from app.core.exceptions.user import (  # noqa: F401
     UserAlreadyExistsException,
@@ -9,4 +10,5 @@ from app.core.exceptions.user import (  # noqa: F401
     UserInactiveException,
     UserNotFoundException,
     InvalidUserResetPasswordException,
+    PermissionDeniedException,
 )
@@ -17,6 +17,15 @@ class InvalidTokenException(HTTPException):
         )
 
 
+class PasswordHashingBusyException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many password checks, try again later",
+            headers={"Retry-After": "1"},
+        )
+
+
 class EmailDoesNotExistException(HTTPException):
     def __init__(self):
         super().__init__(
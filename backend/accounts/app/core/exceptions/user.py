@@ -39,3 +39,11 @@ class InvalidUserResetPasswordException(HTTPException):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid user reset password",
         )
+
+
+class PermissionDeniedException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Permission denied",
+        )
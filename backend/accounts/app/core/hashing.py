@@ -0,0 +1,53 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from passlib.context import CryptContext
+
+from app.core import settings
+from app.core.exceptions import PasswordHashingBusyException
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a bounded thread pool, so hashing does not block
+    the event loop. bcrypt releases the GIL, so workers hash in parallel.
+    At most workers hashes run at once and queue_size more wait,
+    further calls are rejected instead of piling up.
+    """
+
+    def __init__(self, workers: int, queue_size: int) -> None:
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="bcrypt"
+        )
+        self.limit = workers + queue_size
+        self.pending = 0
+        self.rejected = 0
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.limit:
+            self.rejected += 1
+            raise PasswordHashingBusyException()
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(
+            pwd_context.verify, plain_password, hashed_password
+        )
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_SIZE
+)
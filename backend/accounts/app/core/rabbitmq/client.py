@@ -1,4 +1,6 @@
+import asyncio
 import json
+from typing import Any
 import aio_pika
 
 from app.core import settings
@@ -9,14 +11,22 @@ class PikaClient:
     def __init__(self) -> None:
         self.exchange_name = settings.RABBITMQ_EXCHANGE_NAME
         self.accounts_queue_name = settings.RABBITMQ_ACCOUNTS_QUEUE_NAME
+        self.dead_letter_queue_name = (
+            settings.RABBITMQ_ACCOUNTS_DEAD_LETTER_QUEUE_NAME
+        )
         self.websocket_queue_name = settings.RABBITMQ_WEBSOCKET_QUEUE_NAME
+        self.auth_events_routing_key = (
+            settings.RABBITMQ_AUTH_EVENTS_ROUTING_KEY
+        )
 
     async def connect(self) -> None:
         self.connection = await aio_pika.connect_robust(
             settings.RABBITMQ_URL,
         )
         self.channel = await self.connection.channel()
-        # await self.channel.set_qos(prefetch_count=1)
+        await self.channel.set_qos(
+            prefetch_count=settings.RABBITMQ_PREFETCH_COUNT
+        )
 
         self.exchange = await self.channel.declare_exchange(
             self.exchange_name,
@@ -27,6 +37,9 @@ class PikaClient:
         self.accounts_queue = await self.channel.declare_queue(
             self.accounts_queue_name, durable=True
         )
+        await self.channel.declare_queue(
+            self.dead_letter_queue_name, durable=True
+        )
 
     def create_message(self, message: str | dict | list) -> aio_pika.Message:
         body = (
@@ -50,22 +63,129 @@ class PikaClient:
         order = OrderSchema.parse_raw(message.body)
         print(order)
 
+    async def send_reply(
+        self, message: aio_pika.IncomingMessage, reply: dict
+    ) -> None:
+        """
+        Reply to a command on the reply queue of its sender.
+        """
+
+        await self.channel.default_exchange.publish(
+            aio_pika.Message(
+                body=json.dumps(reply).encode(),
+                correlation_id=message.correlation_id,
+            ),
+            routing_key=message.reply_to,
+        )
+
     async def send_message_to_websocket_queue(
         self, message: str, user_id: str
     ) -> None:
         await self.send_message(message, routing_key=user_id)
 
+    async def send_token_revocation(
+        self, user_id: Any, revoked_at: int
+    ) -> None:
+        """
+        Tell other services to drop verified tokens of a user
+        issued before revoked_at, in whole seconds like the iat claim.
+        """
+
+        await self.send_message(
+            {
+                "type": "revoke",
+                "user_id": str(user_id),
+                "revoked_at": revoked_at,
+            },
+            routing_key=self.auth_events_routing_key,
+        )
+
+    async def dead_letter(
+        self, message: aio_pika.IncomingMessage, error: str
+    ) -> None:
+        """
+        Move a message that cannot be applied to the dead letter queue,
+        where it is kept for inspection instead of being redelivered.
+        """
+
+        await self.channel.default_exchange.publish(
+            aio_pika.Message(
+                body=message.body,
+                type=message.type,
+                correlation_id=message.correlation_id,
+                headers={"x-error": error},
+                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+            ),
+            routing_key=self.dead_letter_queue_name,
+        )
+        await message.ack()
+
+    async def reject(
+        self, message: aio_pika.IncomingMessage, error: str
+    ) -> None:
+        """
+        Requeue a message that failed for the first time, the failure may
+        be transient. A message that fails again is dead lettered.
+        """
+
+        print(f"Failed to process message {message.delivery_tag}: {error}")
+        if message.redelivered:
+            await self.dead_letter(message, error)
+        else:
+            await message.nack(requeue=True)
+
+    async def _get_batch(
+        self, messages: asyncio.Queue
+    ) -> list[aio_pika.IncomingMessage]:
+        """
+        Wait for a message, then gather the messages that arrive until
+        the batch is full or the batch timeout runs out.
+        """
+
+        loop = asyncio.get_running_loop()
+        batch = [await messages.get()]
+        deadline = loop.time() + settings.ACCOUNTS_BATCH_TIMEOUT_MS / 1000
+        while len(batch) < settings.ACCOUNTS_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(messages.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
     async def consume_accounts_queue(
         self, callback: callable, **kwargs
     ) -> None:
+        """
+        Pass messages of accounts queue to the callback in batches.
+        Delivered messages are buffered in a local queue, so waiting
+        for a batch never cancels the broker consumer.
+        The callback settles each message once it is applied, messages
+        left unsettled are acked after it succeeds and rejected one by one
+        if it fails, so one bad message does not hold back the batch.
+        """
+
         await self.accounts_queue.bind(
             self.exchange, routing_key=self.accounts_queue_name
         )
+        messages: asyncio.Queue = asyncio.Queue()
+        await self.accounts_queue.consume(messages.put)
 
-        async with self.accounts_queue.iterator() as queue_iter:
-            async for message in queue_iter:
-                async with message.process():
-                    await callback(message, **kwargs)
+        while True:
+            batch = await self._get_batch(messages)
+            try:
+                await callback(batch, **kwargs)
+            except Exception as e:
+                print(f"Failed to process {len(batch)} messages: {e}")
+                for message in batch:
+                    if not message.processed:
+                        await self.reject(message, str(e))
+            else:
+                for message in batch:
+                    if not message.processed:
+                        await message.ack()
 
 
 pika_client = PikaClient()
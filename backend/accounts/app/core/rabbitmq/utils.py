@@ -1,23 +1,195 @@
+from datetime import timezone
+import time
 from aio_pika import IncomingMessage
+from pydantic import parse_raw_as
 
 from app.core.rabbitmq import pika_client
+from app.db.session import async_session
+from app.models import Balance, BalanceEntry
 from app.repositories import BalanceRepository
 from app.schemas import BalanceUpdateSchema, BalanceResponseSchema
 
 
-async def consume_income_message(message: IncomingMessage, **kwargs) -> None:
-    balance_repository: BalanceRepository = kwargs["balance_repository"]
-    order = BalanceUpdateSchema.parse_raw(message.body)
-    balance = await balance_repository.get_user_balance_by_currency(
-        order.user_id, order.currency
+async def send_balance_updates(balances: list[Balance]) -> None:
+    """
+    Send changed balances to websocket queue,
+    one message per user with all of the user's changed currencies.
+    """
+
+    updates: dict[str, dict[str, dict]] = {}
+    for balance in balances:
+        # The latest state of a currency wins
+        updates.setdefault(balance.user_id, {})[
+            balance.currency
+        ] = BalanceResponseSchema.from_orm(balance).dict()
+    for user_id, data in updates.items():
+        await pika_client.send_message_to_websocket_queue(
+            {
+                "type": "update",
+                "target": "balances",
+                "data": list(data.values()),
+            },
+            user_id,
+        )
+
+
+def is_expired(message: IncomingMessage) -> bool:
+    """
+    Check if the sender stopped waiting for a command.
+    The broker drops expired messages only at the head of the queue,
+    so commands already delivered are checked here.
+    """
+
+    if message.expiration is None or message.timestamp is None:
+        return False
+    sent_at = message.timestamp.replace(tzinfo=timezone.utc).timestamp()
+    return sent_at + message.expiration < time.time()
+
+
+async def reserve_balance(
+    message: IncomingMessage, balance_repository: BalanceRepository
+) -> Balance | None:
+    """
+    Reserve balance for a new order and reply to tickers with the result.
+    The reply echoes the reservation, so a late reply can be released.
+    Return the updated balance, or None if the reservation was rejected.
+    """
+
+    reservation = BalanceUpdateSchema.parse_raw(message.body)
+    reply = {
+        "reservation_id": message.correlation_id,
+        "user_id": reservation.user_id,
+        "currency": reservation.currency,
+        "amount": str(reservation.amount),
+        "status": "ok",
+    }
+    # A redelivered command is not applied twice
+    balance = await balance_repository.add_to_balance(
+        reservation.user_id,
+        reservation.currency,
+        -reservation.amount,
+        "reserve",
+        message.correlation_id,
     )
-    balance.amount += order.amount
-    new_balance = await balance_repository.update_balance(balance)
-    await pika_client.send_message_to_websocket_queue(
-        {
-            "type": "update",
-            "target": "balance",
-            "data": BalanceResponseSchema.from_orm(new_balance).dict(),
-        },
-        order.user_id,
+    if balance is None:
+        reply["status"] = "error"
+        reply["detail"] = "Not enough balance"
+    await pika_client.send_reply(message, reply)
+    return balance
+
+
+def _parse_balance_updates(body: bytes) -> list[BalanceUpdateSchema]:
+    orders = parse_raw_as(
+        list[BalanceUpdateSchema] | BalanceUpdateSchema, body
     )
+    if not isinstance(orders, list):
+        orders = [orders]
+    return orders
+
+
+def _create_entries(
+    orders: list[BalanceUpdateSchema],
+) -> list[BalanceEntry]:
+    return [
+        BalanceEntry(
+            user_id=order.user_id,
+            currency=order.currency,
+            delta=order.amount,
+            reason=order.reason,
+            ref_id=order.ref_id,
+        )
+        for order in orders
+    ]
+
+
+async def apply_balance_updates(
+    updates: list[tuple[IncomingMessage, list[BalanceUpdateSchema]]],
+    balance_repository: BalanceRepository,
+) -> list[Balance]:
+    """
+    Apply balance updates of a batch in one transaction and ack them.
+    If the transaction fails, the updates are applied message by message,
+    so only the messages that fail on their own are rejected.
+    Return the updated balances.
+    """
+
+    try:
+        balances = await balance_repository.apply_entries(
+            _create_entries(
+                [order for _, orders in updates for order in orders]
+            )
+        )
+    except Exception as e:
+        print(f"Failed to apply {len(updates)} balance updates: {e}")
+        await balance_repository.session.rollback()
+    else:
+        for message, _ in updates:
+            await message.ack()
+        return balances
+
+    balances = []
+    for message, orders in updates:
+        try:
+            balances += await balance_repository.apply_entries(
+                _create_entries(orders)
+            )
+        except Exception as e:
+            await balance_repository.session.rollback()
+            await pika_client.reject(message, str(e))
+        else:
+            await message.ack()
+    return balances
+
+
+async def consume_income_messages(
+    messages: list[IncomingMessage], balance_repository: BalanceRepository
+) -> None:
+    """
+    Apply a batch of accounts queue messages, acking each message
+    once it is applied.
+    Balance updates of the whole batch are summed per user and currency
+    and applied in one transaction, already applied changes are
+    skipped. Messages that cannot be parsed are dead lettered.
+    Reserve commands are applied after them one by one,
+    as each of them needs its own reply, expired ones are dropped.
+    Users are notified once per batch about all their changed balances.
+    """
+
+    updates = []
+    reservations = []
+    for message in messages:
+        if message.type == "reserve":
+            if is_expired(message):
+                print(f"Dropped expired command {message.correlation_id}")
+                await message.ack()
+            else:
+                reservations.append(message)
+            continue
+        try:
+            orders = _parse_balance_updates(message.body)
+        except ValueError as e:
+            await pika_client.dead_letter(message, str(e))
+            continue
+        updates.append((message, orders))
+
+    balances = await apply_balance_updates(updates, balance_repository)
+    for message in reservations:
+        try:
+            balance = await reserve_balance(message, balance_repository)
+        except Exception as e:
+            await balance_repository.session.rollback()
+            await pika_client.reject(message, str(e))
+            continue
+        await message.ack()
+        if balance is not None:
+            balances.append(balance)
+    await send_balance_updates(balances)
+
+
+async def consume_income_batch(messages: list[IncomingMessage]) -> None:
+    """
+    Apply a batch of accounts queue messages in a session of its own.
+    """
+
+    async with async_session() as session:
+        await consume_income_messages(messages, BalanceRepository(session))
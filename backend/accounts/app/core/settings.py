@@ -14,11 +14,20 @@ class Settings(BaseSettings):
     DB_USER: str
     DB_PASSWORD: str
     DB_URL: Optional[str]
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 30 * 60
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 500
     # JWT
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     JWT_REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
+    # PASSWORD HASHING
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
     # GOOGLE
     GOOGLE_CLIENT_ID: str
     GOOGLE_CLIENT_SECRET: str
@@ -40,11 +49,22 @@ class Settings(BaseSettings):
     STRIPE_WEBHOOK_SECRET: str
     # BALANCE
     BALANCE_TYPES: list[str]
+    BALANCE_SNAPSHOT_INTERVAL: int = 60 * 60
+    # USER CACHE
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: int = 60
+    # Shared cache, e.g. redis://redis:6379/0, in-process cache if not set
+    USER_CACHE_URL: Optional[str] = None
     # RABBITMQ
     RABBITMQ_URL: str
     RABBITMQ_EXCHANGE_NAME: str
     RABBITMQ_ACCOUNTS_QUEUE_NAME: str
+    RABBITMQ_ACCOUNTS_DEAD_LETTER_QUEUE_NAME: str = "accounts_dead_letter"
     RABBITMQ_WEBSOCKET_QUEUE_NAME: str
+    RABBITMQ_AUTH_EVENTS_ROUTING_KEY: str = "auth_events"
+    RABBITMQ_PREFETCH_COUNT: int = 500
+    ACCOUNTS_BATCH_SIZE: int = 200
+    ACCOUNTS_BATCH_TIMEOUT_MS: int = 50
 
     @validator("DB_URL", pre=True)
     def assemble_db_connection(
@@ -1,9 +1,12 @@
+import asyncio
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.templating import Jinja2Templates
 from starlette.config import Config
 from authlib.integrations.starlette_client import OAuth
 
 from app.core import settings
+from app.db.session import async_session
+from app.repositories import BalanceRepository
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 starlette_config = Config(
@@ -14,3 +17,19 @@ starlette_config = Config(
 )
 oauth = OAuth(starlette_config)
 templates = Jinja2Templates(directory="app/templates")
+
+
+async def snapshot_balances() -> None:
+    """
+    Materialize balances every BALANCE_SNAPSHOT_INTERVAL seconds,
+    so a balance is rebuilt from the ledger entries after the latest one.
+    """
+
+    while True:
+        await asyncio.sleep(settings.BALANCE_SNAPSHOT_INTERVAL)
+        try:
+            async with async_session() as session:
+                count = await BalanceRepository(session).create_snapshot()
+            print(f"Snapshotted {count} balances")
+        except Exception as e:
+            print(f"Balance snapshot failed: {e}")
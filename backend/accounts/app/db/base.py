@@ -1,8 +1,38 @@
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import declarative_base
 
 from app.core import settings
 
 
-engine = create_async_engine(settings.DB_URL, echo=False)
+def get_engine_options(db_url: str) -> dict:
+    """
+    Return the URL and pool options of the engine.
+    Pool options apply to Postgres, the sqlite test database
+    keeps the defaults. asyncpg caches prepared statements
+    per connection, the cache size is set in the URL.
+    """
+
+    url = make_url(db_url)
+    if url.get_backend_name() != "postgresql":
+        return {"url": url}
+    if url.get_driver_name() == "asyncpg":
+        url = url.update_query_dict(
+            {
+                "prepared_statement_cache_size": str(
+                    settings.DB_STATEMENT_CACHE_SIZE
+                )
+            }
+        )
+    return {
+        "url": url,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+engine = create_async_engine(**get_engine_options(settings.DB_URL), echo=False)
 Base = declarative_base()
@@ -5,13 +5,17 @@ from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
 from app.core import settings
-from app.core.dependencies import get_session
-from app.core.utils import oauth
+from app.core.hashing import password_hasher
+from app.core.utils import oauth, snapshot_balances
 from app.db import init_models  # noqa: F401
-from app.repositories import BalanceRepository
-from app.routers import auth_router, user_router, payment_router
+from app.routers import (
+    auth_router,
+    user_router,
+    payment_router,
+    metrics_router,
+)
 from app.core.rabbitmq import pika_client
-from app.core.rabbitmq.utils import consume_income_message
+from app.core.rabbitmq.utils import consume_income_batch
 
 app = FastAPI(title=settings.APP_TITLE)
 
@@ -38,23 +42,20 @@ app.add_middleware(
 app.include_router(auth_router)
 app.include_router(user_router)
 app.include_router(payment_router)
+app.include_router(metrics_router)
 
 
 @app.on_event("startup")
 async def startup_event():
     await init_models()
-    async for session in get_session():
-        balance_repository = BalanceRepository(session)
-        break
     print("Starting up...")
     print("Connecting to RabbitMQ...")
     await pika_client.connect()
     print("Connected to RabbitMQ")
     asyncio.create_task(
-        pika_client.consume_accounts_queue(
-            consume_income_message, balance_repository=balance_repository
-        )
+        pika_client.consume_accounts_queue(consume_income_batch)
     )
+    asyncio.create_task(snapshot_balances())
 
 
 @app.on_event("shutdown")
@@ -63,3 +64,4 @@ async def shutdown_event():
     print("Closing RabbitMQ connection...")
     await pika_client.connection.close()
     print("Closed RabbitMQ connection")
+    password_hasher.shutdown()
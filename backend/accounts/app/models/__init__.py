@@ -1,2 +1,6 @@
 from app.models.user import User  # noqa: F401
 from app.models.balance import Balance  # noqa: F401
+from app.models.balance_entry import (  # noqa: F401
+    BalanceEntry,
+    BalanceSnapshot,
+)
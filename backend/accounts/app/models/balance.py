@@ -16,7 +16,8 @@ class Balance(UUIDMixin, Base):
     user = relationship(
         "User",
         back_populates="balances",
-        lazy="selectin",
+        # Loaded explicitly by queries that need it
+        lazy="raise",
     )
 
     def __str__(self):
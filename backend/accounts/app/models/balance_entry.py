@@ -0,0 +1,72 @@
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    UniqueConstraint,
+    func,
+)
+
+from app.db import Base
+
+
+class BalanceEntry(Base):
+    """
+    Append-only ledger of balance changes.
+    Entries are numbered in insertion order, so history is paged by id.
+    """
+
+    __tablename__ = "balance_entries"
+    __table_args__ = (
+        # A referenced change is applied once, replays are no-ops
+        UniqueConstraint(
+            "reason",
+            "ref_id",
+            "user_id",
+            "currency",
+            name="uq_balance_entries_reason_ref_user_currency",
+        ),
+        Index("ix_balance_entries_user_id_id", "user_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String(100), ForeignKey("users.id"), nullable=False)
+    currency = Column(String(100), nullable=False)
+    delta = Column(Numeric(precision=10, scale=2), nullable=False)
+    reason = Column(String(50), nullable=False)
+    ref_id = Column(String(100), nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    def __str__(self):
+        return f"BalanceEntry(id={self.id}, user_id={self.user_id}, currency={self.currency}, delta={self.delta}, reason={self.reason}, ref_id={self.ref_id})"  # noqa: E501
+
+
+class BalanceSnapshot(Base):
+    """
+    Balances materialized periodically together with the last ledger
+    entry they include. A balance is rebuilt from its latest snapshot
+    and the entries after it.
+    """
+
+    __tablename__ = "balance_snapshots"
+    __table_args__ = (
+        Index(
+            "ix_balance_snapshots_user_currency_entry",
+            "user_id",
+            "currency",
+            "last_entry_id",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String(100), ForeignKey("users.id"), nullable=False)
+    currency = Column(String(100), nullable=False)
+    amount = Column(Numeric(precision=10, scale=2), nullable=False)
+    last_entry_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    def __str__(self):
+        return f"BalanceSnapshot(id={self.id}, user_id={self.user_id}, currency={self.currency}, amount={self.amount}, last_entry_id={self.last_entry_id})"  # noqa: E501
@@ -21,7 +21,8 @@ class User(UUIDMixin, Base):
     balances = relationship(
         "Balance",
         back_populates="user",
-        lazy="selectin",
+        # Loaded explicitly by queries that need it
+        lazy="raise",
     )
 
     # Constraints
@@ -1,20 +1,42 @@
-from sqlalchemy import select
+from decimal import Decimal
+from typing import Callable
+from sqlalchemy import (
+    Insert,
+    Update,
+    and_,
+    case,
+    delete,
+    func,
+    insert,
+    or_,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import settings
+from app.core.cache import user_cache
 
-from app.models import User, Balance
+from app.models import User, Balance, BalanceEntry, BalanceSnapshot
 
 
 class BalanceRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    async def _invalidate_users(self, balances: list[Balance]) -> None:
+        await user_cache.invalidate(*{balance.user_id for balance in balances})
+
     async def init_user_balance(self, user: User) -> list[Balance]:
         user_balance = []
         for currency in settings.BALANCE_TYPES:
             balance = Balance(currency=currency, user=user)
             self.session.add(balance)
         await self.session.commit()
+        await user_cache.invalidate(user.id)
         user_balance = await self.get_user_balances(user.id)
         return user_balance
 
@@ -22,6 +44,7 @@ class BalanceRepository:
         self.session.add(balance)
         await self.session.commit()
         await self.session.refresh(balance)
+        await self._invalidate_users([balance])
         return balance
 
     async def get_balance_by_id(self, balance_id: str) -> Balance:
@@ -47,5 +70,258 @@ class BalanceRepository:
 
     async def update_balance(self, balance: Balance) -> Balance:
         await self.session.commit()
+        await self._invalidate_users([balance])
         await self.session.refresh(balance)
         return balance
+
+    async def _execute_update(
+        self, statement: Update, commit: bool = True
+    ) -> list[Balance]:
+        # Balances already loaded in the session are not refreshed
+        # from RETURNING, the returned amount is set on them explicitly
+        result = await self.session.execute(statement)
+        balances = []
+        for balance, amount in result.all():
+            set_committed_value(balance, "amount", amount)
+            balances.append(balance)
+        if commit:
+            await self.session.commit()
+            await self._invalidate_users(balances)
+        return balances
+
+    def _get_insert(self) -> Callable[..., Insert]:
+        if self.session.bind.dialect.name == "postgresql":
+            return postgresql_insert
+        return sqlite_insert
+
+    async def _record_entries(self, entries: list[BalanceEntry]) -> list:
+        """
+        Insert entries into the ledger, skipping referenced changes
+        recorded before. Return (id, user id, currency, delta)
+        of inserted entries.
+        """
+
+        statement = (
+            self._get_insert()(BalanceEntry)
+            .values(
+                [
+                    {
+                        "user_id": entry.user_id,
+                        "currency": entry.currency,
+                        "delta": entry.delta,
+                        "reason": entry.reason,
+                        "ref_id": entry.ref_id,
+                    }
+                    for entry in entries
+                ]
+            )
+            .on_conflict_do_nothing(
+                index_elements=["reason", "ref_id", "user_id", "currency"]
+            )
+            .returning(
+                BalanceEntry.id,
+                BalanceEntry.user_id,
+                BalanceEntry.currency,
+                BalanceEntry.delta,
+            )
+        )
+        result = await self.session.execute(statement)
+        return result.all()
+
+    async def _delete_entries(self, entry_ids: list[int]) -> None:
+        # Changes that were not applied are not kept in the ledger
+        if entry_ids:
+            await self.session.execute(
+                delete(BalanceEntry).where(BalanceEntry.id.in_(entry_ids))
+            )
+
+    async def add_to_balance(
+        self,
+        user_id: str,
+        currency: str,
+        delta: Decimal,
+        reason: str,
+        ref_id: str | None = None,
+    ) -> Balance | None:
+        """
+        Add delta to a balance with a single conditional UPDATE
+        and record it in the ledger in the same transaction.
+        Return the updated balance, or None if there is no such balance
+        or it would become negative.
+        A change with ref_id is applied once, if it was recorded before
+        the current balance is returned instead.
+        """
+
+        recorded = await self._record_entries(
+            [
+                BalanceEntry(
+                    user_id=user_id,
+                    currency=currency,
+                    delta=delta,
+                    reason=reason,
+                    ref_id=ref_id,
+                )
+            ]
+        )
+        if not recorded:
+            return await self.get_user_balance_by_currency(user_id, currency)
+
+        statement = (
+            update(Balance)
+            .where(Balance.user_id == user_id)
+            .where(Balance.currency == currency)
+            .where(Balance.amount + delta >= 0)
+            .values(amount=Balance.amount + delta)
+            .returning(Balance, Balance.amount)
+            .execution_options(synchronize_session=False)
+        )
+        balances = await self._execute_update(statement, commit=False)
+        if not balances:
+            await self._delete_entries([recorded[0].id])
+        await self.session.commit()
+        await self._invalidate_users(balances)
+        return balances[0] if balances else None
+
+    async def add_to_balances(
+        self, deltas: dict[tuple[str, str], Decimal], commit: bool = True
+    ) -> list[Balance]:
+        """
+        Add deltas keyed by (user id, currency) to balances
+        with a single conditional UPDATE.
+        Return the updated balances, balances that would become negative
+        are left unchanged and are not returned.
+        """
+
+        if not deltas:
+            return []
+        conditions = {
+            key: and_(Balance.user_id == key[0], Balance.currency == key[1])
+            for key in deltas
+        }
+        delta = case(
+            *[(conditions[key], value) for key, value in deltas.items()],
+            else_=0,
+        )
+        statement = (
+            update(Balance)
+            .where(or_(*conditions.values()))
+            .where(Balance.amount + delta >= 0)
+            .values(amount=Balance.amount + delta)
+            .returning(Balance, Balance.amount)
+            .execution_options(synchronize_session=False)
+        )
+        return await self._execute_update(statement, commit)
+
+    async def apply_entries(
+        self, entries: list[BalanceEntry]
+    ) -> list[Balance]:
+        """
+        Record entries in the ledger and add their deltas to balances
+        in one transaction. Referenced changes recorded before are skipped,
+        so a redelivered message does not change balances twice.
+        Entries of balances that would become negative are not applied
+        and are not recorded.
+        Return the updated balances.
+        """
+
+        if not entries:
+            return []
+        recorded = await self._record_entries(entries)
+        deltas: dict[tuple[str, str], Decimal] = {}
+        for entry in recorded:
+            key = (entry.user_id, entry.currency)
+            deltas[key] = deltas.get(key, Decimal(0)) + entry.delta
+        balances = await self.add_to_balances(deltas, commit=False)
+        applied = {(balance.user_id, balance.currency) for balance in balances}
+        await self._delete_entries(
+            [
+                entry.id
+                for entry in recorded
+                if (entry.user_id, entry.currency) not in applied
+            ]
+        )
+        await self.session.commit()
+        await self._invalidate_users(balances)
+        return balances
+
+    async def get_balance_entries(
+        self,
+        user_id: str,
+        currency: str | None = None,
+        before_id: int | None = None,
+        limit: int = 50,
+    ) -> list[BalanceEntry]:
+        """
+        Return the newest ledger entries of a user older than before_id.
+        The (user id, id) index serves the query, so a page is read
+        without scanning the pages before it.
+        """
+
+        statement = (
+            select(BalanceEntry)
+            .where(BalanceEntry.user_id == user_id)
+            .order_by(BalanceEntry.id.desc())
+            .limit(limit)
+        )
+        if currency is not None:
+            statement = statement.where(BalanceEntry.currency == currency)
+        if before_id is not None:
+            statement = statement.where(BalanceEntry.id < before_id)
+        result = await self.session.execute(statement)
+        return result.scalars().all()
+
+    async def create_snapshot(self) -> int:
+        """
+        Materialize all balances together with the last ledger entry
+        in one statement, replacing the previous snapshot.
+        Entry ids are taken before commit, so on PostgreSQL the ledger is
+        locked against writes until the snapshot commits, otherwise an
+        entry committed later with a smaller id would be missed.
+        Return the number of snapshotted balances.
+        """
+
+        if self.session.bind.dialect.name == "postgresql":
+            await self.session.execute(
+                text("LOCK TABLE balance_entries IN SHARE MODE")
+            )
+        # Balances are rebuilt from the latest snapshot only
+        await self.session.execute(delete(BalanceSnapshot))
+        last_entry_id = select(
+            func.coalesce(func.max(BalanceEntry.id), 0)
+        ).scalar_subquery()
+        statement = insert(BalanceSnapshot).from_select(
+            ["user_id", "currency", "amount", "last_entry_id"],
+            select(
+                Balance.user_id,
+                Balance.currency,
+                Balance.amount,
+                last_entry_id,
+            ),
+        )
+        result = await self.session.execute(statement)
+        await self.session.commit()
+        return result.rowcount
+
+    async def get_ledger_amount(self, user_id: str, currency: str) -> Decimal:
+        """
+        Rebuild a balance from its latest snapshot
+        and the ledger entries recorded after it.
+        """
+
+        statement = (
+            select(BalanceSnapshot.amount, BalanceSnapshot.last_entry_id)
+            .where(BalanceSnapshot.user_id == user_id)
+            .where(BalanceSnapshot.currency == currency)
+            .order_by(BalanceSnapshot.last_entry_id.desc())
+            .limit(1)
+        )
+        snapshot = (await self.session.execute(statement)).first()
+        amount, last_entry_id = snapshot or (Decimal(0), 0)
+        statement = (
+            select(func.coalesce(func.sum(BalanceEntry.delta), 0))
+            .where(BalanceEntry.user_id == user_id)
+            .where(BalanceEntry.currency == currency)
+            .where(BalanceEntry.id > last_entry_id)
+        )
+        result = await self.session.execute(statement)
+        return Decimal(str(amount)) + Decimal(str(result.scalar()))
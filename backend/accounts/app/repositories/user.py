@@ -1,7 +1,8 @@
 from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import contains_eager, selectinload
+from sqlalchemy.orm import contains_eager, joinedload
 
+from app.core.cache import user_cache
 from app.models import User, Balance
 
 
@@ -15,10 +16,14 @@ class UserRepository:
         await self.session.refresh(user)
         return user
 
-    async def get_user_by_id(self, user_id: str) -> User | None:
+    async def get_user_by_id(
+        self, user_id: str, balance: bool = False
+    ) -> User | None:
         statement = select(User).where(User.id == user_id)
+        if balance:
+            statement = statement.options(joinedload(User.balances))
         result = await self.session.execute(statement)
-        user = result.scalar()
+        user = result.unique().scalars().first()
         if user:
             return user
         return None
@@ -39,9 +44,10 @@ class UserRepository:
                 )
             )
         elif balance:
-            statement = statement.options(selectinload(User.balances))
+            # One query, a user has a handful of balances
+            statement = statement.options(joinedload(User.balances))
         result = await self.session.execute(statement)
-        user = result.scalars().first()
+        user = result.unique().scalars().first()
         if user:
             return user
         return None
@@ -53,5 +59,6 @@ class UserRepository:
 
     async def update_user(self, user: User) -> User:
         await self.session.commit()
+        await user_cache.invalidate(user.id)
         await self.session.refresh(user)
         return user
@@ -1,3 +1,4 @@
 from app.routers.auth import router as auth_router  # noqa: F401
 from app.routers.user import router as user_router  # noqa: F401
 from app.routers.payment import router as payment_router  # noqa: F401
+from app.routers.metrics import router as metrics_router  # noqa: F401
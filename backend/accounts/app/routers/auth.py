@@ -1,3 +1,4 @@
+import time
 from fastapi import APIRouter, BackgroundTasks, Depends, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 
@@ -13,16 +14,17 @@ from app.core.exceptions import (
     UnverifiedUserException,
     EmailDoesNotExistException,
 )
-from app.models import User
 from app.repositories import UserRepository, BalanceRepository
 from app.schemas import (
     AccessTokenSchema,
     UserResponseSchema,
+    UserWithBalaceResponseSchema,
     SignUpSchema,
     ResetPasswordSchema,
     ResetPasswordConfirmSchema,
 )
 from app.services import AuthService, EmailService, PaymentService
+from app.core.rabbitmq import pika_client
 from app.core.utils import oauth
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -47,7 +49,7 @@ async def login(
             user.email, background_tasks, background=True
         )
         raise UnverifiedUserException
-    access_token = auth_service.create_access_token(user.email)
+    access_token = auth_service.create_access_token(user.email, user)
     return AccessTokenSchema(access_token=access_token)
 
 
@@ -119,9 +121,16 @@ async def reset_password(
 async def reset_password_confirm(
     token: str,
     reset_password: ResetPasswordConfirmSchema,
+    background_tasks: BackgroundTasks,
     auth_service: AuthService = Depends(get_auth_service),
 ):
-    await auth_service.reset_password(token, reset_password.new_password)
+    user = await auth_service.reset_password(
+        token, reset_password.new_password
+    )
+    # Taken now, the revocation is published after the response
+    background_tasks.add_task(
+        pika_client.send_token_revocation, user.id, int(time.time())
+    )
 
 
 @router.get(
@@ -132,7 +141,7 @@ async def reset_password_confirm(
     status_code=status.HTTP_200_OK,
 )
 async def verify_token(
-    user: User = Depends(get_request_user),
+    user: UserWithBalaceResponseSchema = Depends(get_request_user),
 ):
     return UserResponseSchema.from_orm(user)
 
@@ -148,7 +157,7 @@ async def google_auth(
     auth_service: AuthService = Depends(get_auth_service),
 ) -> AccessTokenSchema:
     user = await auth_service.google_authenticate_user(request)
-    token = auth_service.create_access_token(user.email)
+    token = auth_service.create_access_token(user.email, user)
     return AccessTokenSchema(
         access_token=token,
     )
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, status
+
+from app.core.cache import UserCache
+from app.core.dependencies import get_request_superuser, get_user_cache
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get(
+    "/cache",
+    summary="Get user cache metrics",
+    description="Get hit rate and size of the user cache.",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(get_request_superuser)],
+)
+async def get_cache_metrics(
+    user_cache: UserCache = Depends(get_user_cache),
+) -> dict[str, int | float]:
+    """
+    Get hit rate and size of the user cache.
+    Only for superusers.
+    """
+
+    return user_cache.get_metrics()
@@ -3,11 +3,11 @@ from fastapi import APIRouter, Depends, Header, Request, status
 from app.core import settings
 
 from app.core.dependencies import get_payment_service, get_request_user
-from app.models import User
 from app.schemas import (
     PublishableKeyResponseSchema,
     DepositRequestSchema,
     DepositResponseSchema,
+    UserWithBalaceResponseSchema,
     WebHookSchema,
 )
 from app.services import PaymentService
@@ -38,7 +38,7 @@ async def get_publishable_key():
 async def deposit(
     data: DepositRequestSchema,
     payment_service: PaymentService = Depends(get_payment_service),
-    user: User = Depends(get_request_user),
+    user: UserWithBalaceResponseSchema = Depends(get_request_user),
 ):
     payment_intent = payment_service.create_payment_intent(
         customer_id=user.id, amount=data.amount, currency=data.currency
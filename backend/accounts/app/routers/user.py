@@ -1,14 +1,22 @@
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    status,
+)
 
 from app.core.dependencies import get_auth_service, get_balance_repository
-from app.core.rabbitmq import pika_client
+from app.core.rabbitmq.utils import send_balance_updates
 from app.core.utils import oauth2_scheme
 from app.repositories import BalanceRepository
 from app.schemas import (
     UserResponseSchema,
     UserWithBalaceResponseSchema,
     BalanceUpdateSchema,
-    BalanceResponseSchema,
+    BalanceEntryResponseSchema,
+    BalanceHistoryResponseSchema,
 )
 from app.services import AuthService
 
@@ -26,8 +34,35 @@ async def get_current_user(
     token: str = Depends(oauth2_scheme),
     auth_service: AuthService = Depends(get_auth_service),
 ):
-    user = await auth_service.get_current_user(token, True)
-    return UserWithBalaceResponseSchema.from_orm(user)
+    return await auth_service.get_cached_user(token)
+
+
+@router.get(
+    "/me/balance-history",
+    summary="Get balance history",
+    description="Get balance changes of current user, newest first. "
+    "Pass nextCursor of a page as cursor to get the next one.",
+    response_model=BalanceHistoryResponseSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def get_balance_history(
+    currency: str | None = None,
+    cursor: int | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    token: str = Depends(oauth2_scheme),
+    balance_repository: BalanceRepository = Depends(get_balance_repository),
+    auth_service: AuthService = Depends(get_auth_service),
+):
+    user = await auth_service.get_cached_user(token)
+    entries = await balance_repository.get_balance_entries(
+        user.id, currency, cursor, limit
+    )
+    return BalanceHistoryResponseSchema(
+        entries=[
+            BalanceEntryResponseSchema.from_orm(entry) for entry in entries
+        ],
+        next_cursor=entries[-1].id if len(entries) == limit else None,
+    )
 
 
 @router.post(
@@ -44,25 +79,14 @@ async def new_order(
     balance_repository: BalanceRepository = Depends(get_balance_repository),
     auth_service: AuthService = Depends(get_auth_service),
 ):
-    user = await auth_service.get_current_user(token, True, balance.currency)
-    if user.balances[0].amount < balance.amount:
+    user = await auth_service.get_cached_user(token)
+    new_balance = await balance_repository.add_to_balance(
+        user.id, balance.currency, -balance.amount, "order"
+    )
+    if new_balance is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Not enough balance",
         )
-    user.balances[0].amount -= balance.amount
-    await balance_repository.update_balance(user.balances[0])
-    background_tasks.add_task(
-        pika_client.send_message_to_websocket_queue,
-        {
-            "type": "update",
-            "target": "balance",
-            "data": BalanceResponseSchema(
-                user_id=user.id,
-                currency=user.balances[0].currency,
-                amount=user.balances[0].amount,
-            ).dict(),
-        },
-        user.id,
-    )
+    background_tasks.add_task(send_balance_updates, [new_balance])
     return UserResponseSchema.from_orm(user)
@@ -19,5 +19,7 @@ from app.schemas.payment import (  # noqa: F401
 from app.schemas.balance import (  # noqa: F401
     BalanceResponseSchema,
     BalanceUpdateSchema,
+    BalanceEntryResponseSchema,
+    BalanceHistoryResponseSchema,
 )
 from app.schemas.order import OrderSchema  # noqa: F401
@@ -1,3 +1,4 @@
+from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 from pydantic import BaseModel
@@ -23,9 +24,42 @@ class BalanceUpdateSchema(BaseModel):
     user_id: Optional[str] = None
     currency: str
     amount: Decimal
+    reason: str = "trade"
+    ref_id: Optional[str] = None
 
     class Config:
         orm_mode = True
         alias_generator = to_lower_camel
         allow_population_by_field_name = True
         by_alias = True
+
+
+class BalanceEntryResponseSchema(BaseModel):
+    id: int
+    currency: str
+    delta: Decimal
+    reason: str
+    ref_id: Optional[str]
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+        alias_generator = to_lower_camel
+        allow_population_by_field_name = True
+        by_alias = True
+        json_encoders = {
+            Decimal: lambda d: str(d),
+        }
+
+
+class BalanceHistoryResponseSchema(BaseModel):
+    entries: list[BalanceEntryResponseSchema]
+    next_cursor: Optional[int]
+
+    class Config:
+        alias_generator = to_lower_camel
+        allow_population_by_field_name = True
+        by_alias = True
+        json_encoders = {
+            Decimal: lambda d: str(d),
+        }
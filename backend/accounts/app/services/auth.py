@@ -2,10 +2,11 @@ from datetime import datetime, timedelta
 from typing import Any
 from fastapi import Request
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from authlib.integrations.starlette_client import OAuthError
 
 from app.core import settings
+from app.core.cache import user_cache
+from app.core.hashing import password_hasher
 from app.core.utils import oauth
 from app.core.exceptions import (
     InvalidCredentialsException,
@@ -16,50 +17,70 @@ from app.core.exceptions import (
 )
 from app.models import User
 from app.repositories import UserRepository
-
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.schemas import UserWithBalaceResponseSchema
 
 
 class AuthService:
     def __init__(self, user_repository: UserRepository):
         self.user_repository = user_repository
 
-    def verify_password(
+    async def verify_password(
         self, plain_password: str, hashed_password: str
     ) -> bool:
         """
         Verify a plain password against a hashed password.
+        Throw an error if the password hashing pool is full.
         """
 
-        return pwd_context.verify(plain_password, hashed_password)
+        return await password_hasher.verify(plain_password, hashed_password)
 
-    def get_password_hash(self, password: str) -> str:
+    async def get_password_hash(self, password: str) -> str:
         """
         Hash a plain password.
+        Throw an error if the password hashing pool is full.
         """
 
-        return pwd_context.hash(password)
+        return await password_hasher.hash(password)
 
-    def _create_token(self, subject: str | Any, expires: int) -> str:
+    def _create_token(
+        self,
+        subject: str | Any,
+        expires: int,
+        claims: dict[str, Any] | None = None,
+    ) -> str:
         """
         Create JWT token.
         """
 
-        expires_delta = datetime.utcnow() + timedelta(minutes=expires)
-        to_encode = {"exp": expires_delta, "sub": subject}
+        now = datetime.utcnow()
+        expires_delta = now + timedelta(minutes=expires)
+        to_encode = {"exp": expires_delta, "iat": now, "sub": subject}
+        if claims:
+            to_encode.update(claims)
         encoded_jwt = jwt.encode(
             to_encode, settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM
         )
         return encoded_jwt
 
-    def create_access_token(self, subject: str | Any) -> str:
+    def create_access_token(
+        self, subject: str | Any, user: User | None = None
+    ) -> str:
         """
         Create access token.
+        With user set, the token carries the user id in the "uid" claim
+        and whether the user is active and verified in "act" and "ver",
+        so other services can verify the token without calling accounts.
         """
 
+        claims = None
+        if user is not None:
+            claims = {
+                "uid": str(user.id),
+                "act": bool(user.is_active),
+                "ver": bool(user.is_verified),
+            }
         return self._create_token(
-            subject, settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
+            subject, settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES, claims
         )
 
     def create_refresh_token(self, subject: str | Any) -> str:
@@ -104,6 +125,48 @@ class AuthService:
             raise InvalidTokenException()
         return user
 
+    async def get_cached_user(
+        self, token: str
+    ) -> UserWithBalaceResponseSchema:
+        """
+        Get current user with balances from the user cache,
+        the user is loaded on a miss. Tokens without the user id claim
+        are not cached, the user is loaded by email.
+        Throw an error if the token is invalid.
+        """
+
+        claims = self.decode_token(token)
+        user_id = claims.get("uid")
+        if user_id is None:
+            user = await self.user_repository.get_user_by_email(
+                claims["sub"], True
+            )
+            if not user:
+                raise InvalidTokenException()
+            return UserWithBalaceResponseSchema.from_orm(user)
+        user = await user_cache.get_or_load(
+            user_id,
+            lambda: self.user_repository.get_user_by_id(user_id, True),
+        )
+        if not user:
+            raise InvalidTokenException()
+        return user
+
+    async def get_cached_active_user(
+        self, token: str
+    ) -> UserWithBalaceResponseSchema:
+        """
+        Get current active user from the user cache.
+        Throw an error if the token is invalid or the user is inactive.
+        """
+
+        user = await self.get_cached_user(token)
+        if not user.is_active:
+            raise UserInactiveException()
+        if not user.is_verified:
+            raise UnverifiedUserException()
+        return user
+
     async def get_current_active_user(self, token: str) -> User:
         """
         Get current active user.
@@ -124,7 +187,7 @@ class AuthService:
         """
 
         user = await self.user_repository.get_user_by_email(email)
-        if not (user and self.verify_password(password, user.password)):
+        if not (user and await self.verify_password(password, user.password)):
             raise InvalidCredentialsException()
         if user.is_active is False:
             raise UserInactiveException()
@@ -144,7 +207,7 @@ class AuthService:
         user = await self.user_repository.create_user(
             User(
                 email=email,
-                password=self.get_password_hash(password),
+                password=await self.get_password_hash(password),
                 first_name=first_name,
                 last_name=last_name,
             )
@@ -173,7 +236,7 @@ class AuthService:
         user = await self.user_repository.get_user_by_email(email)
         if not user:
             raise InvalidCredentialsException()
-        user.password = self.get_password_hash(password)
+        user.password = await self.get_password_hash(password)
         user = await self.user_repository.update_user(user)
         return user
 
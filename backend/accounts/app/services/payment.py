@@ -1,3 +1,4 @@
+from decimal import Decimal
 import stripe
 
 from app.core import settings
@@ -35,11 +36,13 @@ class PaymentService:
     async def payment_intent_confirm(
         self, payment_intent: dict
     ):  # PaymentIntentScheme
-        balance = await self.balance_repository.get_user_balance_by_currency(
-            payment_intent.customer, payment_intent.currency
+        await self.balance_repository.add_to_balance(
+            payment_intent.customer,
+            payment_intent.currency,
+            Decimal(payment_intent.amount),
+            "deposit",
+            payment_intent.id,
         )
-        balance.amount += payment_intent.amount
-        await self.balance_repository.update_balance(balance)
 
     def get_event(self, payload: dict, sig_header: str) -> dict:  # EventScheme
         try:
@@ -0,0 +1,108 @@
+"""
+Fire a burst of concurrent logins and measure /auth/verify-token latency
+served by the same app meanwhile.
+
+Runs the app in-process against DB_URL, so run it with the app
+environment and a scratch database, the schema is recreated:
+
+    python -m benchmarks.login_storm --logins 50
+    python -m benchmarks.login_storm --logins 50 --blocking
+
+--blocking hashes on the event loop, as before the hashing pool.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from httpx import AsyncClient
+
+from app.core.hashing import password_hasher, pwd_context
+from app.db import async_session, init_models
+from app.db.base import engine
+from app.main import app
+from app.models import User
+from app.repositories import UserRepository
+from app.services import AuthService
+
+EMAIL = "bench.user@test.com"
+PASSWORD = "password"
+
+
+async def _run_blocking(func, *args):
+    return func(*args)
+
+
+async def _create_user() -> str:
+    async with async_session() as session:
+        user = await UserRepository(session).create_user(
+            User(
+                first_name="Bench",
+                last_name="User",
+                email=EMAIL,
+                password=pwd_context.hash(PASSWORD),
+                is_verified=True,
+            )
+        )
+        return AuthService(UserRepository(session)).create_access_token(
+            user.email, user.id
+        )
+
+
+async def _login(client: AsyncClient) -> int:
+    response = await client.post(
+        "/auth/login", data={"username": EMAIL, "password": PASSWORD}
+    )
+    return response.status_code
+
+
+async def _probe(
+    client: AsyncClient, token: str, done: asyncio.Event
+) -> list[float]:
+    latencies = []
+    while not done.is_set():
+        started = time.perf_counter()
+        response = await client.get(
+            "/auth/verify-token", headers={"Authorization": f"Bearer {token}"}
+        )
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.01)
+    return latencies
+
+
+async def main(logins: int, blocking: bool) -> None:
+    await init_models()
+    if blocking:
+        password_hasher._run = _run_blocking
+    token = await _create_user()
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        done = asyncio.Event()
+        probe = asyncio.create_task(_probe(client, token, done))
+        await asyncio.sleep(0.1)
+        started = time.perf_counter()
+        statuses = await asyncio.gather(
+            *[_login(client) for _ in range(logins)]
+        )
+        elapsed = time.perf_counter() - started
+        done.set()
+        latencies = sorted(await probe)
+    await engine.dispose()
+    print(
+        f"{logins} logins in {elapsed:.2f} s, "
+        f"{statuses.count(200)} ok, {statuses.count(503)} rejected"
+    )
+    print(
+        f"verify-token during the storm: {len(latencies)} requests, "
+        f"p50 {statistics.median(latencies):.1f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99)]:.1f} ms, "
+        f"max {latencies[-1]:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--blocking", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.blocking))
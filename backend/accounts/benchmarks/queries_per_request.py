@@ -0,0 +1,116 @@
+"""
+Count SQL queries and time per request of /auth/verify-token,
+/user/me and /user/new-order.
+
+Runs the app in-process against DB_URL, so run it with the app
+environment and a scratch database, the schema is recreated:
+
+    python -m benchmarks.queries_per_request --requests 200
+"""
+
+import argparse
+import asyncio
+import time
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from app.core.rabbitmq import pika_client
+from app.db import async_session, init_models
+from app.db.base import engine
+from app.main import app
+from app.models import User
+from app.repositories import BalanceRepository, UserRepository
+from app.services import AuthService
+
+
+class QueryCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *args) -> None:
+        self.count += 1
+
+
+async def _skip_message(*args, **kwargs) -> None:
+    # The broker is out of scope, balance pushes are dropped
+    return None
+
+
+async def _create_user() -> str:
+    async with async_session() as session:
+        user = await UserRepository(session).create_user(
+            User(
+                first_name="Bench",
+                last_name="User",
+                email="bench.user@test.com",
+                password="password",
+                is_verified=True,
+            )
+        )
+        balance_repository = BalanceRepository(session)
+        await balance_repository.init_user_balance(user)
+        await balance_repository.add_to_balance(
+            user.id, "usd", 10**6, "deposit"
+        )
+        return AuthService(UserRepository(session)).create_access_token(
+            user.email, user.id
+        )
+
+
+async def _measure(
+    client: AsyncClient,
+    counter: QueryCounter,
+    requests: int,
+    method: str,
+    url: str,
+    **kwargs,
+) -> None:
+    counter.count = 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = await client.request(method, url, **kwargs)
+        response.raise_for_status()
+    elapsed = time.perf_counter() - started
+    print(
+        f"{method} {url}: {counter.count / requests:.1f} queries/request, "
+        f"{elapsed / requests * 1000:.2f} ms/request"
+    )
+
+
+async def main(requests: int) -> None:
+    await init_models()
+    pika_client.send_message_to_websocket_queue = _skip_message
+    token = await _create_user()
+    headers = {"Authorization": f"Bearer {token}"}
+    counter = QueryCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        await _measure(
+            client,
+            counter,
+            requests,
+            "GET",
+            "/auth/verify-token",
+            headers=headers,
+        )
+        await _measure(
+            client, counter, requests, "GET", "/user/me", headers=headers
+        )
+        await _measure(
+            client,
+            counter,
+            requests,
+            "POST",
+            "/user/new-order",
+            headers=headers,
+            json={"currency": "usd", "amount": "0.01"},
+        )
+    event.remove(engine.sync_engine, "before_cursor_execute", counter)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
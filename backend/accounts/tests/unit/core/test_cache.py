@@ -0,0 +1,107 @@
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+import pytest
+
+from app.core.cache import MemoryCacheBackend, UserCache
+
+
+def _user(email: str = "john.doe@test.com", amount: str = "0"):
+    return SimpleNamespace(
+        id="user1",
+        first_name="John",
+        last_name="Doe",
+        email=email,
+        is_verified=True,
+        is_active=True,
+        is_superuser=False,
+        created_at=datetime(2023, 1, 1),
+        balances=[
+            SimpleNamespace(user_id="user1", currency="usd", amount=amount)
+        ],
+    )
+
+
+def _loader(*users):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return users[len(calls) - 1]
+
+    load.calls = calls
+    return load
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(maxsize=2)
+    await backend.set("a", "1", 60)
+    await backend.set("b", "2", 60)
+    assert await backend.get("a") == "1"
+    await backend.set("c", "3", 60)
+    assert await backend.get("b") is None
+    assert await backend.get("a") == "1"
+    await backend.delete("a", "missing")
+    assert await backend.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_backend_expires_entries():
+    backend = MemoryCacheBackend(maxsize=2)
+    with patch("app.core.cache.time.monotonic", return_value=100):
+        await backend.set("a", "1", 60)
+    with patch("app.core.cache.time.monotonic", return_value=160):
+        assert await backend.get("a") is None
+    assert len(backend) == 0
+
+
+@pytest.mark.asyncio
+async def test_user_cache_reads_through():
+    cache = UserCache(MemoryCacheBackend(maxsize=10), ttl=60)
+    load = _loader(_user(), _user())
+    for _ in range(3):
+        user = await cache.get_or_load("user1", load)
+        assert user.id == "user1"
+        assert user.balances[0].amount == "0"
+    assert len(load.calls) == 1
+    assert cache.get_metrics() == {
+        "hits": 2,
+        "misses": 1,
+        "hit_rate": 2 / 3,
+        "invalidations": 0,
+        "size": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_user_cache_does_not_cache_missing_users():
+    cache = UserCache(MemoryCacheBackend(maxsize=10), ttl=60)
+    load = _loader(None, None)
+    assert await cache.get_or_load("user1", load) is None
+    assert await cache.get_or_load("user1", load) is None
+    assert len(load.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_user_cache_invalidate_by_user_id():
+    cache = UserCache(MemoryCacheBackend(maxsize=10), ttl=60)
+    load = _loader(_user(amount="0"), _user(amount="5"))
+    await cache.get_or_load("user1", load)
+    await cache.invalidate("user1", "unknown")
+    user = await cache.get_or_load("user1", load)
+    assert user.balances[0].amount == "5"
+    assert cache.invalidations == 2
+
+
+@pytest.mark.asyncio
+async def test_user_cache_skips_user_invalidated_while_loading():
+    cache = UserCache(MemoryCacheBackend(maxsize=10), ttl=60)
+
+    async def load():
+        await cache.invalidate("user1")
+        return _user()
+
+    user = await cache.get_or_load("user1", load)
+    assert user.id == "user1"
+    assert await cache.backend.get("user:user1") is None
@@ -0,0 +1,27 @@
+import asyncio
+import pytest
+
+from app.core.exceptions import PasswordHashingBusyException
+from app.core.hashing import PasswordHasher
+
+
+@pytest.mark.asyncio
+async def test_password_hasher():
+    hasher = PasswordHasher(workers=2, queue_size=2)
+    hashed_password = await hasher.hash("password")
+    assert await hasher.verify("password", hashed_password) is True
+    assert await hasher.verify("wrong_password", hashed_password) is False
+    assert hasher.pending == 0
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_rejects_when_full():
+    hasher = PasswordHasher(workers=1, queue_size=1)
+    results = await asyncio.gather(
+        *[hasher.hash("password") for _ in range(3)], return_exceptions=True
+    )
+    assert isinstance(results[2], PasswordHashingBusyException)
+    assert all(isinstance(result, str) for result in results[:2])
+    assert hasher.rejected == 1
+    hasher.shutdown()
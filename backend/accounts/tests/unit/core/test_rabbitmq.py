@@ -0,0 +1,247 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+import asyncio
+import json
+from uuid import uuid4
+from unittest.mock import AsyncMock, MagicMock, patch
+import pytest
+
+from app.core.rabbitmq.client import PikaClient
+from app.core.rabbitmq.utils import consume_income_messages
+from app.models import Balance
+from app.repositories import BalanceRepository
+from app.services import AuthService
+
+
+async def _create_test_balance(
+    auth_service: AuthService, balance_repository: BalanceRepository
+):
+    user = await auth_service.sign_up_user(
+        first_name="Test",
+        last_name="User",
+        email="test.user@test.com",
+        password="password",
+    )
+    balance = await balance_repository.create_balance(
+        Balance(currency="USD", user=user)
+    )
+    balance.amount = Decimal("100")
+    return await balance_repository.update_balance(balance)
+
+
+def _reserve_message(
+    user_id: str, amount: str, sent_at: datetime | None = None
+) -> MagicMock:
+    message = MagicMock()
+    message.ack = AsyncMock()
+    message.type = "reserve"
+    message.correlation_id = str(uuid4())
+    message.expiration = 5.0
+    message.timestamp = sent_at or datetime.utcnow()
+    message.body = json.dumps(
+        {"user_id": user_id, "currency": "USD", "amount": amount}
+    ).encode()
+    return message
+
+
+@pytest.mark.asyncio
+@patch(
+    "app.core.rabbitmq.utils.pika_client.send_message_to_websocket_queue",
+    new_callable=AsyncMock,
+)
+@patch(
+    "app.core.rabbitmq.utils.pika_client.send_reply",
+    new_callable=AsyncMock,
+)
+async def test_reserve_balance(
+    mock_send_reply,
+    mock_send_message,
+    test_db,
+    auth_service: AuthService,
+    balance_repository: BalanceRepository,
+):
+    balance = await _create_test_balance(auth_service, balance_repository)
+    await consume_income_messages(
+        [_reserve_message(balance.user_id, "40")], balance_repository
+    )
+    assert mock_send_reply.call_args.args[1]["status"] == "ok"
+    assert mock_send_message.await_count == 1
+
+    await consume_income_messages(
+        [_reserve_message(balance.user_id, "70")], balance_repository
+    )
+    reply = mock_send_reply.call_args.args[1]
+    assert reply["status"] == "error"
+    assert reply["amount"] == "70"
+    assert mock_send_message.await_count == 1
+    balance = await balance_repository.get_user_balance_by_currency(
+        balance.user_id, "USD"
+    )
+    assert balance.amount == Decimal("60")
+
+
+@pytest.mark.asyncio
+@patch(
+    "app.core.rabbitmq.utils.pika_client.send_message_to_websocket_queue",
+    new_callable=AsyncMock,
+)
+@patch(
+    "app.core.rabbitmq.utils.pika_client.send_reply",
+    new_callable=AsyncMock,
+)
+async def test_expired_reserve_is_dropped(
+    mock_send_reply,
+    mock_send_message,
+    test_db,
+    auth_service: AuthService,
+    balance_repository: BalanceRepository,
+):
+    balance = await _create_test_balance(auth_service, balance_repository)
+    sent_at = datetime.utcnow() - timedelta(seconds=10)
+    await consume_income_messages(
+        [_reserve_message(balance.user_id, "40", sent_at)],
+        balance_repository,
+    )
+    mock_send_reply.assert_not_awaited()
+    balance = await balance_repository.get_user_balance_by_currency(
+        balance.user_id, "USD"
+    )
+    assert balance.amount == Decimal("100")
+
+
+@pytest.mark.asyncio
+@patch(
+    "app.core.rabbitmq.utils.pika_client.send_message_to_websocket_queue",
+    new_callable=AsyncMock,
+)
+@patch(
+    "app.core.rabbitmq.utils.pika_client.send_reply",
+    new_callable=AsyncMock,
+)
+async def test_consume_income_messages_batch(
+    mock_send_reply,
+    mock_send_message,
+    test_db,
+    auth_service: AuthService,
+    balance_repository: BalanceRepository,
+):
+    balance = await _create_test_balance(auth_service, balance_repository)
+    updates = []
+    for amount in ("1", "2.5"):
+        message = MagicMock()
+        message.ack = AsyncMock()
+        message.type = None
+        message.body = json.dumps(
+            [{"user_id": balance.user_id, "currency": "USD", "amount": amount}]
+        ).encode()
+        updates.append(message)
+    reservation = _reserve_message(balance.user_id, "103")
+    await consume_income_messages(
+        [updates[0], reservation, updates[1]], balance_repository
+    )
+    assert mock_send_reply.call_args.args[1]["status"] == "ok"
+    balance = await balance_repository.get_user_balance_by_currency(
+        balance.user_id, "USD"
+    )
+    assert balance.amount == Decimal("0.5")
+    mock_send_message.assert_awaited_once()
+    message = mock_send_message.call_args.args[0]
+    assert message["target"] == "balances"
+    assert message["data"] == [
+        {"user_id": balance.user_id, "currency": "USD", "amount": "0.50"}
+    ]
+    for message in [*updates, reservation]:
+        message.ack.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch(
+    "app.core.rabbitmq.utils.pika_client.send_message_to_websocket_queue",
+    new_callable=AsyncMock,
+)
+@patch("app.core.rabbitmq.utils.pika_client.reject", new_callable=AsyncMock)
+@patch(
+    "app.core.rabbitmq.utils.pika_client.dead_letter",
+    new_callable=AsyncMock,
+)
+async def test_consume_income_messages_isolates_failures(
+    mock_dead_letter,
+    mock_reject,
+    mock_send_message,
+    test_db,
+    auth_service: AuthService,
+    balance_repository: BalanceRepository,
+):
+    balance = await _create_test_balance(auth_service, balance_repository)
+    malformed = MagicMock()
+    malformed.type = None
+    malformed.body = b"not json"
+    update = MagicMock()
+    update.ack = AsyncMock()
+    update.type = None
+    update.body = json.dumps(
+        {"user_id": balance.user_id, "currency": "USD", "amount": "5"}
+    ).encode()
+    reservation = _reserve_message(balance.user_id, "1")
+    with patch(
+        "app.core.rabbitmq.utils.reserve_balance",
+        new_callable=AsyncMock,
+        side_effect=RuntimeError("boom"),
+    ):
+        await consume_income_messages(
+            [malformed, update, reservation], balance_repository
+        )
+    mock_dead_letter.assert_awaited_once()
+    assert mock_dead_letter.call_args.args[0] is malformed
+    update.ack.assert_awaited_once()
+    mock_reject.assert_awaited_once()
+    assert mock_reject.call_args.args[0] is reservation
+    reservation.ack.assert_not_awaited()
+    balance = await balance_repository.get_user_balance_by_currency(
+        balance.user_id, "USD"
+    )
+    assert balance.amount == Decimal("105")
+
+
+@pytest.mark.asyncio
+@patch("app.core.rabbitmq.client.settings.ACCOUNTS_BATCH_TIMEOUT_MS", 10)
+async def test_consume_accounts_queue_settles_batches():
+    client = PikaClient()
+    client.exchange = MagicMock()
+    client.accounts_queue = MagicMock()
+    client.accounts_queue.bind = AsyncMock()
+    client.accounts_queue.consume = AsyncMock()
+    client.reject = AsyncMock()
+    batches = []
+
+    async def callback(batch: list) -> None:
+        batches.append(batch)
+        if len(batches) == 2:
+            raise RuntimeError("boom")
+
+    def _message() -> MagicMock:
+        message = MagicMock()
+        message.ack = AsyncMock()
+        message.processed = False
+        return message
+
+    task = asyncio.create_task(client.consume_accounts_queue(callback))
+    await asyncio.sleep(0)
+    deliver = client.accounts_queue.consume.call_args.args[0]
+    first = [_message(), _message()]
+    for message in first:
+        await deliver(message)
+    while not batches:
+        await asyncio.sleep(0.01)
+    second = _message()
+    await deliver(second)
+    while len(batches) < 2:
+        await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert batches == [first, [second]]
+    for message in first:
+        message.ack.assert_awaited_once()
+    second.ack.assert_not_awaited()
+    client.reject.assert_awaited_once_with(second, "boom")
@@ -0,0 +1,18 @@
+from app.core import settings
+from app.db.base import get_engine_options
+
+
+def test_get_engine_options_postgres():
+    options = get_engine_options("postgresql+asyncpg://user:pass@db/accounts")
+    assert options["url"].query == {
+        "prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)
+    }
+    assert options["pool_size"] == settings.DB_POOL_SIZE
+    assert options["max_overflow"] == settings.DB_MAX_OVERFLOW
+    assert options["pool_recycle"] == settings.DB_POOL_RECYCLE
+    assert options["pool_pre_ping"] is settings.DB_POOL_PRE_PING
+
+
+def test_get_engine_options_sqlite():
+    options = get_engine_options("sqlite+aiosqlite:///./test.db")
+    assert list(options) == ["url"]
@@ -1,7 +1,9 @@
+from decimal import Decimal
 import pytest
+from sqlalchemy import func, select
 from app.core import settings
 
-from app.models import Balance
+from app.models import Balance, BalanceEntry, BalanceSnapshot
 from app.repositories import BalanceRepository
 from app.services import AuthService
 
@@ -92,3 +94,169 @@ async def test_update_balance(
     balance.amount = 100
     balance_from_db = await balance_repository.update_balance(balance)
     assert balance_from_db.amount == 100
+
+
+@pytest.mark.asyncio
+async def test_add_to_balance(
+    test_db, auth_service: AuthService, balance_repository: BalanceRepository
+):
+    user = await _create_test_user(auth_service)
+    await balance_repository.init_user_balance(user)
+    balance = await balance_repository.add_to_balance(
+        user.id, "usd", Decimal("10"), "order"
+    )
+    assert balance.amount == Decimal("10")
+    balance = await balance_repository.add_to_balance(
+        user.id, "usd", Decimal("-4"), "order"
+    )
+    assert balance.amount == Decimal("6")
+    balance = await balance_repository.add_to_balance(
+        user.id, "usd", Decimal("-7"), "order"
+    )
+    assert balance is None
+    balance = await balance_repository.get_user_balance_by_currency(
+        user.id, "usd"
+    )
+    assert balance.amount == Decimal("6")
+
+
+@pytest.mark.asyncio
+async def test_add_to_balances(
+    test_db, auth_service: AuthService, balance_repository: BalanceRepository
+):
+    user = await _create_test_user(auth_service)
+    await balance_repository.init_user_balance(user)
+    balances = await balance_repository.add_to_balances(
+        {
+            (user.id, "usd"): Decimal("5"),
+            (user.id, "eur"): Decimal("2"),
+            (user.id, "gbp"): Decimal("-1"),
+        }
+    )
+    amounts = {balance.currency: balance.amount for balance in balances}
+    assert amounts == {"usd": Decimal("5"), "eur": Decimal("2")}
+    assert await balance_repository.add_to_balances({}) == []
+
+
+def _entry(user_id: str, currency: str, delta: str, ref_id=None):
+    return BalanceEntry(
+        user_id=user_id,
+        currency=currency,
+        delta=Decimal(delta),
+        reason="trade",
+        ref_id=ref_id,
+    )
+
+
+@pytest.mark.asyncio
+async def test_apply_entries_skips_replays(
+    test_db, auth_service: AuthService, balance_repository: BalanceRepository
+):
+    user = await _create_test_user(auth_service)
+    await balance_repository.init_user_balance(user)
+    entries = [
+        _entry(user.id, "usd", "5", "order1"),
+        _entry(user.id, "eur", "1", "order1"),
+        _entry(user.id, "usd", "1"),
+        _entry(user.id, "usd", "1"),
+    ]
+    balances = await balance_repository.apply_entries(entries)
+    amounts = {balance.currency: balance.amount for balance in balances}
+    assert amounts == {"usd": Decimal("7"), "eur": Decimal("1")}
+    balances = await balance_repository.apply_entries(entries[:2])
+    assert balances == []
+    entries = await balance_repository.get_balance_entries(user.id)
+    assert len(entries) == 4
+
+
+@pytest.mark.asyncio
+async def test_apply_entries_records_applied_only(
+    test_db, auth_service: AuthService, balance_repository: BalanceRepository
+):
+    user = await _create_test_user(auth_service)
+    await balance_repository.init_user_balance(user)
+    balances = await balance_repository.apply_entries(
+        [_entry(user.id, "usd", "5"), _entry(user.id, "eur", "-1", "order1")]
+    )
+    assert [balance.currency for balance in balances] == ["usd"]
+    entries = await balance_repository.get_balance_entries(user.id)
+    assert [entry.currency for entry in entries] == ["usd"]
+    balances = await balance_repository.apply_entries(
+        [_entry(user.id, "eur", "1", "order1")]
+    )
+    assert balances[0].amount == Decimal("1")
+
+
+@pytest.mark.asyncio
+async def test_add_to_balance_with_ref_id(
+    test_db, auth_service: AuthService, balance_repository: BalanceRepository
+):
+    user = await _create_test_user(auth_service)
+    await balance_repository.init_user_balance(user)
+    await balance_repository.add_to_balance(
+        user.id, "usd", Decimal("10"), "deposit"
+    )
+    for _ in range(2):
+        balance = await balance_repository.add_to_balance(
+            user.id, "usd", Decimal("-4"), "reserve", "1"
+        )
+        assert balance.amount == Decimal("6")
+    balance = await balance_repository.add_to_balance(
+        user.id, "usd", Decimal("-7"), "reserve", "2"
+    )
+    assert balance is None
+    balance = await balance_repository.add_to_balance(
+        user.id, "usd", Decimal("-6"), "reserve", "2"
+    )
+    assert balance.amount == Decimal("0")
+    entries = await balance_repository.get_balance_entries(user.id)
+    assert [(entry.reason, entry.delta) for entry in entries] == [
+        ("reserve", Decimal("-6")),
+        ("reserve", Decimal("-4")),
+        ("deposit", Decimal("10")),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_balance_entries_pages(
+    test_db, auth_service: AuthService, balance_repository: BalanceRepository
+):
+    user = await _create_test_user(auth_service)
+    await balance_repository.init_user_balance(user)
+    for currency in ("usd", "eur", "usd"):
+        await balance_repository.add_to_balance(
+            user.id, currency, Decimal("1"), "deposit"
+        )
+    page = await balance_repository.get_balance_entries(user.id, limit=2)
+    assert [entry.currency for entry in page] == ["usd", "eur"]
+    page = await balance_repository.get_balance_entries(
+        user.id, before_id=page[-1].id, limit=2
+    )
+    assert [entry.currency for entry in page] == ["usd"]
+    page = await balance_repository.get_balance_entries(user.id, "usd")
+    assert len(page) == 2
+
+
+@pytest.mark.asyncio
+async def test_create_snapshot(
+    test_db, auth_service: AuthService, balance_repository: BalanceRepository
+):
+    user = await _create_test_user(auth_service)
+    await balance_repository.init_user_balance(user)
+    await balance_repository.add_to_balance(
+        user.id, "usd", Decimal("10"), "deposit"
+    )
+    count = await balance_repository.create_snapshot()
+    assert count == len(settings.BALANCE_TYPES)
+    await balance_repository.add_to_balance(
+        user.id, "usd", Decimal("-2.5"), "order"
+    )
+    amount = await balance_repository.get_ledger_amount(user.id, "usd")
+    assert amount == Decimal("7.5")
+    await balance_repository.create_snapshot()
+    result = await balance_repository.session.execute(
+        select(func.count()).select_from(BalanceSnapshot)
+    )
+    assert result.scalar() == len(settings.BALANCE_TYPES)
+    amount = await balance_repository.get_ledger_amount(user.id, "usd")
+    assert amount == Decimal("7.5")
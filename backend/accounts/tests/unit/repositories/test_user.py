@@ -1,6 +1,9 @@
 import pytest
+from sqlalchemy.exc import InvalidRequestError
 
-from app.repositories import UserRepository
+from app.core import settings
+from app.db import async_session
+from app.repositories import BalanceRepository, UserRepository
 from app.models import User
 
 
@@ -97,3 +100,31 @@ async def test_update_user(test_db, user_repository: UserRepository):
     created_user.first_name = "Jane"
     updated_user = await user_repository.update_user(created_user)
     assert updated_user.first_name == "Jane"
+
+
+@pytest.mark.asyncio
+async def test_get_user_by_email_loads_balances_on_request(
+    test_db,
+    user_repository: UserRepository,
+    balance_repository: BalanceRepository,
+):
+    created_user = await user_repository.create_user(
+        User(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@test.com",
+            password="password",
+        )
+    )
+    await balance_repository.init_user_balance(created_user)
+    async with async_session() as session:
+        user = await UserRepository(session).get_user_by_email(
+            created_user.email
+        )
+        with pytest.raises(InvalidRequestError):
+            user.balances
+    async with async_session() as session:
+        user = await UserRepository(session).get_user_by_email(
+            created_user.email, balance=True
+        )
+        assert len(user.balances) == len(settings.BALANCE_TYPES)
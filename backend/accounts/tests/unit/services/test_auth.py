@@ -1,6 +1,7 @@
 from unittest.mock import patch
 import pytest
 
+from app.core.cache import MemoryCacheBackend, UserCache
 from app.core.exceptions import (
     UserInactiveException,
     InvalidCredentialsException,
@@ -12,21 +13,27 @@ from app.services import AuthService
 from app.models import User
 
 
-def test_verify_password(auth_service: AuthService):
+@pytest.mark.asyncio
+async def test_verify_password(auth_service: AuthService):
     password = "password"
-    hashed_password = auth_service.get_password_hash(password)
-    assert auth_service.verify_password(password, hashed_password) is True
+    hashed_password = await auth_service.get_password_hash(password)
+    assert (
+        await auth_service.verify_password(password, hashed_password) is True
+    )
     assert (
-        auth_service.verify_password("wrong_password", hashed_password)
+        await auth_service.verify_password("wrong_password", hashed_password)
         is False
     )
 
 
-def test_get_password_hash(auth_service: AuthService):
+@pytest.mark.asyncio
+async def test_get_password_hash(auth_service: AuthService):
     password = "password"
-    hashed_password = auth_service.get_password_hash(password)
+    hashed_password = await auth_service.get_password_hash(password)
     assert hashed_password != password
-    assert auth_service.verify_password(password, hashed_password) is True
+    assert (
+        await auth_service.verify_password(password, hashed_password) is True
+    )
 
 
 @patch("app.services.auth.AuthService._create_token")
@@ -50,6 +57,17 @@ def test_create_token(auth_service: AuthService):
     assert len(token) > 0
 
 
+def test_create_access_token_with_user(auth_service: AuthService):
+    user = User(id="1", is_active=True, is_verified=False)
+    token = auth_service.create_access_token("test", user)
+    decoded_token = auth_service.decode_token(token)
+    assert decoded_token["sub"] == "test"
+    assert decoded_token["uid"] == "1"
+    assert decoded_token["act"] is True
+    assert decoded_token["ver"] is False
+    assert isinstance(decoded_token["iat"], int)
+
+
 def test_decode_token(auth_service: AuthService):
     token = auth_service._create_token("test", 1)
     decoded_token = auth_service.decode_token(token)
@@ -98,6 +116,34 @@ async def test_get_current_active_user(
     assert current_user.is_active is True
 
 
+@pytest.mark.asyncio
+async def test_get_cached_active_user(
+    test_db, auth_service: AuthService, user_repository: UserRepository
+):
+    user = await user_repository.create_user(
+        User(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@test.com",
+            password="password",
+            is_verified=True,
+        )
+    )
+    token = auth_service.create_access_token(user.email, user)
+    cache = UserCache(MemoryCacheBackend(maxsize=10), ttl=60)
+    with patch("app.services.auth.user_cache", cache), patch(
+        "app.repositories.user.user_cache", cache
+    ):
+        for _ in range(2):
+            current_user = await auth_service.get_cached_active_user(token)
+            assert current_user.id == user.id
+        assert cache.hits == 1
+        user.is_active = False
+        await user_repository.update_user(user)
+        with pytest.raises(UserInactiveException):
+            await auth_service.get_cached_active_user(token)
+
+
 @pytest.mark.asyncio
 async def test_get_current_active_user_inactive(
     test_db, auth_service: AuthService, user_repository: UserRepository
@@ -138,7 +184,7 @@ async def test_get_current_active_user_unverified(
 async def test_authenticate_user(
     test_db, auth_service: AuthService, user_repository: UserRepository
 ):
-    hashed_password = auth_service.get_password_hash("password")
+    hashed_password = await auth_service.get_password_hash("password")
     user = await user_repository.create_user(
         User(
             first_name="John",
@@ -158,7 +204,7 @@ async def test_authenticate_user(
 async def test_authenticate_user_invalid_credentials(
     test_db, auth_service: AuthService, user_repository: UserRepository
 ):
-    hashed_password = auth_service.get_password_hash("password")
+    hashed_password = await auth_service.get_password_hash("password")
     user = await user_repository.create_user(
         User(
             first_name="John",
@@ -175,7 +221,7 @@ async def test_authenticate_user_invalid_credentials(
 async def test_authenticate_user_inactive(
     test_db, auth_service: AuthService, user_repository: UserRepository
 ):
-    hashed_password = auth_service.get_password_hash("password")
+    hashed_password = await auth_service.get_password_hash("password")
     user = await user_repository.create_user(
         User(
             first_name="John",
@@ -222,7 +268,7 @@ async def test_sign_up_existing_user(
             first_name=user["first_name"],
             last_name=user["last_name"],
             email=user["email"],
-            password=auth_service.get_password_hash(user["password"]),
+            password=await auth_service.get_password_hash(user["password"]),
         )
     )
     with pytest.raises(UserAlreadyExistsException):
@@ -233,7 +279,7 @@ async def test_sign_up_existing_user(
 async def test_verify_email(
     test_db, auth_service: AuthService, user_repository: UserRepository
 ):
-    hashed_password = auth_service.get_password_hash("password")
+    hashed_password = await auth_service.get_password_hash("password")
     user = await user_repository.create_user(
         User(
             first_name="John",
@@ -253,7 +299,7 @@ async def test_verify_email(
 async def test_verify_email_invalid_credentials(
     test_db, auth_service: AuthService, user_repository: UserRepository
 ):
-    hashed_password = auth_service.get_password_hash("password")
+    hashed_password = await auth_service.get_password_hash("password")
     await user_repository.create_user(
         User(
             first_name="John",
@@ -271,7 +317,7 @@ async def test_verify_email_invalid_credentials(
 async def test_reset_password(
     test_db, auth_service: AuthService, user_repository: UserRepository
 ):
-    hashed_password = auth_service.get_password_hash("password")
+    hashed_password = await auth_service.get_password_hash("password")
     user = await user_repository.create_user(
         User(
             first_name="John",
@@ -291,7 +337,7 @@ async def test_reset_password(
 async def test_reset_password_invalid_credentials(
     test_db, auth_service: AuthService, user_repository: UserRepository
 ):
-    hashed_password = auth_service.get_password_hash("password")
+    hashed_password = await auth_service.get_password_hash("password")
     await user_repository.create_user(
         User(
             first_name="John",
@@ -8,6 +8,7 @@ from app.services import AuthService, PaymentService
 
 class MockPaymentIntent:
     def __init__(self, customer: str, amount: int):
+        self.id = "pi_1"
         self.customer = customer
         self.amount = amount
         self.currency = "usd"
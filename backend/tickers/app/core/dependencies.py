@@ -1,11 +1,23 @@
 from fastapi import Depends, Header
-import httpx
 
 from app.core import settings
 from app.core.exceptions import InvalidAuthorizationTokenException
-from app.repositories import OrderRepository, TradeRepository
+from app.core.http import HTTPClient, http_client
+from app.engine import (
+    OrderBookManager,
+    OrderJournal,
+    TickerManager,
+    order_books,
+    order_journal,
+    tickers,
+)
+from app.repositories import (
+    CandleRepository,
+    OrderRepository,
+    TradeRepository,
+)
 from app.schemas import UserSchema
-from app.services import OrderService, TradeService
+from app.services import CandleService, OrderService, TradeService
 
 
 async def get_order_repository() -> OrderRepository:
@@ -16,6 +28,10 @@ async def get_trade_repository() -> TradeRepository:
     return TradeRepository()
 
 
+async def get_candle_repository() -> CandleRepository:
+    return CandleRepository()
+
+
 async def get_order_service(
     order_repository: OrderRepository = Depends(get_order_repository),
 ):
@@ -28,9 +44,35 @@ async def get_trade_service(
     return TradeService(repository=trade_repository)
 
 
+async def get_candle_service(
+    candle_repository: CandleRepository = Depends(get_candle_repository),
+    trade_repository: TradeRepository = Depends(get_trade_repository),
+):
+    return CandleService(
+        repository=candle_repository, trade_repository=trade_repository
+    )
+
+
+async def get_http_client() -> HTTPClient:
+    return http_client
+
+
+async def get_order_journal() -> OrderJournal:
+    return order_journal
+
+
+async def get_order_books() -> OrderBookManager:
+    return order_books
+
+
+async def get_ticker_manager() -> TickerManager:
+    return tickers
+
+
 async def get_request_user(
     authorization: str | None = Header(None, alias="Authorization"),
     http_bearer: str | None = Header(None, alias="HTTPBearer"),
+    http_client: HTTPClient = Depends(get_http_client),
 ) -> UserSchema:
     if authorization is not None:
         access_token = authorization
@@ -39,11 +81,10 @@ async def get_request_user(
     else:
         raise InvalidAuthorizationTokenException()
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            url=settings.VERIFY_TOKEN_URL,
-            headers={"Authorization": access_token},
-        )
-        if response.status_code != 200:
-            raise InvalidAuthorizationTokenException()
-        return UserSchema(**response.json())
+    response = await http_client.get(
+        url=settings.VERIFY_TOKEN_URL,
+        headers={"Authorization": access_token},
+    )
+    if response.status_code != 200:
+        raise InvalidAuthorizationTokenException()
+    return UserSchema(**response.json())
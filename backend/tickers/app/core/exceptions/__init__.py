@@ -1,3 +1,13 @@
+from app.core.exceptions.order import (  # noqa: F401
+    BalanceReservationTimeoutException,
+    NotEnoughBalanceException,
+    OrderQueueFullException,
+    UnknownSymbolException,
+)
+from app.core.exceptions.pagination import (  # noqa: F401
+    InvalidCursorException,
+)
 from app.core.exceptions.user import (  # noqa: F401
     InvalidAuthorizationTokenException,
+    PermissionDeniedException,
 )
@@ -0,0 +1,33 @@
+from fastapi import HTTPException, status
+
+
+class OrderQueueFullException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many pending orders, try again later",
+        )
+
+
+class UnknownSymbolException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Unknown symbol",
+        )
+
+
+class NotEnoughBalanceException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Not enough balance",
+        )
+
+
+class BalanceReservationTimeoutException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Balance reservation timed out, try again later",
+        )
@@ -7,3 +7,11 @@ class InvalidAuthorizationTokenException(HTTPException):
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid Authorization Token",
         )
+
+
+class PermissionDeniedException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Permission denied",
+        )
@@ -0,0 +1,103 @@
+import asyncio
+import random
+import httpx
+
+from app.core import settings
+
+# Raised before the request reaches the server, safe to retry for any method
+RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class HTTPClient:
+    """
+    App-scoped pool of keep-alive connections to other services.
+    Failed requests are retried with exponential backoff and full jitter,
+    requests that could have reached the server only for idempotent methods.
+    """
+
+    def __init__(self) -> None:
+        self.client: httpx.AsyncClient | None = None
+        self.in_flight = 0
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.saturated = 0
+
+    def start(self) -> None:
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                settings.HTTP_TIMEOUT,
+                connect=settings.HTTP_CONNECT_TIMEOUT,
+                pool=settings.HTTP_POOL_TIMEOUT,
+            ),
+        )
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def _should_retry(self, method: str, error: httpx.HTTPError) -> bool:
+        if isinstance(error, RETRY_ERRORS):
+            return True
+        return method in IDEMPOTENT_METHODS and isinstance(
+            error, httpx.TransportError
+        )
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        if self.client is None:
+            raise RuntimeError("HTTP client is not started")
+        method = method.upper()
+        self.requests += 1
+        if self.in_flight >= settings.HTTP_MAX_CONNECTIONS:
+            self.saturated += 1
+        self.in_flight += 1
+        try:
+            for attempt in range(settings.HTTP_RETRIES + 1):
+                try:
+                    return await self.client.request(method, url, **kwargs)
+                except httpx.HTTPError as e:
+                    if attempt == settings.HTTP_RETRIES or (
+                        not self._should_retry(method, e)
+                    ):
+                        self.failures += 1
+                        raise
+                self.retries += 1
+                await asyncio.sleep(
+                    random.uniform(
+                        0, settings.HTTP_RETRY_BACKOFF * 2**attempt
+                    )
+                )
+        finally:
+            self.in_flight -= 1
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    def get_metrics(self) -> dict[str, int | float]:
+        """
+        Return request counters and the current pool usage.
+        Saturated counts requests sent while all connections were busy.
+        """
+
+        return {
+            "max_connections": settings.HTTP_MAX_CONNECTIONS,
+            "in_flight": self.in_flight,
+            "usage": self.in_flight / settings.HTTP_MAX_CONNECTIONS,
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "saturated": self.saturated,
+        }
+
+
+http_client = HTTPClient()
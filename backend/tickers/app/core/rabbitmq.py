@@ -1,7 +1,15 @@
+import asyncio
 import json
+from datetime import datetime
+from typing import Awaitable, Callable
+from uuid import uuid4
 import aio_pika
+from aio_pika.abc import AbstractIncomingMessage
 
 from app.core import settings
+from app.core.security import handle_auth_event
+
+ReplyCallback = Callable[[dict], Awaitable[None]]
 
 
 class PikaClient:
@@ -9,6 +17,8 @@ class PikaClient:
         self.exchange_name = settings.RABBITMQ_EXCHANGE_NAME
         self.accounts_queue_name = settings.RABBITMQ_ACCOUNTS_QUEUE_NAME
         self.websocket_queue_name = settings.RABBITMQ_WEBSOCKET_QUEUE_NAME
+        self.futures: dict[str, asyncio.Future] = {}
+        self.late_reply_callback: ReplyCallback | None = None
 
     async def connect(self) -> None:
         self.connection = await aio_pika.connect_robust(
@@ -29,6 +39,29 @@ class PikaClient:
         self.websocket_queue = await self.channel.declare_queue(
             self.websocket_queue_name, durable=True
         )
+        await self.consume_auth_events()
+        self.reply_queue = await self.channel.declare_queue(exclusive=True)
+        await self.reply_queue.consume(self.on_reply, no_ack=True)
+
+    async def consume_auth_events(self) -> None:
+        """
+        Apply token revocations published by accounts.
+        Every instance consumes them from its own exclusive queue.
+        """
+
+        queue = await self.channel.declare_queue(exclusive=True)
+        await queue.bind(
+            self.exchange,
+            routing_key=settings.RABBITMQ_AUTH_EVENTS_ROUTING_KEY,
+        )
+
+        async def on_message(message: AbstractIncomingMessage) -> None:
+            async with message.process():
+                handle_auth_event(
+                    message.routing_key, json.loads(message.body)
+                )
+
+        await queue.consume(on_message)
 
     async def close_connection(self) -> None:
         await self.connection.close()
@@ -57,6 +90,44 @@ class PikaClient:
     async def send_message_to_accounts_queue(self, message: str) -> None:
         await self.send_message(message, routing_key=self.accounts_queue_name)
 
+    async def call_accounts_queue(
+        self, message: dict, message_type: str, timeout: float
+    ) -> dict:
+        """
+        Send a command to accounts queue and wait for its reply.
+        Calls do not wait for each other, any number can be in flight.
+        Raise asyncio.TimeoutError if no reply comes in time, the command
+        expires at the same time, so it is not applied after that.
+        """
+
+        correlation_id = uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self.futures[correlation_id] = future
+        try:
+            await self.exchange.publish(
+                aio_pika.Message(
+                    body=json.dumps(message).encode(),
+                    type=message_type,
+                    correlation_id=correlation_id,
+                    reply_to=self.reply_queue.name,
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                    expiration=timeout,
+                    timestamp=datetime.utcnow(),
+                ),
+                routing_key=self.accounts_queue_name,
+            )
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.futures.pop(correlation_id, None)
+
+    async def on_reply(self, message: AbstractIncomingMessage) -> None:
+        reply = json.loads(message.body)
+        future = self.futures.pop(message.correlation_id, None)
+        if future is not None and not future.done():
+            future.set_result(reply)
+        elif self.late_reply_callback is not None:
+            await self.late_reply_callback(reply)
+
     async def send_message_to_websocket_queue(
         self,
         message: str,
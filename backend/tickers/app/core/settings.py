@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import BaseSettings
 
 
@@ -12,12 +12,51 @@ class Settings(BaseSettings):
     DB_URL: Optional[str]
     # ACCESS TOKEN
     VERIFY_TOKEN_URL: str
-    CREATE_NEW_ORDER_URL: str
+    JWT_SECRET_KEY: str
+    JWT_ALGORITHM: str = "HS256"
+    JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL: int = 300
+    # HTTP CLIENT
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_TIMEOUT: float = 5.0
+    HTTP_CONNECT_TIMEOUT: float = 2.0
+    HTTP_POOL_TIMEOUT: float = 2.0
+    HTTP_RETRIES: int = 2
+    HTTP_RETRY_BACKOFF: float = 0.1
     # RABBITMQ
     RABBITMQ_URL: str
     RABBITMQ_EXCHANGE_NAME: str
     RABBITMQ_ACCOUNTS_QUEUE_NAME: str
     RABBITMQ_WEBSOCKET_QUEUE_NAME: str
+    RABBITMQ_AUTH_EVENTS_ROUTING_KEY: str = "auth_events"
+    BALANCE_RESERVE_TIMEOUT: float = 5.0
+    # "documents" stores one document per trade, "timeseries" stores
+    # trades in a native time-series collection bucketed by symbol
+    TRADE_STORAGE: Literal["documents", "timeseries"] = "documents"
+    TRADE_TIMESERIES_GRANULARITY: str = "seconds"
+    # MATCHING
+    # symbols orders can be placed and order books read for
+    SYMBOLS: list[str] = [
+        "BTC-USD",
+        "ETH-USD",
+        "SOL-USD",
+        "ADA-USD",
+        "XRP-USD",
+    ]
+    MATCHING_QUEUE_SIZE: int = 1000
+    # seconds to wait on shutdown for the queued orders to be matched
+    MATCHING_STOP_TIMEOUT: float = 10.0
+    # ORDER JOURNAL
+    JOURNAL_FLUSH_INTERVAL: float = 0.001
+    JOURNAL_SNAPSHOT_INTERVAL: float = 60.0
+    JOURNAL_SNAPSHOT_CHUNK_SIZE: int = 10000
+    # CANDLES
+    CANDLE_BACKFILL_DAYS: int = 7
+    # TICKERS
+    TICKER_BROADCAST_INTERVAL: float = 1.0
 
     class Config:
         case_sensitive = True
@@ -1,25 +1,76 @@
-import httpx
-
 from app.core import settings
+from app.core.exceptions import (
+    InvalidAuthorizationTokenException,
+    PermissionDeniedException,
+)
+from app.core.http import http_client
+from app.core.security import (
+    decode_access_token,
+    get_token,
+    get_trusted_user_id,
+    token_cache,
+)
+
+
+async def _fetch_user_id(authorization: str) -> str:
+    response = await http_client.get(
+        settings.VERIFY_TOKEN_URL,
+        headers={"Authorization": authorization},
+    )
+    if response.status_code != 200:
+        raise InvalidAuthorizationTokenException()
+    return response.json()["id"]
 
 
 async def get_current_user(
     authorization: str | None = None, http_bearer: str | None = None
 ) -> str:
-    if authorization is None and http_bearer is None:
-        raise Exception(
-            status_code=401,
-            detail="Unauthorized",
-        )
-
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            settings.VERIFY_TOKEN_URL,
-            headers={"Authorization": authorization or http_bearer},
-        )
-        if response.status_code != 200:
-            raise Exception(
-                status_code=response.status_code,
-                detail=response.json()["detail"],
-            )
-        return response.json()["id"]
+    """
+    Return the id of the user the access token belongs to.
+    The token is verified locally with the shared JWT secret,
+    verified tokens are cached until they expire or are revoked.
+    Tokens without the user id and an active and verified user
+    are verified by accounts.
+    """
+
+    authorization = authorization or http_bearer
+    if authorization is None:
+        raise InvalidAuthorizationTokenException()
+
+    token = get_token(authorization)
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        return user_id
+
+    claims = decode_access_token(token)
+    if claims is None:
+        raise InvalidAuthorizationTokenException()
+    user_id = get_trusted_user_id(claims)
+    if user_id is None:
+        user_id = await _fetch_user_id(authorization)
+    if token_cache.is_revoked(user_id, claims.get("iat", 0)):
+        raise InvalidAuthorizationTokenException()
+    token_cache.set(token, user_id, claims["exp"])
+    return user_id
+
+
+async def check_superuser(
+    authorization: str | None = None, http_bearer: str | None = None
+) -> None:
+    """
+    Raise PermissionDeniedException unless the token belongs to
+    a superuser. Tokens do not carry roles, so accounts is asked
+    every time, it is meant for rarely called internal endpoints.
+    """
+
+    authorization = authorization or http_bearer
+    if authorization is None:
+        raise InvalidAuthorizationTokenException()
+    response = await http_client.get(
+        settings.VERIFY_TOKEN_URL,
+        headers={"Authorization": authorization},
+    )
+    if response.status_code != 200:
+        raise InvalidAuthorizationTokenException()
+    if not response.json().get("isSuperuser"):
+        raise PermissionDeniedException()
@@ -0,0 +1,108 @@
+"""
+Copy trades from one trade storage to the other, in time order
+and in batches. The copy resumes shortly before the newest trade already
+in the target, so an interrupted run is continued by running it again.
+Switch TRADE_STORAGE once the copy has caught up.
+
+    python -m app.db.migrate_trades --source documents --target timeseries
+"""
+
+import argparse
+import asyncio
+from datetime import timedelta
+import time
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING
+
+from app.core import settings
+from app.repositories import TradeRepository
+
+
+async def migrate_trades(
+    source: TradeRepository,
+    target: TradeRepository,
+    batch_size: int,
+    overlap: timedelta,
+) -> int:
+    """
+    Copy trades missing in target from source and return their number.
+    Documents are copied as stored, without decoding.
+
+    Trade times are set by the workers that create the trades, so trades
+    a bit older than the newest one in the target may still be missing.
+    The copy restarts overlap before the newest trade in the target
+    and skips the trades of the overlap already copied.
+    """
+
+    await target.create_collection()
+    await target.create_indexes()
+    if source.timeseries is None:
+        # Plain collections have no index to scan all trades in time order
+        await source.collection.create_index(
+            [("createdAt", ASCENDING), ("_id", ASCENDING)]
+        )
+    last_time = await target.get_last_trade_time()
+    since = last_time - overlap if last_time is not None else None
+    last_id = None
+    copied = 0
+    started = time.perf_counter()
+    while True:
+        documents = await source.get_documents_after(
+            since, last_id, batch_size
+        )
+        if not documents:
+            return copied
+        first_time = documents[0]["createdAt"]
+        since, last_id = documents[-1]["createdAt"], documents[-1]["_id"]
+        if last_time is not None and first_time <= last_time:
+            existing = await target.get_existing_ids(
+                [document["_id"] for document in documents],
+                {"createdAt": {"$gte": first_time, "$lte": since}},
+            )
+            documents = [
+                document
+                for document in documents
+                if document["_id"] not in existing
+            ]
+        await target.create_documents(documents)
+        copied += len(documents)
+        rate = copied / (time.perf_counter() - started)
+        print(f"Copied {copied} trades, {rate:.0f} trades/s")
+
+
+async def main(
+    source: str, target: str, batch_size: int, overlap: timedelta
+) -> None:
+    client = AsyncIOMotorClient(settings.DB_URL)
+    try:
+        copied = await migrate_trades(
+            TradeRepository(client, storage=source),
+            TradeRepository(client, storage=target),
+            batch_size,
+            overlap,
+        )
+        print(f"Done, {copied} trades copied")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    storages = ["documents", "timeseries"]
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", choices=storages, default="documents")
+    parser.add_argument("--target", choices=storages, default="timeseries")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument(
+        "--overlap", type=int, default=300, help="seconds, default 300"
+    )
+    args = parser.parse_args()
+    if args.source == args.target:
+        parser.error("source and target must differ")
+    asyncio.run(
+        main(
+            args.source,
+            args.target,
+            args.batch_size,
+            timedelta(seconds=args.overlap),
+        )
+    )
@@ -2,10 +2,30 @@ from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.core import settings
 from app.db.database import db
+from app.repositories import (
+    BookSnapshotRepository,
+    CandleRepository,
+    OrderEventRepository,
+    OrderRepository,
+    TradeRepository,
+)
+
+
+async def create_indexes():
+    for repository in (
+        OrderRepository(),
+        TradeRepository(),
+        CandleRepository(),
+        OrderEventRepository(),
+        BookSnapshotRepository(),
+    ):
+        await repository.create_collection()
+        await repository.create_indexes()
 
 
 async def connect_to_mongo():
     db.client = AsyncIOMotorClient(settings.DB_URL)
+    await create_indexes()
 
 
 async def close_mongo_connection():
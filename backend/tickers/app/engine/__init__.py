@@ -0,0 +1,10 @@
+from app.engine.book import Fill, OrderBook  # noqa: F401
+from app.engine.worker import MatchingWorker, OrderRetryError  # noqa: F401
+from app.engine.candle import CandleWriter, candle_writer  # noqa: F401
+from app.engine.journal import OrderJournal, order_journal  # noqa: F401
+from app.engine.manager import OrderBookManager, order_books  # noqa: F401
+from app.engine.ticker import (  # noqa: F401
+    RollingTicker,
+    TickerManager,
+    tickers,
+)
@@ -0,0 +1,290 @@
+from bisect import bisect_left, insort
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from itertools import islice
+from typing import Iterable
+from uuid import uuid4
+
+from app.schemas import OrderDB
+
+
+@dataclass
+class Fill:
+    order: OrderDB
+    qty: Decimal
+
+
+class OrderBook:
+    """
+    In-memory price-time priority order book of a single symbol.
+
+    Every side keeps a sorted list of prices and a FIFO queue of resting
+    orders per price, so the best level is found in O(1) and a level is
+    inserted or removed in O(log n) lookups. The remaining quantity of
+    every level is kept alongside, so depth is read without walking orders.
+
+    Levels touched since the last publish are tracked, so subscribers get
+    sequence numbered changes instead of the whole book.
+    """
+
+    def __init__(self, symbol: str) -> None:
+        self.symbol = symbol
+        self._prices: dict[str, list[Decimal]] = {"buy": [], "sell": []}
+        self._levels: dict[str, dict[Decimal, deque[OrderDB]]] = {
+            "buy": {},
+            "sell": {},
+        }
+        self._depth: dict[str, dict[Decimal, Decimal]] = {
+            "buy": {},
+            "sell": {},
+        }
+        self._orders: dict[str, OrderDB] = {}
+        # (side, price) of changed levels -> level existed before the change
+        self._changes: dict[tuple[str, Decimal], bool] = {}
+        self.epoch = uuid4().hex
+        self.sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __contains__(self, order_id: object) -> bool:
+        return str(order_id) in self._orders
+
+    def _opposite_side(self, side: str) -> str:
+        return "sell" if side == "buy" else "buy"
+
+    def _remaining_qty(self, order: OrderDB) -> Decimal:
+        return order.init_qty - order.executed_qty
+
+    def best_price(self, side: str) -> Decimal | None:
+        """
+        Return the best price of a side, the highest bid or the lowest ask.
+        """
+
+        prices = self._prices[side]
+        if not prices:
+            return None
+        return prices[-1] if side == "buy" else prices[0]
+
+    def _crosses(self, order: OrderDB, price: Decimal) -> bool:
+        if order.type == "market":
+            return True
+        if order.side == "buy":
+            return price <= order.price
+        return price >= order.price
+
+    def _touch(self, side: str, price: Decimal) -> None:
+        self._changes.setdefault((side, price), price in self._depth[side])
+
+    def _remove_level(self, side: str, price: Decimal) -> None:
+        prices = self._prices[side]
+        del prices[bisect_left(prices, price)]
+        del self._levels[side][price]
+        del self._depth[side][price]
+
+    def add_order(self, order: OrderDB, front: bool = False) -> None:
+        """
+        Rest an open order at the back of its price level,
+        or at the front to give it back its priority.
+        """
+
+        levels = self._levels[order.side]
+        depth = self._depth[order.side]
+        self._touch(order.side, order.price)
+        level = levels.get(order.price)
+        if level is None:
+            level = levels[order.price] = deque()
+            depth[order.price] = Decimal(0)
+            insort(self._prices[order.side], order.price)
+        if front:
+            level.appendleft(order)
+        else:
+            level.append(order)
+        depth[order.price] += self._remaining_qty(order)
+        self._orders[str(order.id)] = order
+
+    def remove_order(self, order_id: str) -> OrderDB | None:
+        """
+        Remove a resting order from the book and return it.
+        """
+
+        order = self._orders.pop(str(order_id), None)
+        if order is None:
+            return None
+        self._touch(order.side, order.price)
+        level = self._levels[order.side][order.price]
+        level.remove(order)
+        self._depth[order.side][order.price] -= self._remaining_qty(order)
+        if not level:
+            self._remove_level(order.side, order.price)
+        return order
+
+    def _iter_prices(self, side: str) -> Iterable[Decimal]:
+        prices = self._prices[side]
+        return reversed(prices) if side == "buy" else prices
+
+    def get_depth(
+        self, side: str, limit: int | None = None
+    ) -> list[tuple[Decimal, Decimal]]:
+        """
+        Return (price, remaining qty) of the best levels of a side.
+        """
+
+        depth = self._depth[side]
+        return [
+            (price, depth[price])
+            for price in islice(self._iter_prices(side), limit)
+        ]
+
+    def get_snapshot(self, limit: int | None = None) -> dict:
+        """
+        Return the aggregated depth of both sides with the sequence of the
+        last published delta, ready to be sent as JSON.
+        """
+
+        return {
+            "symbol": self.symbol,
+            "epoch": self.epoch,
+            "sequence": self.sequence,
+            **{
+                side: [
+                    {"price": str(price), "qty": str(qty)}
+                    for price, qty in self.get_depth(side, limit)
+                ]
+                for side in ("buy", "sell")
+            },
+        }
+
+    def pop_changes(self) -> dict | None:
+        """
+        Return the levels changed since the previous call as the next
+        numbered delta, ready to be sent as JSON. Every change carries
+        the new remaining qty of the level, so applying it is idempotent.
+        Returns None if nothing changed.
+        """
+
+        changes = []
+        for (side, price), existed in self._changes.items():
+            qty = self._depth[side].get(price)
+            if qty is None:
+                if not existed:
+                    continue
+                action, qty = "remove", Decimal(0)
+            else:
+                action = "update" if existed else "insert"
+            changes.append(
+                {
+                    "action": action,
+                    "side": side,
+                    "price": str(price),
+                    "qty": str(qty),
+                }
+            )
+        self._changes = {}
+        if not changes:
+            return None
+        self.sequence += 1
+        return {
+            "symbol": self.symbol,
+            "epoch": self.epoch,
+            "sequence": self.sequence,
+            "changes": changes,
+        }
+
+    def get_orders(self, side: str, limit: int | None = None) -> list[OrderDB]:
+        """
+        Return resting orders of a side in priority order.
+        """
+
+        result = []
+        for price in self._iter_prices(side):
+            for order in self._levels[side][price]:
+                if limit is not None and len(result) >= limit:
+                    return result
+                result.append(order)
+        return result
+
+    def match(self, order: OrderDB) -> list[Fill]:
+        """
+        Match an incoming order against the opposite side of the book.
+        Executed quantities and statuses of both sides are updated in place.
+        Whatever is left of the incoming order rests in the book.
+        """
+
+        side = self._opposite_side(order.side)
+        levels = self._levels[side]
+        fills = []
+        while order.status == "open":
+            price = self.best_price(side)
+            if price is None or not self._crosses(order, price):
+                break
+            level = levels[price]
+            resting = level[0]
+            qty = min(self._remaining_qty(order), self._remaining_qty(resting))
+            self._touch(side, price)
+            resting.executed_qty += qty
+            order.executed_qty += qty
+            self._depth[side][price] -= qty
+            if resting.executed_qty == resting.init_qty:
+                self._close(resting)
+                level.popleft()
+                del self._orders[str(resting.id)]
+                if not level:
+                    self._remove_level(side, price)
+            if order.executed_qty == order.init_qty:
+                self._close(order)
+            fills.append(Fill(order=resting, qty=qty))
+
+        if order.status == "open":
+            self.add_order(order)
+        return fills
+
+    def fill_order(
+        self, order: OrderDB, resting_id: str, qty: Decimal
+    ) -> None:
+        """
+        Apply a recorded fill without matching: qty of a resting order
+        is executed against an incoming order, which is not in the book.
+        The resting order leaves the book once fully executed.
+        """
+
+        resting = self._orders[str(resting_id)]
+        self._touch(resting.side, resting.price)
+        resting.executed_qty += qty
+        order.executed_qty += qty
+        self._depth[resting.side][resting.price] -= qty
+        if resting.executed_qty == resting.init_qty:
+            self._close(resting)
+            self.remove_order(resting.id)
+        if order.executed_qty == order.init_qty:
+            self._close(order)
+
+    def undo_match(self, order: OrderDB, fills: list[Fill]) -> None:
+        """
+        Revert match() of an order whose results could not be stored.
+        Fills are reverted last first and resting orders that left the
+        book are put back at the front of their levels, so the book and
+        the orders are as they were before the order was matched.
+        """
+
+        self.remove_order(order.id)
+        for fill in reversed(fills):
+            resting = fill.order
+            if resting.id not in self:
+                self._reopen(resting)
+                self.add_order(resting, front=True)
+            self._touch(resting.side, resting.price)
+            resting.executed_qty -= fill.qty
+            order.executed_qty -= fill.qty
+            self._depth[resting.side][resting.price] += fill.qty
+        self._reopen(order)
+
+    def _close(self, order: OrderDB) -> None:
+        order.status = "closed"
+        order.ended_at = datetime.utcnow()
+
+    def _reopen(self, order: OrderDB) -> None:
+        order.status = "open"
+        order.ended_at = None
@@ -0,0 +1,93 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from app.schemas import CandleDB, TradeDB
+from app.services import CandleService
+
+CandlePublisher = Callable[[str, list[CandleDB]], Awaitable[None]]
+# Seconds to wait before merging trades again after a failed write
+RETRY_DELAY = 1.0
+
+
+class CandleWriter:
+    """
+    Merges new trades into the stored candles off the matching path.
+    Matching workers only add trades, one writer merges everything added
+    while the previous merge was in flight, so the writes per order
+    shrink under load. Merges add to the stored volume and trade count,
+    so only the candles that failed are merged again, before the
+    candles of newer trades. Updated candles are published per symbol.
+    """
+
+    def __init__(self) -> None:
+        self.candle_service: CandleService | None = None
+        self.publish: CandlePublisher | None = None
+        self.pending: list[TradeDB] = []
+        self.unmerged: list[CandleDB] = []
+        self.wakeup = asyncio.Event()
+        self.task: asyncio.Task | None = None
+
+    def start(
+        self, candle_service: CandleService, publish: CandlePublisher
+    ) -> None:
+        self.candle_service = candle_service
+        self.publish = publish
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the writer and merge the trades still pending.
+        """
+
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+        if self.unmerged:
+            await self._merge()
+        if self.pending:
+            await self._merge()
+
+    def add_trades(self, trades: list[TradeDB]) -> None:
+        if self.task is None:
+            return
+        self.pending.extend(trades)
+        self.wakeup.set()
+
+    async def _merge(self) -> None:
+        if not self.unmerged:
+            trades, self.pending = self.pending, []
+            self.unmerged = self.candle_service.build_trade_candles(trades)
+        candles, self.unmerged = await self.candle_service.merge_candles(
+            self.unmerged
+        )
+        symbols: dict[str, list[CandleDB]] = {}
+        for candle in candles:
+            symbols.setdefault(candle.symbol, []).append(candle)
+        for symbol, symbol_candles in symbols.items():
+            await self.publish(symbol, symbol_candles)
+        if self.unmerged:
+            raise RuntimeError(f"{len(self.unmerged)} candles not merged")
+
+    async def _run(self) -> None:
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            if not (self.pending or self.unmerged):
+                continue
+            try:
+                await self._merge()
+            except Exception as e:
+                print(f"Failed to update candles: {e}")
+                await asyncio.sleep(RETRY_DELAY)
+                self.wakeup.set()
+                continue
+            if self.pending:
+                self.wakeup.set()
+
+
+candle_writer = CandleWriter()
@@ -0,0 +1,218 @@
+import asyncio
+
+from app.core import settings
+from app.engine.book import Fill, OrderBook
+from app.repositories import BookSnapshotRepository, OrderEventRepository
+from app.schemas import OrderDB, OrderEventDB
+
+# Seconds to wait before writing events again after a failed insert
+RETRY_DELAY = 1.0
+
+
+class OrderJournal:
+    """
+    Append-only journal of the events that change order books,
+    with periodic snapshots of every book.
+
+    Events get a sequence per symbol when they are appended and are
+    written with group commit: one writer inserts everything appended
+    while the previous insert was in flight, so concurrent workers
+    share inserts. commit() waits until the events appended so far
+    are written. Events of a failed insert are kept and retried
+    before the events appended after them.
+
+    A book is restored from its latest snapshot and the events after it,
+    events and snapshots covered by a newer snapshot are deleted.
+    Appends are ignored until the journal is started.
+    """
+
+    def __init__(self) -> None:
+        self.events: OrderEventRepository | None = None
+        self.snapshots: BookSnapshotRepository | None = None
+        self.sequences: dict[str, int] = {}
+        self.snapshot_sequences: dict[str, int] = {}
+        self.pending: list[dict] = []
+        self.future: asyncio.Future | None = None
+        self.wakeup = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.batches = 0
+        self.written = 0
+        self.retries = 0
+
+    def start(
+        self,
+        events: OrderEventRepository,
+        snapshots: BookSnapshotRepository,
+    ) -> None:
+        self.events = events
+        self.snapshots = snapshots
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self.task is None:
+            return
+        await self.commit()
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    def _append(self, symbol: str, type: str, **fields) -> None:
+        if self.task is None:
+            return
+        sequence = self.sequences.get(symbol, 0) + 1
+        self.sequences[symbol] = sequence
+        event = OrderEventDB(
+            symbol=symbol, sequence=sequence, type=type, **fields
+        )
+        self.pending.append(event.to_dict(exclude_none=True))
+        if self.future is None:
+            self.future = asyncio.get_running_loop().create_future()
+        self.wakeup.set()
+
+    def append_accepted(self, order: OrderDB) -> None:
+        """
+        Append an incoming order as submitted, before it is matched.
+        """
+
+        self._append(order.symbol, "accepted", order=order)
+
+    def append_fills(self, order: OrderDB, fills: list[Fill]) -> None:
+        for fill in fills:
+            self._append(
+                order.symbol,
+                "fill",
+                order_id=fill.order.id,
+                taker_id=order.id,
+                qty=fill.qty,
+            )
+
+    def append_cancel(self, order: OrderDB) -> None:
+        self._append(order.symbol, "cancel", order_id=order.id)
+
+    async def commit(self) -> None:
+        """
+        Wait until the events appended so far are written.
+        """
+
+        if self.future is not None:
+            await asyncio.shield(self.future)
+
+    async def _run(self) -> None:
+        while True:
+            await self.wakeup.wait()
+            if settings.JOURNAL_FLUSH_INTERVAL:
+                await asyncio.sleep(settings.JOURNAL_FLUSH_INTERVAL)
+            self.wakeup.clear()
+            documents, future = self.pending, self.future
+            self.pending, self.future = [], None
+            if not documents:
+                continue
+            try:
+                await self.events.create_events(documents)
+            except Exception as e:
+                print(f"Failed to write order journal: {e}")
+                self.retries += 1
+                self.pending = documents + self.pending
+                if self.future is not None:
+                    # Events appended since are written with the failed ones
+                    newer = self.future
+                    future.add_done_callback(lambda _: newer.set_result(None))
+                self.future = future
+                await asyncio.sleep(RETRY_DELAY)
+                self.wakeup.set()
+                continue
+            self.batches += 1
+            self.written += len(documents)
+            future.set_result(None)
+
+    async def write_snapshot(self, book: OrderBook) -> bool:
+        """
+        Store a snapshot of a book if it changed since the last one.
+        The book is read at once, so the snapshot matches the sequence
+        of the last appended event, which is committed before the
+        snapshot is stored. Returns True if a snapshot was stored.
+        """
+
+        symbol = book.symbol
+        sequence = self.sequences.get(symbol, 0)
+        if self.snapshot_sequences.get(symbol) == sequence:
+            return False
+        orders = [
+            order.to_dict()
+            for side in ("buy", "sell")
+            for order in book.get_orders(side)
+        ]
+        await self.commit()
+        await self.snapshots.create_snapshot(
+            symbol, sequence, orders, settings.JOURNAL_SNAPSHOT_CHUNK_SIZE
+        )
+        self.snapshot_sequences[symbol] = sequence
+        await self.snapshots.delete_snapshots(symbol, sequence)
+        await self.events.delete_events(symbol, sequence)
+        return True
+
+    async def get_symbols(self) -> set[str]:
+        """
+        Return the symbols with a snapshot or journaled events.
+        """
+
+        return set(await self.snapshots.get_symbols()) | set(
+            await self.events.get_symbols()
+        )
+
+    def _rest(self, book: OrderBook, order: OrderDB | None) -> None:
+        if order is not None and order.status == "open":
+            book.add_order(order)
+
+    async def load_book(self, symbol: str) -> OrderBook:
+        """
+        Rebuild the book of a symbol from its latest snapshot
+        and replay the events after it.
+        Recorded fills are applied as they are, orders are not rematched.
+        """
+
+        book = OrderBook(symbol)
+        sequence = 0
+        snapshot = await self.snapshots.get_latest_snapshot(symbol)
+        if snapshot is not None:
+            sequence, orders = snapshot
+            for order in orders:
+                book.add_order(order)
+            self.snapshot_sequences[symbol] = sequence
+        incoming = None
+        async for event in self.events.iterate_events(symbol, sequence):
+            if event.type == "accepted":
+                self._rest(book, incoming)
+                incoming = event.order
+            elif event.type == "fill":
+                if incoming is None or event.order_id not in book:
+                    print(f"Skipped fill {event.sequence} of {symbol}")
+                else:
+                    book.fill_order(incoming, event.order_id, event.qty)
+            else:
+                self._rest(book, incoming)
+                incoming = None
+                book.remove_order(event.order_id)
+            sequence = event.sequence
+        self._rest(book, incoming)
+        self.sequences[symbol] = sequence
+        return book
+
+    def get_metrics(self) -> dict[str, int | float]:
+        """
+        Return write counters, batch size shows how well events are grouped.
+        """
+
+        return {
+            "batches": self.batches,
+            "events": self.written,
+            "batch_size": self.written / self.batches if self.batches else 0,
+            "pending": len(self.pending),
+            "retries": self.retries,
+        }
+
+
+order_journal = OrderJournal()
@@ -0,0 +1,203 @@
+import asyncio
+
+from app.core import settings
+from app.core.exceptions import (
+    OrderQueueFullException,
+    UnknownSymbolException,
+)
+from app.engine.book import OrderBook
+from app.engine.journal import OrderJournal
+from app.engine.worker import MatchingWorker, OrderHandler
+from app.schemas import OrderDB
+from app.services import OrderService
+
+
+class OrderBookManager:
+    """
+    Keeps one resident order book per symbol and the matching worker
+    that owns it. Symbols are matched in parallel, orders of one symbol
+    are matched strictly one after another.
+    """
+
+    def __init__(self) -> None:
+        self.books: dict[str, OrderBook] = {}
+        self.workers: dict[str, MatchingWorker] = {}
+        self.handler: OrderHandler | None = None
+        self.snapshot_task: asyncio.Task | None = None
+        self.recovered: list[OrderDB] = []
+        self.stopping = False
+
+    def get_book(self, symbol: str) -> OrderBook:
+        """
+        Return the order book of a symbol, creating an empty one if needed.
+        """
+
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook(symbol)
+        return book
+
+    def get_snapshot(self, symbol: str, limit: int | None = None) -> dict:
+        """
+        Return the depth of a symbol without creating its book,
+        a symbol without resting orders has an empty snapshot.
+        """
+
+        book = self.books.get(symbol)
+        if book is None:
+            book = OrderBook(symbol)
+        return book.get_snapshot(limit)
+
+    async def load(self, order_service: OrderService) -> None:
+        """
+        Rebuild all books from the open orders stored in the database.
+        """
+
+        self.books = {}
+        for order in await order_service.get_open_orders():
+            self.get_book(order.symbol).add_order(order)
+
+    async def restore(
+        self, journal: OrderJournal, order_service: OrderService
+    ) -> None:
+        """
+        Rebuild all books from their latest snapshots and the journal
+        events after them, so the work does not grow with the orders
+        collection. Without any snapshot or event yet, the books are
+        loaded from the open orders and snapshots are taken right away.
+
+        Open orders missing from the restored books were created but
+        never journaled, they were still queued when the service stopped.
+        They are kept in recovered and matched by submit_recovered().
+        """
+
+        symbols = await journal.get_symbols()
+        if not symbols:
+            await self.load(order_service)
+            await self.write_snapshots(journal)
+            return
+        self.books = {
+            symbol: await journal.load_book(symbol) for symbol in symbols
+        }
+        self.recovered = [
+            order
+            for order in await order_service.get_open_orders()
+            if order.id not in self.get_book(order.symbol)
+        ]
+
+    async def submit_recovered(self) -> int:
+        """
+        Queue the orders recovered by restore() for matching, oldest
+        first, and return their number. Called once workers can start.
+        """
+
+        orders, self.recovered = self.recovered, []
+        for order in orders:
+            await self.get_worker(order.symbol).put(order)
+        return len(orders)
+
+    async def write_snapshots(self, journal: OrderJournal) -> None:
+        for book in list(self.books.values()):
+            await journal.write_snapshot(book)
+
+    async def _snapshot_books(self, journal: OrderJournal) -> None:
+        while True:
+            await asyncio.sleep(settings.JOURNAL_SNAPSHOT_INTERVAL)
+            try:
+                await self.write_snapshots(journal)
+            except Exception as e:
+                print(f"Failed to write order book snapshots: {e}")
+
+    def start(
+        self, handler: OrderHandler, journal: OrderJournal | None = None
+    ) -> None:
+        """
+        Set the handler used by matching workers.
+        Workers are started lazily, on the first order of a symbol.
+        With a journal, books are snapshotted periodically.
+        """
+
+        self.handler = handler
+        if journal is not None:
+            self.snapshot_task = asyncio.create_task(
+                self._snapshot_books(journal)
+            )
+
+    async def stop(self) -> None:
+        """
+        Stop accepting orders and stop the workers once the orders
+        already queued are matched.
+        """
+
+        self.stopping = True
+        await asyncio.gather(
+            *(
+                worker.stop(settings.MATCHING_STOP_TIMEOUT)
+                for worker in self.workers.values()
+            )
+        )
+        self.workers = {}
+        if self.snapshot_task is not None:
+            self.snapshot_task.cancel()
+            try:
+                await self.snapshot_task
+            except asyncio.CancelledError:
+                pass
+            self.snapshot_task = None
+
+    def get_worker(self, symbol: str) -> MatchingWorker:
+        worker = self.workers.get(symbol)
+        if worker is None:
+            if self.handler is None:
+                raise RuntimeError("Order book manager is not started")
+            worker = self.workers[symbol] = MatchingWorker(
+                symbol, self.handler, settings.MATCHING_QUEUE_SIZE
+            )
+            worker.start()
+        return worker
+
+    def check_symbol(self, symbol: str) -> None:
+        """
+        Raise UnknownSymbolException if the symbol is not configured.
+        """
+
+        if symbol not in settings.SYMBOLS:
+            raise UnknownSymbolException()
+
+    def reserve(self, symbol: str) -> None:
+        """
+        Reserve a slot in the queue of the symbol's worker for an order
+        about to be created. The slot is used by submit() or given back
+        by release(). Raises OrderQueueFullException if the worker has
+        too many pending orders or the manager is stopping.
+        """
+
+        if self.stopping or not self.get_worker(symbol).reserve():
+            raise OrderQueueFullException()
+
+    def release(self, symbol: str) -> None:
+        self.get_worker(symbol).release()
+
+    def submit(self, order: OrderDB) -> None:
+        """
+        Queue an order for matching by the worker of its symbol,
+        in the slot reserved for it.
+        """
+
+        try:
+            self.get_worker(order.symbol).submit(order)
+        except asyncio.QueueFull:
+            raise OrderQueueFullException()
+
+    def get_metrics(self) -> dict[str, dict[str, int | str | None]]:
+        """
+        Return queue and error counters of the worker of every symbol.
+        """
+
+        return {
+            symbol: worker.get_metrics()
+            for symbol, worker in self.workers.items()
+        }
+
+
+order_books = OrderBookManager()
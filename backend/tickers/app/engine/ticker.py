@@ -0,0 +1,240 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Awaitable, Callable
+
+from app.core import settings
+from app.schemas import CandleDB, TickerResponse, TradeDB
+from app.services import TradeService
+
+EPOCH = datetime(1970, 1, 1)
+# Length of the rolling window in minute buckets
+WINDOW_MINUTES = 24 * 60
+
+TickerPublisher = Callable[[str, dict], Awaitable[None]]
+
+
+def get_minute(time: datetime) -> int:
+    return (time - EPOCH) // timedelta(minutes=1)
+
+
+@dataclass
+class MinuteBucket:
+    minute: int
+    open: Decimal
+    high: Decimal
+    low: Decimal
+    close: Decimal
+    volume: Decimal
+    trades: int
+
+
+class RollingTicker:
+    """
+    24h statistics of a single symbol over a ring buffer of minute buckets.
+
+    Volume and trade count are running sums, buckets leaving the window
+    are subtracted. High and low are kept in monotonic queues of bucket
+    extremes, so every update and read is O(1) amortized.
+    Trades older than the newest bucket are counted in the newest bucket.
+    """
+
+    def __init__(self, symbol: str) -> None:
+        self.symbol = symbol
+        self.buckets: list[MinuteBucket | None] = [None] * WINDOW_MINUTES
+        # Minutes of non-empty buckets, oldest first
+        self.minutes: deque[int] = deque()
+        self.highs: deque[tuple[int, Decimal]] = deque()
+        self.lows: deque[tuple[int, Decimal]] = deque()
+        self.minute: int | None = None
+        self.volume = Decimal(0)
+        self.trades = 0
+        self.last_price: Decimal | None = None
+
+    def advance(self, minute: int) -> None:
+        """
+        Move the window to end at a minute, dropping older buckets.
+        """
+
+        if self.minute is not None and minute <= self.minute:
+            return
+        self.minute = minute
+        oldest = minute - WINDOW_MINUTES + 1
+        while self.minutes and self.minutes[0] < oldest:
+            index = self.minutes.popleft() % WINDOW_MINUTES
+            bucket = self.buckets[index]
+            self.volume -= bucket.volume
+            self.trades -= bucket.trades
+            self.buckets[index] = None
+        while self.highs and self.highs[0][0] < oldest:
+            self.highs.popleft()
+        while self.lows and self.lows[0][0] < oldest:
+            self.lows.popleft()
+
+    def add(
+        self,
+        minute: int,
+        open: Decimal,
+        high: Decimal,
+        low: Decimal,
+        close: Decimal,
+        volume: Decimal,
+        trades: int,
+    ) -> None:
+        """
+        Add trades of a minute, in the shape of a minute candle.
+        """
+
+        if self.minute is not None and minute < self.minute:
+            minute = self.minute
+        self.advance(minute)
+        index = minute % WINDOW_MINUTES
+        bucket = self.buckets[index]
+        if bucket is None:
+            self.buckets[index] = MinuteBucket(
+                minute, open, high, low, close, volume, trades
+            )
+            self.minutes.append(minute)
+        else:
+            bucket.high = max(bucket.high, high)
+            bucket.low = min(bucket.low, low)
+            bucket.close = close
+            bucket.volume += volume
+            bucket.trades += trades
+        while self.highs and self.highs[-1][1] <= high:
+            self.highs.pop()
+        self.highs.append((minute, high))
+        while self.lows and self.lows[-1][1] >= low:
+            self.lows.pop()
+        self.lows.append((minute, low))
+        self.volume += volume
+        self.trades += trades
+        self.last_price = close
+
+    def add_trade(self, trade: TradeDB) -> None:
+        self.add(
+            get_minute(trade.created_at),
+            trade.price,
+            trade.price,
+            trade.price,
+            trade.price,
+            trade.qty,
+            1,
+        )
+
+    def add_candle(self, candle: CandleDB) -> None:
+        self.add(
+            get_minute(candle.open_time),
+            candle.open,
+            candle.high,
+            candle.low,
+            candle.close,
+            candle.volume,
+            candle.trades,
+        )
+
+    def get_stats(self, now: datetime | None = None) -> TickerResponse:
+        """
+        Return the statistics of the 24h ending now.
+        Without trades in the window prices stay at the last price.
+        """
+
+        self.advance(get_minute(now or datetime.utcnow()))
+        last_price = self.last_price
+        if self.minutes:
+            open_price = self.buckets[self.minutes[0] % WINDOW_MINUTES].open
+            high, low = self.highs[0][1], self.lows[0][1]
+        else:
+            open_price = high = low = last_price
+        price_change = last_price - open_price
+        return TickerResponse(
+            symbol=self.symbol,
+            last_price=last_price,
+            open_price=open_price,
+            high=high,
+            low=low,
+            price_change=price_change,
+            price_change_percent=(price_change / open_price * 100).quantize(
+                Decimal("0.01")
+            ),
+            volume=self.volume,
+            trades=self.trades,
+        )
+
+
+class TickerManager:
+    """
+    Keeps the rolling ticker of every traded symbol in memory
+    and broadcasts the tickers that changed at a fixed rate.
+    """
+
+    def __init__(self) -> None:
+        self.tickers: dict[str, RollingTicker] = {}
+        self.sent: dict[str, dict] = {}
+        self.task: asyncio.Task | None = None
+
+    def get_ticker(self, symbol: str) -> RollingTicker:
+        ticker = self.tickers.get(symbol)
+        if ticker is None:
+            ticker = self.tickers[symbol] = RollingTicker(symbol)
+        return ticker
+
+    def add_trades(self, trades: list[TradeDB]) -> None:
+        for trade in trades:
+            self.get_ticker(trade.symbol).add_trade(trade)
+
+    async def load(self, trade_service: TradeService) -> None:
+        """
+        Rebuild all tickers from minute candles of the trades
+        of the last 24h, built by a single aggregation.
+        """
+
+        self.tickers = {}
+        since = datetime.utcnow() - timedelta(minutes=WINDOW_MINUTES)
+        async for candle in trade_service.iterate_candles("1m", since):
+            self.get_ticker(candle.symbol).add_candle(candle)
+
+    def get_tickers(self) -> list[TickerResponse]:
+        now = datetime.utcnow()
+        return [
+            self.tickers[symbol].get_stats(now)
+            for symbol in sorted(self.tickers)
+        ]
+
+    def start(self, publish: TickerPublisher) -> None:
+        self.task = asyncio.create_task(self._run(publish))
+
+    async def stop(self) -> None:
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def publish_changes(self, publish: TickerPublisher) -> None:
+        """
+        Publish the tickers that changed since they were last published.
+        """
+
+        for ticker in self.get_tickers():
+            payload = ticker.to_json(by_alias=True)
+            if self.sent.get(ticker.symbol) == payload:
+                continue
+            await publish(ticker.symbol, payload)
+            self.sent[ticker.symbol] = payload
+
+    async def _run(self, publish: TickerPublisher) -> None:
+        while True:
+            await asyncio.sleep(settings.TICKER_BROADCAST_INTERVAL)
+            try:
+                await self.publish_changes(publish)
+            except Exception as e:
+                print(f"Failed to publish tickers: {e}")
+
+
+tickers = TickerManager()
@@ -0,0 +1,141 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from app.schemas import OrderDB
+
+OrderHandler = Callable[[OrderDB], Awaitable[None]]
+
+# Seconds to wait before handling an order again after a retryable error
+RETRY_DELAY = 1.0
+
+
+class OrderRetryError(Exception):
+    """
+    Raised by a handler when an order was not executed and nothing
+    was changed, so the order can be handled again.
+    """
+
+
+class MatchingWorker:
+    """
+    Single writer of one symbol's order book.
+    Orders are taken from a bounded queue and handled one at a time.
+    A slot of the queue is reserved before an order is created,
+    so a created order is always queued without waiting.
+
+    An order whose handler raises OrderRetryError is handled again
+    before the orders queued after it. Errors are counted and the last
+    one is kept for the metrics, other failed orders are not retried.
+    """
+
+    def __init__(
+        self, symbol: str, handler: OrderHandler, maxsize: int
+    ) -> None:
+        self.symbol = symbol
+        self.handler = handler
+        self.queue: asyncio.Queue[OrderDB] = asyncio.Queue(maxsize=maxsize)
+        self.reserved = 0
+        self.task: asyncio.Task | None = None
+        self.handled = 0
+        self.failed = 0
+        self.retries = 0
+        self.last_error: str | None = None
+
+    def start(self) -> None:
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float | None = None) -> None:
+        """
+        Handle the orders already queued, then stop.
+        Orders still queued after timeout seconds are dropped,
+        they stay open in the database.
+        """
+
+        if self.task is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            self.last_error = (
+                f"Stopped with {self.queue.qsize()} orders queued"
+            )
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    def full(self) -> bool:
+        return self.queue.qsize() + self.reserved >= self.queue.maxsize
+
+    def reserve(self) -> bool:
+        """
+        Reserve a queue slot for an order, return False if there is none.
+        """
+
+        if self.full():
+            return False
+        self.reserved += 1
+        return True
+
+    def release(self) -> None:
+        """
+        Give back a reserved slot that is not used.
+        """
+
+        self.reserved -= 1
+
+    def submit(self, order: OrderDB) -> None:
+        """
+        Put an order in the queue, in a slot reserved for it.
+        Raises asyncio.QueueFull if the queue is full.
+        """
+
+        self.release()
+        self.queue.put_nowait(order)
+
+    async def put(self, order: OrderDB) -> None:
+        """
+        Put an order in the queue without a reserved slot,
+        waiting until the queue has room.
+        """
+
+        await self.queue.put(order)
+
+    def _fail(self, order: OrderDB, error: Exception) -> None:
+        self.last_error = f"Failed to execute order {order.id}: {error}"
+
+    async def _handle(self, order: OrderDB) -> None:
+        while True:
+            try:
+                await self.handler(order)
+            except OrderRetryError as e:
+                self._fail(order, e)
+                self.retries += 1
+                await asyncio.sleep(RETRY_DELAY)
+                continue
+            except Exception as e:
+                self._fail(order, e)
+                self.failed += 1
+                return
+            self.handled += 1
+            return
+
+    async def _run(self) -> None:
+        while True:
+            order = await self.queue.get()
+            try:
+                await self._handle(order)
+            finally:
+                self.queue.task_done()
+
+    def get_metrics(self) -> dict[str, int | str | None]:
+        return {
+            "queued": self.queue.qsize(),
+            "reserved": self.reserved,
+            "handled": self.handled,
+            "failed": self.failed,
+            "retries": self.retries,
+            "last_error": self.last_error,
+        }
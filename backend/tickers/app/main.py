@@ -1,10 +1,34 @@
+from functools import partial
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core import settings
 from app.db.utils import connect_to_mongo, close_mongo_connection
-from app.routers import order_router, trade_router
+from app.routers import (
+    candle_router,
+    metrics_router,
+    order_router,
+    ticker_router,
+    trade_router,
+)
+from app.core.http import http_client
 from app.core.rabbitmq import pika_client
+from app.engine import candle_writer, order_books, order_journal, tickers
+from app.repositories import (
+    BookSnapshotRepository,
+    CandleRepository,
+    OrderEventRepository,
+    OrderRepository,
+    TradeRepository,
+)
+from app.routers.utils import (
+    NEXT_CURSOR_HEADER,
+    execute_order,
+    release_reserved_balance,
+    send_candles,
+    send_ticker,
+)
+from app.services import CandleService, OrderService, TradeService
 
 app = FastAPI(title=settings.APP_TITLE)
 
@@ -15,11 +39,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # ROUTERS
 app.include_router(order_router)
 app.include_router(trade_router)
+app.include_router(candle_router)
+app.include_router(ticker_router)
+app.include_router(metrics_router)
 
 
 # EVENTS
@@ -28,14 +56,59 @@ async def startup_event():
     print("Starting up...")
     await connect_to_mongo()
     print("Connected to MongoDB")
+    print("Backfilling candles...")
+    candle_service = CandleService(
+        repository=CandleRepository(), trade_repository=TradeRepository()
+    )
+    # Only candles after the last stored ones are rebuilt
+    await candle_service.backfill_all()
+    print("Candles backfilled")
+    print("Loading tickers...")
+    await tickers.load(TradeService(repository=TradeRepository()))
+    print("Tickers loaded")
+    print("Restoring order books...")
+    order_journal.start(OrderEventRepository(), BookSnapshotRepository())
+    await order_books.restore(
+        order_journal, OrderService(repository=OrderRepository())
+    )
+    print("Order books restored")
     print("Connecting to RabbitMQ...")
     await pika_client.connect()
+    pika_client.late_reply_callback = release_reserved_balance
     print("Connected to RabbitMQ")
+    http_client.start()
+    print("HTTP client pool started")
+    candle_writer.start(candle_service, send_candles)
+    print("Candle writer started")
+    order_books.start(
+        partial(
+            execute_order,
+            order_service=OrderService(repository=OrderRepository()),
+            trade_service=TradeService(repository=TradeRepository()),
+        ),
+        order_journal,
+    )
+    print("Matching workers ready")
+    recovered = await order_books.submit_recovered()
+    print(f"Queued {recovered} recovered orders")
+    tickers.start(send_ticker)
+    print("Ticker broadcast started")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     print("Shutting down...")
+    await order_books.stop()
+    print("Matching workers stopped")
+    await order_books.write_snapshots(order_journal)
+    await order_journal.stop()
+    print("Order books snapshotted")
+    await candle_writer.stop()
+    print("Candle writer stopped")
+    await tickers.stop()
+    print("Ticker broadcast stopped")
+    await http_client.close()
+    print("HTTP client pool closed")
     await close_mongo_connection()
     print("Disconnected from MongoDB")
     print("Closing RabbitMQ connection...")
@@ -1,3 +1,8 @@
 from app.repositories.base import BaseRepository  # noqa: F401
 from app.repositories.order import OrderRepository  # noqa: F401
 from app.repositories.trade import TradeRepository  # noqa: F401
+from app.repositories.candle import CandleRepository  # noqa: F401
+from app.repositories.journal import (  # noqa: F401
+    BookSnapshotRepository,
+    OrderEventRepository,
+)
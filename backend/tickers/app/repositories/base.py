@@ -1,16 +1,38 @@
+import base64
+import json
+from datetime import datetime
+from typing import AsyncIterator
 from bson import ObjectId
-from motor.core import AgnosticCollection
+from bson.errors import InvalidId
+from motor.core import AgnosticCollection, AgnosticCursor
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.results import InsertOneResult
+from pymongo import IndexModel, UpdateOne
+from pymongo.results import (
+    BulkWriteResult,
+    DeleteResult,
+    InsertManyResult,
+    InsertOneResult,
+)
 
 from app.core import settings
+from app.core.exceptions import InvalidCursorException
 from app.db.client import get_client
 
+# Sort keys of queries, a field or fields sorted in order
+SortKey = str | tuple[str, ...] | None
+# Query shapes already checked against the index spec
+_checked_queries: set[tuple[str, frozenset[str], SortKey]] = set()
+
 
 class BaseRepository:
     collection_name: str
-    order_by: str = "created_at"
+    order_by: str = "createdAt"
     order: int = -1
+    # Compound indexes of the collection, as lists of (field, direction)
+    indexes: list[list[tuple[str, int]]] = []
+    unique_indexes: list[list[tuple[str, int]]] = []
+    # Options of a native time-series collection, None for a plain one
+    timeseries: dict | None = None
 
     def __init__(
         self,
@@ -31,6 +53,207 @@ class BaseRepository:
         object_id = ObjectId(id)
         return object_id
 
+    async def create_collection(self) -> None:
+        """
+        Create the collection as a time-series one if timeseries is set.
+        Plain collections are created on the first insert, existing
+        collections are left untouched.
+        """
+
+        if self.timeseries is None:
+            return
+        names = await self.db.list_collection_names(
+            filter={"name": self.collection_name}
+        )
+        if not names:
+            await self.db.create_collection(
+                self.collection_name, timeseries=self.timeseries
+            )
+
+    async def create_indexes(self) -> list[str]:
+        """
+        Create the indexes declared on the repository and return their names.
+        Indexes that already exist are left untouched.
+        """
+
+        models = [IndexModel(keys) for keys in self.indexes] + [
+            IndexModel(keys, unique=True) for keys in self.unique_indexes
+        ]
+        if not models:
+            return []
+        result = await self.collection.create_indexes(models)
+        return result
+
+    @classmethod
+    def is_covered(cls, fields: set[str], order_by: SortKey) -> bool:
+        """
+        Check if a query filtering on fields and sorting by order_by
+        can be served by one of the declared indexes.
+        The filter fields must form a prefix of the index and the sort
+        fields that are not filtered on must follow right after, in order.
+        """
+
+        fields = set(fields)
+        if fields == {"_id"}:
+            return True
+        if isinstance(order_by, str):
+            order_by = (order_by,)
+        sort = [name for name in order_by or () if name not in fields]
+        for keys in cls.indexes + cls.unique_indexes:
+            names = [name for name, _ in keys]
+            size = len(fields)
+            if set(names[:size]) != fields:
+                continue
+            rest = names[size:]
+            if rest[: len(sort)] == sort:
+                return True
+        return False
+
+    def _check_index(self, filter: dict, order_by: SortKey) -> None:
+        """
+        Print a warning for queries not covered by an index.
+        Runs in debug mode only, once per query shape.
+        """
+
+        if not settings.DEBUG or not (self.indexes or self.unique_indexes):
+            return
+        shape = (self.collection_name, frozenset(filter), order_by)
+        if shape in _checked_queries:
+            return
+        _checked_queries.add(shape)
+        if not self.is_covered(shape[1], order_by):
+            print(
+                f"Query on {self.collection_name} is not covered by an index:"
+                f" filter={sorted(shape[1])}, sort={order_by}"
+            )
+
+    def _find(
+        self,
+        filter: dict,
+        limit: int | None = None,
+        order_by: str | None = None,
+        order: int | None = None,
+    ) -> AgnosticCursor:
+        """
+        This method is used to build a sorted cursor over a filter.
+        """
+
+        order_by = order_by or self.order_by
+        self._check_index(filter, order_by)
+        cursor = self.collection.find(filter).sort(
+            order_by, order or self.order
+        )
+        if limit:
+            cursor = cursor.limit(limit)
+        return cursor
+
+    def _encode_cursor(self, document: dict) -> str:
+        """
+        Build an opaque page cursor pointing right after a document.
+        """
+
+        data = {
+            "t": document[self.order_by].isoformat(),
+            "id": str(document["_id"]),
+        }
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+    def _decode_cursor(self, cursor: str) -> tuple[datetime, ObjectId]:
+        """
+        Parse a page cursor.
+        Raises InvalidCursorException if the cursor is malformed.
+        """
+
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return datetime.fromisoformat(data["t"]), ObjectId(data["id"])
+        except (ValueError, KeyError, TypeError, InvalidId):
+            raise InvalidCursorException()
+
+    async def get_documents_page(
+        self, filter: dict, limit: int = 100, cursor: str | None = None
+    ) -> tuple[list[dict], str | None]:
+        """
+        Get one page of documents by filter, newest first.
+        Pages are keyed on (order_by, _id), so no documents are skipped
+        server side. Returns the documents and the cursor of the next
+        page, None if this is the last one.
+        """
+
+        self._check_index(filter, (self.order_by, "_id"))
+        if cursor is not None:
+            value, document_id = self._decode_cursor(cursor)
+            after = {
+                "$or": [
+                    {self.order_by: {"$lt": value}},
+                    {self.order_by: value, "_id": {"$lt": document_id}},
+                ]
+            }
+            filter = {"$and": [filter, after]}
+        result = (
+            self.collection.find(filter)
+            .sort([(self.order_by, -1), ("_id", -1)])
+            .limit(limit + 1)
+        )
+        documents = await result.to_list(length=limit + 1)
+        if len(documents) <= limit:
+            return documents, None
+        documents = documents[:limit]
+        return documents, self._encode_cursor(documents[-1])
+
+    async def iterate_documents(
+        self, filter: dict, batch_size: int = 1000
+    ) -> AsyncIterator[dict]:
+        """
+        Iterate over all documents matching a filter, newest first,
+        without loading them into memory at once.
+        """
+
+        cursor = self._find(filter).batch_size(batch_size)
+        async for document in cursor:
+            yield document
+
+    async def get_documents_after(
+        self,
+        value: datetime | None,
+        document_id: ObjectId | None = None,
+        limit: int = 1000,
+    ) -> list[dict]:
+        """
+        Find documents after (value, document_id) in (order_by, _id)
+        order, to scan a whole collection in batches.
+        Without a document_id all documents from value on are found.
+        """
+
+        filter = {}
+        if document_id is not None:
+            filter = {
+                "$or": [
+                    {self.order_by: {"$gt": value}},
+                    {self.order_by: value, "_id": {"$gt": document_id}},
+                ]
+            }
+        elif value is not None:
+            filter = {self.order_by: {"$gte": value}}
+        result = (
+            self.collection.find(filter)
+            .sort([(self.order_by, 1), ("_id", 1)])
+            .limit(limit)
+        )
+        return await result.to_list(length=limit)
+
+    async def get_existing_ids(
+        self, document_ids: list[ObjectId], filter: dict
+    ) -> set[ObjectId]:
+        """
+        Find which of the ids are stored in documents matching a filter.
+        """
+
+        cursor = self.collection.find(
+            {**filter, "_id": {"$in": document_ids}}, projection={"_id": 1}
+        )
+        return {document["_id"] async for document in cursor}
+
     async def _get_documents_by_filter(
         self, filter: dict, limit: int = 100, order_by: str | None = None
     ) -> list[dict]:
@@ -39,9 +262,7 @@ class BaseRepository:
         Optionally accepts a limit, defaults to 100.
         """
 
-        result = self.collection.find(filter, limit=limit).sort(
-            order_by or self.order_by, self.order
-        )
+        result = self._find(filter, limit, order_by)
         return await result.to_list(length=limit)
 
     async def create_document(self, document: dict) -> ObjectId:
@@ -52,6 +273,16 @@ class BaseRepository:
         result: InsertOneResult = await self.collection.insert_one(document)
         return result.inserted_id
 
+    async def create_documents(self, documents: list[dict]) -> list[ObjectId]:
+        """
+        Create many documents with a single insert and return inserted_ids.
+        """
+
+        if not documents:
+            return []
+        result: InsertManyResult = await self.collection.insert_many(documents)
+        return result.inserted_ids
+
     async def get_document_by_id(self, document_id: str) -> dict | None:
         """
         Find a document by id and return it.
@@ -75,22 +306,22 @@ class BaseRepository:
         Optionally accepts a limit, defaults to 100.
         """
 
-        result = self.collection.find({field: value}, limit=limit).sort(
-            order_by or self.order_by, order or self.order
-        )
+        result = self._find({field: value}, limit, order_by, order)
         return await result.to_list(length=limit)
 
     async def get_documents_by_fields(
-        self, limit: int = 100, order_by: str | None = None, order: int = -1, **fields: dict
+        self,
+        limit: int = 100,
+        order_by: str | None = None,
+        order: int = -1,
+        **fields: dict,
     ) -> list[dict]:
         """
         Find documents by fields and return them.
         Optionally accepts a limit, defaults to 100.
         """
 
-        result = self.collection.find(fields).sort(
-            order_by or self.order_by, order or self.order
-        )
+        result = self._find(fields, limit, order_by, order)
         return await result.to_list(length=limit)
 
     async def get_all_documents(
@@ -101,9 +332,7 @@ class BaseRepository:
         Optionally accepts a limit, defaults to 100.
         """
 
-        result = self.collection.find({}, limit=limit).sort(
-            order_by or self.order_by, self.order
-        )
+        result = self._find({}, limit, order_by)
         return await result.to_list(length=limit)
 
     async def update_document_by_id(
@@ -121,6 +350,24 @@ class BaseRepository:
         )
         return result
 
+    async def update_documents_by_id(self, documents: dict[str, dict]) -> int:
+        """
+        Update many documents by id with a single bulk write.
+        Accepts a mapping of document id to the fields to set,
+        returns the number of modified documents.
+        """
+
+        if not documents:
+            return 0
+        result: BulkWriteResult = await self.collection.bulk_write(
+            [
+                UpdateOne({"_id": self._get_id(document_id)}, {"$set": fields})
+                for document_id, fields in documents.items()
+            ],
+            ordered=False,
+        )
+        return result.modified_count
+
     async def delete_document_by_id(self, document_id: str) -> dict | None:
         """
         Delete a document by id and return it.
@@ -130,3 +377,11 @@ class BaseRepository:
             {"_id": self._get_id(document_id)}
         )
         return result
+
+    async def delete_documents(self, filter: dict) -> int:
+        """
+        Delete documents by filter and return their number.
+        """
+
+        result: DeleteResult = await self.collection.delete_many(filter)
+        return result.deleted_count
@@ -0,0 +1,112 @@
+from datetime import datetime
+from bson.decimal128 import Decimal128
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+
+from app.repositories import BaseRepository
+from app.schemas import CandleDB
+
+
+class CandleRepository(BaseRepository):
+    collection_name = "candles"
+    order_by = "openTime"
+    # One candle per symbol, interval and open time, upserts rely on it
+    unique_indexes = [
+        [
+            ("symbol", ASCENDING),
+            ("interval", ASCENDING),
+            ("openTime", ASCENDING),
+        ],
+    ]
+
+    def _get_key(self, candle: CandleDB) -> dict:
+        return {
+            "symbol": candle.symbol,
+            "interval": candle.interval,
+            "openTime": candle.open_time,
+        }
+
+    async def merge_candle(self, candle: CandleDB) -> CandleDB:
+        """
+        Merge a candle of new trades into the stored one of the same
+        symbol, interval and open time with a single atomic upsert,
+        and return the merged candle.
+        """
+
+        result = await self.collection.find_one_and_update(
+            self._get_key(candle),
+            {
+                "$setOnInsert": {"open": Decimal128(candle.open)},
+                "$max": {"high": Decimal128(candle.high)},
+                "$min": {"low": Decimal128(candle.low)},
+                "$set": {"close": Decimal128(candle.close)},
+                "$inc": {
+                    "volume": Decimal128(candle.volume),
+                    "trades": candle.trades,
+                },
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return CandleDB.from_document(result)
+
+    async def replace_candles(self, candles: list[CandleDB]) -> int:
+        """
+        Store candles built from scratch, replacing the stored ones
+        with the same key, with a single bulk write.
+        Returns the number of inserted and modified candles.
+        """
+
+        if not candles:
+            return 0
+        requests = []
+        for candle in candles:
+            document = candle.to_dict()
+            del document["_id"]
+            requests.append(
+                UpdateOne(
+                    self._get_key(candle), {"$set": document}, upsert=True
+                )
+            )
+        result = await self.collection.bulk_write(
+            requests,
+            ordered=False,
+        )
+        return result.upserted_count + result.modified_count
+
+    async def get_candles(
+        self,
+        symbol: str,
+        interval: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = 500,
+    ) -> list[CandleDB]:
+        """
+        Find candles of a symbol and interval opened in [start, end),
+        oldest first. Without start the latest limit candles are returned.
+        """
+
+        filter = {"symbol": symbol, "interval": interval}
+        open_time = {}
+        if start is not None:
+            open_time["$gte"] = start
+        if end is not None:
+            open_time["$lt"] = end
+        if open_time:
+            filter["openTime"] = open_time
+        order = ASCENDING if start is not None else DESCENDING
+        result = await self._find(filter, limit, order=order).to_list(
+            length=limit
+        )
+        candles = [CandleDB.from_document(candle) for candle in result]
+        return candles if start is not None else candles[::-1]
+
+    async def get_last_candle(
+        self, symbol: str, interval: str
+    ) -> CandleDB | None:
+        """
+        Find the latest candle of a symbol and interval.
+        """
+
+        result = await self.get_candles(symbol, interval, limit=1)
+        return result[0] if result else None
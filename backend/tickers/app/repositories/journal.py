@@ -0,0 +1,149 @@
+from datetime import datetime
+from typing import AsyncIterator
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError
+
+from app.repositories import BaseRepository
+from app.schemas import BookSnapshotDB, OrderDB, OrderEventDB
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+class OrderEventRepository(BaseRepository):
+    collection_name = "order_events"
+    order_by = "sequence"
+    indexes = [[("symbol", ASCENDING), ("sequence", ASCENDING)]]
+
+    async def create_events(self, documents: list[dict]) -> None:
+        """
+        Append event documents of any symbols with a single insert.
+        Events already stored by a failed insert are skipped,
+        so a failed insert can be retried as it is.
+        """
+
+        try:
+            await self.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            if e.details.get("writeConcernErrors") or any(
+                error["code"] != DUPLICATE_KEY_ERROR
+                for error in e.details["writeErrors"]
+            ):
+                raise
+
+    async def iterate_events(
+        self, symbol: str, after: int = 0
+    ) -> AsyncIterator[OrderEventDB]:
+        """
+        Iterate over events of a symbol after a sequence, in order.
+        """
+
+        cursor = self._find(
+            {"symbol": symbol, "sequence": {"$gt": after}}, order=ASCENDING
+        ).batch_size(1000)
+        async for event in cursor:
+            yield OrderEventDB.from_document(event)
+
+    async def get_symbols(self) -> list[str]:
+        return await self.collection.distinct("symbol")
+
+    async def delete_events(self, symbol: str, until: int) -> int:
+        """
+        Delete events of a symbol up to a sequence, covered by a snapshot.
+        """
+
+        return await self.delete_documents(
+            {"symbol": symbol, "sequence": {"$lte": until}}
+        )
+
+
+class BookSnapshotRepository(BaseRepository):
+    collection_name = "order_book_snapshots"
+    order_by = "sequence"
+    indexes = [
+        [
+            ("symbol", ASCENDING),
+            ("sequence", DESCENDING),
+            ("snapshotId", ASCENDING),
+            ("part", ASCENDING),
+        ]
+    ]
+
+    async def create_snapshot(
+        self,
+        symbol: str,
+        sequence: int,
+        orders: list[dict],
+        chunk_size: int,
+    ) -> None:
+        """
+        Store a snapshot of order documents split into parts
+        of chunk_size orders, an empty book is stored as one part.
+        """
+
+        chunks = [
+            orders[start:end]
+            for start, end in zip(
+                range(0, len(orders), chunk_size),
+                range(chunk_size, len(orders) + chunk_size, chunk_size),
+            )
+        ] or [[]]
+        snapshot_id = ObjectId()
+        created_at = datetime.utcnow()
+        await self.create_documents(
+            [
+                {
+                    "_id": ObjectId(),
+                    "snapshotId": snapshot_id,
+                    "symbol": symbol,
+                    "sequence": sequence,
+                    "part": part,
+                    "parts": len(chunks),
+                    "orders": chunk,
+                    "createdAt": created_at,
+                }
+                for part, chunk in enumerate(chunks)
+            ]
+        )
+
+    async def get_latest_snapshot(
+        self, symbol: str
+    ) -> tuple[int, list[OrderDB]] | None:
+        """
+        Find the latest complete snapshot of a symbol and return
+        its sequence and orders. Snapshots interrupted while they were
+        written are skipped, also if a later snapshot has the same sequence.
+        """
+
+        self._check_index(
+            {"symbol": symbol}, ("sequence", "snapshotId", "part")
+        )
+        cursor = self.collection.find({"symbol": symbol}).sort(
+            [
+                ("sequence", DESCENDING),
+                ("snapshotId", ASCENDING),
+                ("part", ASCENDING),
+            ]
+        )
+        snapshot_id, parts = None, []
+        async for document in cursor:
+            snapshot = BookSnapshotDB.from_document(document)
+            if snapshot.snapshot_id != snapshot_id:
+                snapshot_id, parts = snapshot.snapshot_id, []
+            parts.append(snapshot)
+            if len(parts) == snapshot.parts:
+                orders = [order for part in parts for order in part.orders]
+                return snapshot.sequence, orders
+        return None
+
+    async def get_symbols(self) -> list[str]:
+        return await self.collection.distinct("symbol")
+
+    async def delete_snapshots(self, symbol: str, before: int) -> int:
+        """
+        Delete snapshots of a symbol older than a sequence.
+        """
+
+        return await self.delete_documents(
+            {"symbol": symbol, "sequence": {"$lt": before}}
+        )
@@ -1,10 +1,34 @@
-from typing import Literal
+from typing import AsyncIterator, Literal
+from pymongo import ASCENDING, DESCENDING
+
 from app.repositories import BaseRepository
 from app.schemas import OrderDB, OrderUpdate
 
 
 class OrderRepository(BaseRepository):
     collection_name = "orders"
+    indexes = [
+        [
+            ("symbol", ASCENDING),
+            ("side", ASCENDING),
+            ("status", ASCENDING),
+            ("price", ASCENDING),
+            ("createdAt", ASCENDING),
+        ],
+        [("status", ASCENDING), ("createdAt", ASCENDING)],
+        # Pages of a user are sorted on (createdAt, _id)
+        [
+            ("userId", ASCENDING),
+            ("createdAt", DESCENDING),
+            ("_id", DESCENDING),
+        ],
+        [
+            ("userId", ASCENDING),
+            ("symbol", ASCENDING),
+            ("createdAt", DESCENDING),
+            ("_id", DESCENDING),
+        ],
+    ]
 
     async def create_order(self, order: OrderDB) -> OrderDB:
         """
@@ -21,7 +45,7 @@ class OrderRepository(BaseRepository):
         """
 
         result = await self.get_document_by_id(order_id)
-        return OrderDB(**result) if result else None
+        return OrderDB.from_document(result) if result else None
 
     async def get_orders_by_user_id(
         self, user_id: str, limit: int = 100
@@ -32,7 +56,30 @@ class OrderRepository(BaseRepository):
         """
 
         result = await self.get_documents_by_field("userId", user_id, limit)
-        return [OrderDB(**order) for order in result]
+        return [OrderDB.from_document(order) for order in result]
+
+    async def get_orders_page_by_user_id(
+        self, user_id: str, limit: int = 100, cursor: str | None = None
+    ) -> tuple[list[OrderDB], str | None]:
+        """
+        Find one page of orders by user_id, newest first.
+        Returns the orders and the cursor of the next page.
+        """
+
+        result, next_cursor = await self.get_documents_page(
+            {"userId": user_id}, limit, cursor
+        )
+        return [OrderDB.from_document(order) for order in result], next_cursor
+
+    async def iterate_orders_by_user_id(
+        self, user_id: str
+    ) -> AsyncIterator[OrderDB]:
+        """
+        Iterate over all orders of a user, newest first.
+        """
+
+        async for order in self.iterate_documents({"userId": user_id}):
+            yield OrderDB.from_document(order)
 
     async def get_orders_by_symbol(
         self, symbol: str, limit: int = 100
@@ -43,7 +90,7 @@ class OrderRepository(BaseRepository):
         """
 
         result = await self.get_documents_by_field("symbol", symbol, limit)
-        return [OrderDB(**order) for order in result]
+        return [OrderDB.from_document(order) for order in result]
 
     async def get_orders_by_status(
         self, status: Literal["open", "closed", "canceled"], limit: int = 100
@@ -54,7 +101,7 @@ class OrderRepository(BaseRepository):
         """
 
         result = await self.get_documents_by_field("status", status, limit)
-        return [OrderDB(**order) for order in result]
+        return [OrderDB.from_document(order) for order in result]
 
     async def get_orders_by_type(
         self, type: Literal["market", "limit"], limit: int = 100
@@ -65,7 +112,7 @@ class OrderRepository(BaseRepository):
         """
 
         result = await self.get_documents_by_field("type", type, limit)
-        return [OrderDB(**order) for order in result]
+        return [OrderDB.from_document(order) for order in result]
 
     async def get_orders_by_side(
         self, side: Literal["buy", "sell"], limit: int = 100
@@ -76,7 +123,7 @@ class OrderRepository(BaseRepository):
         """
 
         result = await self.get_documents_by_field("side", side, limit)
-        return [OrderDB(**order) for order in result]
+        return [OrderDB.from_document(order) for order in result]
 
     async def get_orders_by_status_and_side_and_symbol(
         self,
@@ -94,11 +141,26 @@ class OrderRepository(BaseRepository):
         """
 
         result = await self.get_documents_by_fields(
-            limit, status=status, side=side, symbol=symbol, order_by=order_by, order=order
+            limit,
+            status=status,
+            side=side,
+            symbol=symbol,
+            order_by=order_by,
+            order=order,
         )
         if json:
-            return [OrderDB(**order).to_json() for order in result]
-        return [OrderDB(**order) for order in result]
+            return [OrderDB.from_document(order).to_json() for order in result]
+        return [OrderDB.from_document(order) for order in result]
+
+    async def get_open_orders(self) -> list[OrderDB]:
+        """
+        Find all open orders and return them, oldest first.
+        """
+
+        result = await self.get_documents_by_fields(
+            None, order=1, status="open"
+        )
+        return [OrderDB.from_document(order) for order in result]
 
     async def get_orders_by_symbol_and_user_id(
         self, symbol: str, user_id: str, limit: int = 100
@@ -111,7 +173,7 @@ class OrderRepository(BaseRepository):
         result = await self.get_documents_by_fields(
             limit, **{"symbol": symbol, "userId": user_id}
         )
-        return [OrderDB(**order) for order in result]
+        return [OrderDB.from_document(order) for order in result]
 
     async def get_orders_by_symbol_and_filter(
         self, symbol: str, filter: dict, limit: int = 100
@@ -124,7 +186,7 @@ class OrderRepository(BaseRepository):
         result = await self.get_documents_by_fields(
             limit, **{"symbol": symbol, **filter}
         )
-        return [OrderDB(**order) for order in result]
+        return [OrderDB.from_document(order) for order in result]
 
     async def get_all_orders(self, limit: int = 100) -> list[OrderDB]:
         """
@@ -133,7 +195,7 @@ class OrderRepository(BaseRepository):
         """
 
         result = await self.get_all_documents(limit)
-        return [OrderDB(**order) for order in result]
+        return [OrderDB.from_document(order) for order in result]
 
     async def update_order_by_id(
         self, order_id: str, order: OrderUpdate | dict
@@ -148,7 +210,25 @@ class OrderRepository(BaseRepository):
         result = await self.update_document_by_id(
             order_id, order, return_updated=True
         )
-        return OrderDB(**result) if result else None
+        return OrderDB.from_document(result) if result else None
+
+    async def update_orders(self, orders: list[OrderDB]) -> int:
+        """
+        Write the execution state of many orders with a single bulk write
+        and return the number of modified orders.
+        """
+
+        result = await self.update_documents_by_id(
+            {
+                order.id: OrderUpdate(
+                    executed_qty=order.executed_qty,
+                    status=order.status,
+                    ended_at=order.ended_at,
+                ).to_dict(exclude_none=True)
+                for order in orders
+            }
+        )
+        return result
 
     async def delete_order_by_id(self, order_id: str) -> OrderDB | None:
         """
@@ -156,4 +236,4 @@ class OrderRepository(BaseRepository):
         """
 
         result = await self.delete_document_by_id(order_id)
-        return OrderDB(**result) if result else None
+        return OrderDB.from_document(result) if result else None
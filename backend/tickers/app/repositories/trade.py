@@ -1,9 +1,60 @@
+from datetime import datetime
+from typing import AsyncIterator
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING
+
+from app.core import settings
 from app.repositories import BaseRepository
-from app.schemas import TradeDB
+from app.schemas import CANDLE_INTERVALS, CandleDB, TradeDB
+
+TIMESERIES_COLLECTION_NAME = "trades_timeseries"
 
 
 class TradeRepository(BaseRepository):
+    """
+    Trades are stored one document per trade, or in a native time-series
+    collection where the server packs the trades of a symbol into
+    buckets. Trades are never updated, so both storages serve
+    the same queries.
+    """
+
     collection_name = "trades"
+    # Pages are sorted on (createdAt, _id)
+    indexes = [
+        [
+            ("symbol", ASCENDING),
+            ("createdAt", DESCENDING),
+            ("_id", DESCENDING),
+        ],
+        [
+            ("users.userId", ASCENDING),
+            ("createdAt", DESCENDING),
+            ("_id", DESCENDING),
+        ],
+        [
+            ("users.userId", ASCENDING),
+            ("symbol", ASCENDING),
+            ("createdAt", DESCENDING),
+            ("_id", DESCENDING),
+        ],
+        [("orders", ASCENDING), ("createdAt", DESCENDING)],
+    ]
+
+    def __init__(
+        self,
+        client: AsyncIOMotorClient | None = None,
+        collection_name: str | None = None,
+        storage: str | None = None,
+    ) -> None:
+        self.storage = storage or settings.TRADE_STORAGE
+        if self.storage == "timeseries":
+            self.timeseries = {
+                "timeField": "createdAt",
+                "metaField": "symbol",
+                "granularity": settings.TRADE_TIMESERIES_GRANULARITY,
+            }
+            collection_name = collection_name or TIMESERIES_COLLECTION_NAME
+        super().__init__(client, collection_name)
 
     async def create_trade(self, trade: TradeDB) -> TradeDB:
         """
@@ -14,13 +65,22 @@ class TradeRepository(BaseRepository):
         trade = await self.get_trade_by_id(result)
         return trade
 
+    async def create_trades(self, trades: list[TradeDB]) -> list[TradeDB]:
+        """
+        Create many trades with a single insert and return them.
+        Trade ids are generated on creation, so they are not read back.
+        """
+
+        await self.create_documents([trade.to_dict() for trade in trades])
+        return trades
+
     async def get_trade_by_id(self, trade_id: str) -> TradeDB | None:
         """
         Find an trade by id and return it.
         """
 
         result = await self.get_document_by_id(trade_id)
-        return TradeDB(**result) if result else None
+        return TradeDB.from_document(result) if result else None
 
     async def get_trades_by_symbol(
         self, symbol: str, limit: int = 100
@@ -33,7 +93,54 @@ class TradeRepository(BaseRepository):
         result = await self.get_documents_by_field(
             "symbol", symbol, limit, order_by="createdAt", order=1
         )
-        return [TradeDB(**trade) for trade in result]
+        return [TradeDB.from_document(trade) for trade in result]
+
+    async def get_trades_page_by_symbol(
+        self, symbol: str, limit: int = 100, cursor: str | None = None
+    ) -> tuple[list[TradeDB], str | None]:
+        """
+        Find one page of trades by symbol, newest first.
+        Returns the trades and the cursor of the next page.
+        """
+
+        result, next_cursor = await self.get_documents_page(
+            {"symbol": symbol}, limit, cursor
+        )
+        return [TradeDB.from_document(trade) for trade in result], next_cursor
+
+    def _get_user_filter(self, user_id: str, symbol: str | None) -> dict:
+        filter = {"users.userId": user_id}
+        if symbol is not None:
+            filter["symbol"] = symbol
+        return filter
+
+    async def get_trades_page_by_user_id(
+        self,
+        user_id: str,
+        symbol: str | None = None,
+        limit: int = 100,
+        cursor: str | None = None,
+    ) -> tuple[list[TradeDB], str | None]:
+        """
+        Find one page of trades by user_id and optionally symbol,
+        newest first. Returns the trades and the cursor of the next page.
+        """
+
+        result, next_cursor = await self.get_documents_page(
+            self._get_user_filter(user_id, symbol), limit, cursor
+        )
+        return [TradeDB.from_document(trade) for trade in result], next_cursor
+
+    async def iterate_trades_by_user_id(
+        self, user_id: str, symbol: str | None = None
+    ) -> AsyncIterator[TradeDB]:
+        """
+        Iterate over all trades of a user, newest first.
+        """
+
+        filter = self._get_user_filter(user_id, symbol)
+        async for trade in self.iterate_documents(filter):
+            yield TradeDB.from_document(trade)
 
     async def get_trades_by_order_id(
         self, order_id: str, limit: int = 100
@@ -46,7 +153,7 @@ class TradeRepository(BaseRepository):
         result = await self.get_documents_by_field(
             "orders", self._get_id(order_id), limit
         )
-        return [TradeDB(**trade) for trade in result]
+        return [TradeDB.from_document(trade) for trade in result]
 
     async def get_trades_by_user_id(
         self, user_id: str, limit: int = 100
@@ -59,7 +166,7 @@ class TradeRepository(BaseRepository):
         result = await self.get_documents_by_field(
             "users.userId", user_id, limit
         )
-        return [TradeDB(**trade) for trade in result]
+        return [TradeDB.from_document(trade) for trade in result]
 
     async def get_trades_by_symbol_and_user_id(
         self, symbol: str, user_id: str, limit: int = 100
@@ -72,7 +179,7 @@ class TradeRepository(BaseRepository):
         result = await self._get_documents_by_filter(
             {"symbol": symbol, "users.userId": user_id}, limit
         )
-        return [TradeDB(**trade) for trade in result]
+        return [TradeDB.from_document(trade) for trade in result]
 
     async def get_trades_by_order_id_and_user_id(
         self, order_id: str, user_id: str, limit: int = 100
@@ -85,7 +192,7 @@ class TradeRepository(BaseRepository):
         result = await self._get_documents_by_filter(
             {"orders": self._get_id(order_id), "users.userId": user_id}, limit
         )
-        return [TradeDB(**trade) for trade in result]
+        return [TradeDB.from_document(trade) for trade in result]
 
     async def get_trades_by_symbol_and_user_id_and_order_id(
         self, symbol: str, user_id: str, order_id: str, limit: int = 100
@@ -103,7 +210,7 @@ class TradeRepository(BaseRepository):
             },
             limit,
         )
-        return [TradeDB(**trade) for trade in result]
+        return [TradeDB.from_document(trade) for trade in result]
 
     async def get_all_trades(self, limit: int = 100) -> list[TradeDB]:
         """
@@ -112,4 +219,90 @@ class TradeRepository(BaseRepository):
         """
 
         result = await self.get_all_documents(limit)
-        return [TradeDB(**trade) for trade in result]
+        return [TradeDB.from_document(trade) for trade in result]
+
+    async def get_symbols(self, since: datetime | None = None) -> list[str]:
+        """
+        Find the symbols traded since a time, or ever.
+        """
+
+        filter = {"createdAt": {"$gte": since}} if since is not None else {}
+        return await self.collection.distinct("symbol", filter)
+
+    async def get_last_trade_time(self) -> datetime | None:
+        """
+        Find the time of the newest trade, with one indexed lookup
+        per symbol.
+        """
+
+        times = []
+        for symbol in await self.get_symbols():
+            trade = await self.collection.find_one(
+                {"symbol": symbol},
+                projection={"createdAt": 1},
+                sort=[("createdAt", DESCENDING)],
+            )
+            if trade is not None:
+                times.append(trade["createdAt"])
+        return max(times, default=None)
+
+    async def aggregate_candles(
+        self, symbol: str | None, interval: str, since: datetime
+    ) -> AsyncIterator[CandleDB]:
+        """
+        Build candles of a symbol, or of all symbols if None, from trades
+        since a time with an aggregation pipeline on the server.
+        Trades are bucketed by createdAt floored to the interval,
+        candles are ordered by symbol and open time.
+        """
+
+        milliseconds = CANDLE_INTERVALS[interval] * 1000
+        filter = {"createdAt": {"$gte": since}}
+        if symbol is not None:
+            filter["symbol"] = symbol
+        pipeline = [
+            {"$match": filter},
+            {"$sort": {"createdAt": ASCENDING}},
+            {
+                "$group": {
+                    "_id": {
+                        "symbol": "$symbol",
+                        "openTime": {
+                            "$subtract": [
+                                "$createdAt",
+                                {
+                                    "$mod": [
+                                        {"$toLong": "$createdAt"},
+                                        milliseconds,
+                                    ]
+                                },
+                            ]
+                        },
+                    },
+                    "open": {"$first": "$price"},
+                    "high": {"$max": "$price"},
+                    "low": {"$min": "$price"},
+                    "close": {"$last": "$price"},
+                    "volume": {"$sum": "$qty"},
+                    "trades": {"$sum": 1},
+                }
+            },
+            {"$sort": {"_id.symbol": ASCENDING, "_id.openTime": ASCENDING}},
+            {
+                "$project": {
+                    "_id": 0,
+                    "symbol": "$_id.symbol",
+                    "interval": {"$literal": interval},
+                    "openTime": "$_id.openTime",
+                    "open": 1,
+                    "high": 1,
+                    "low": 1,
+                    "close": 1,
+                    "volume": 1,
+                    "trades": 1,
+                }
+            },
+        ]
+        cursor = self.collection.aggregate(pipeline, allowDiskUse=True)
+        async for candle in cursor:
+            yield CandleDB.from_document(candle)
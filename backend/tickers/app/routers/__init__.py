@@ -1,2 +1,5 @@
 from app.routers.order import router as order_router  # noqa: F401
 from app.routers.trade import router as trade_router  # noqa: F401
+from app.routers.metrics import router as metrics_router  # noqa: F401
+from app.routers.candle import router as candle_router  # noqa: F401
+from app.routers.ticker import router as ticker_router  # noqa: F401
@@ -0,0 +1,34 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query, status
+
+from app.core.dependencies import get_candle_service
+from app.schemas import CandleInterval, CandleResponse
+from app.services import CandleService
+
+router = APIRouter(prefix="/candles", tags=["candles"])
+
+
+@router.get(
+    "/{symbol}",
+    summary="Get candles by symbol",
+    description="Get OHLCV candles of a symbol and return them.",
+    response_model=list[CandleResponse],
+    status_code=status.HTTP_200_OK,
+)
+async def get_candles_by_symbol(
+    symbol: str,
+    interval: CandleInterval = "1m",
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = Query(500, ge=1, le=1000),
+    candle_service: CandleService = Depends(get_candle_service),
+) -> list[CandleResponse]:
+    """
+    Get candles of a symbol and interval opened in [start, end),
+    oldest first. Without start the latest candles are returned.
+    Times are UTC.
+    """
+
+    return await candle_service.get_candles(
+        symbol, interval, start, end, limit
+    )
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, Header, status
+
+from app.core.dependencies import (
+    get_http_client,
+    get_order_books,
+    get_order_journal,
+)
+from app.core.http import HTTPClient
+from app.core.utils import check_superuser
+from app.engine import OrderBookManager, OrderJournal
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get(
+    "/http",
+    summary="Get HTTP client pool metrics",
+    description="Get request counters and usage of the HTTP client pool.",
+    status_code=status.HTTP_200_OK,
+)
+async def get_http_metrics(
+    http_client: HTTPClient = Depends(get_http_client),
+    authorization: str | None = Header(None, alias="Authorization"),
+    http_bearer: str | None = Header(None, alias="HTTPBearer"),
+) -> dict[str, int | float]:
+    """
+    Get request counters and usage of the HTTP client pool.
+    Only for superusers.
+    """
+
+    await check_superuser(authorization, http_bearer)
+    return http_client.get_metrics()
+
+
+@router.get(
+    "/journal",
+    summary="Get order journal metrics",
+    description="Get write counters and batch size of the order journal.",
+    status_code=status.HTTP_200_OK,
+)
+async def get_journal_metrics(
+    order_journal: OrderJournal = Depends(get_order_journal),
+    authorization: str | None = Header(None, alias="Authorization"),
+    http_bearer: str | None = Header(None, alias="HTTPBearer"),
+) -> dict[str, int | float]:
+    """
+    Get write counters and batch size of the order journal.
+    Only for superusers.
+    """
+
+    await check_superuser(authorization, http_bearer)
+    return order_journal.get_metrics()
+
+
+@router.get(
+    "/matching",
+    summary="Get matching worker metrics",
+    description="Get queue and error counters of the matching workers.",
+    status_code=status.HTTP_200_OK,
+)
+async def get_matching_metrics(
+    order_books: OrderBookManager = Depends(get_order_books),
+    authorization: str | None = Header(None, alias="Authorization"),
+    http_bearer: str | None = Header(None, alias="HTTPBearer"),
+) -> dict[str, dict[str, int | str | None]]:
+    """
+    Get queue and error counters of the matching worker of every symbol,
+    with the last error of each worker.
+    Only for superusers.
+    """
+
+    await check_superuser(authorization, http_bearer)
+    return order_books.get_metrics()
@@ -1,14 +1,20 @@
-from fastapi import APIRouter, Depends, Header, status, BackgroundTasks
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.responses import StreamingResponse
 
-from app.core.dependencies import get_order_service, get_trade_service
+from app.core.dependencies import get_order_service
 from app.core.utils import get_current_user
 from app.schemas import (
     OrderCreateRequest,
     OrderResponseSchema,
-    OrderLastResponseSchema,
+    OrderBookDepthSchema,
+)
+from app.engine import order_books
+from app.services import OrderService
+from app.routers.utils import (
+    NEXT_CURSOR_HEADER,
+    reserve_order_balance,
+    stream_ndjson,
 )
-from app.services import OrderService, TradeService
-from app.routers.utils import execute_order, update_user_balance
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
@@ -21,49 +27,66 @@ router = APIRouter(prefix="/orders", tags=["orders"])
     status_code=status.HTTP_201_CREATED,
 )
 async def create_order(
-    background_tasks: BackgroundTasks,
     order: OrderCreateRequest,
     order_service: OrderService = Depends(get_order_service),
-    trade_service: TradeService = Depends(get_trade_service),
     authorization: str | None = Header(None, alias="Authorization"),
     http_bearer: str | None = Header(None, alias="HTTPBearer"),
 ) -> OrderResponseSchema:
     """
     Create a new order and return the created order.
+    The order is matched by the worker of its symbol,
+    responds with 503 if that worker has too many pending orders.
+    A queue slot is reserved before the balance, so a full queue
+    rejects the order before anything is reserved or stored.
     """
 
-    user = await update_user_balance(order, authorization, http_bearer)
-    order.user_id = user.id
-    result = await order_service.create_order(order)
-    background_tasks.add_task(
-        execute_order, result, order_service, trade_service
-    )
+    order.user_id = await get_current_user(authorization, http_bearer)
+    order_books.check_symbol(order.symbol)
+    order_books.reserve(order.symbol)
+    try:
+        await reserve_order_balance(order)
+        result = await order_service.create_order(order)
+    except BaseException:
+        order_books.release(order.symbol)
+        raise
+    order_books.submit(result.copy())
     return result
 
 
 @router.get(
     "/last/{symbol}",
-    summary="Get last orders by symbol",
-    description="Get last orders by symbol and return the orders.",
-    response_model=OrderLastResponseSchema,
+    summary="Get order book depth by symbol",
+    description="Get remaining qty of the best price levels by symbol.",
+    response_model=OrderBookDepthSchema,
     status_code=status.HTTP_200_OK,
 )
 async def get_last_orders_by_symbol(
     symbol: str,
     limit: int = 10,
-    order_service: OrderService = Depends(get_order_service),
-) -> OrderLastResponseSchema:
+) -> dict:
     """
-    Get last orders by symbol and return the orders.
+    Get order book depth by symbol, served from the in-memory book.
     """
 
-    buy_orders = await order_service.get_open_buy_orders_by_symbol(
-        symbol=symbol, limit=limit
-    )
-    sell_orders = await order_service.get_open_sell_orders_by_symbol(
-        symbol=symbol, limit=limit
-    )
-    return OrderLastResponseSchema(buy=buy_orders, sell=sell_orders)
+    order_books.check_symbol(symbol)
+    return order_books.get_snapshot(symbol, limit)
+
+
+@router.get(
+    "/book/{symbol}",
+    summary="Get order book snapshot by symbol",
+    description="Get all price levels and the sequence of the last delta.",
+    response_model=OrderBookDepthSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def get_order_book_by_symbol(symbol: str) -> dict:
+    """
+    Get full order book depth by symbol. Order book deltas sent to
+    websocket after the returned sequence can be applied on top of it.
+    """
+
+    order_books.check_symbol(symbol)
+    return order_books.get_snapshot(symbol)
 
 
 @router.get(
@@ -74,19 +97,51 @@ async def get_last_orders_by_symbol(
     status_code=status.HTTP_200_OK,
 )
 async def get_orders_by_user_id(
-    limit: int = 100,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
     order_service: OrderService = Depends(get_order_service),
     authorization: str | None = Header(None, alias="Authorization"),
     http_bearer: str | None = Header(None, alias="HTTPBearer"),
 ) -> list[OrderResponseSchema]:
     """
-    Get orders by user id and return the orders.
+    Get orders by user id and return the orders, newest first.
+    Older orders are paged with the cursor from the X-Next-Cursor header.
     """
 
     user_id = await get_current_user(
         authorization=authorization, http_bearer=http_bearer
     )
-    return await order_service.get_user_orders(user_id, limit=limit)
+    orders, next_cursor = await order_service.get_user_orders_page(
+        user_id, limit=limit, cursor=cursor
+    )
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return orders
+
+
+@router.get(
+    "/user/{user_id}/export",
+    summary="Export orders by user id",
+    description="Stream all orders of the user as newline delimited JSON.",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def export_orders_by_user_id(
+    order_service: OrderService = Depends(get_order_service),
+    authorization: str | None = Header(None, alias="Authorization"),
+    http_bearer: str | None = Header(None, alias="HTTPBearer"),
+) -> StreamingResponse:
+    """
+    Stream all orders of the user as newline delimited JSON.
+    """
+
+    user_id = await get_current_user(
+        authorization=authorization, http_bearer=http_bearer
+    )
+    return stream_ndjson(
+        order_service.iterate_user_orders(user_id), OrderResponseSchema
+    )
 
 
 @router.get(
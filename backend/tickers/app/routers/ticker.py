@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, status
+
+from app.core.dependencies import get_ticker_manager
+from app.engine import TickerManager
+from app.schemas import TickerResponse
+
+router = APIRouter(prefix="/tickers", tags=["tickers"])
+
+
+@router.get(
+    "",
+    summary="Get tickers",
+    description="Get 24h statistics of all traded symbols.",
+    response_model=list[TickerResponse],
+    status_code=status.HTTP_200_OK,
+)
+async def get_tickers(
+    tickers: TickerManager = Depends(get_ticker_manager),
+) -> list[TickerResponse]:
+    """
+    Get last price and 24h change, high, low and volume of all
+    traded symbols from memory.
+    """
+
+    return tickers.get_tickers()
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, Header, status
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.responses import StreamingResponse
 
 from app.core.dependencies import get_trade_service
 from app.core.utils import get_current_user
 from app.schemas import TradeResponse
 from app.services import TradeService
+from app.routers.utils import NEXT_CURSOR_HEADER, stream_ndjson
 
 router = APIRouter(prefix="/trades", tags=["trades"])
 
@@ -17,14 +19,22 @@ router = APIRouter(prefix="/trades", tags=["trades"])
 )
 async def get_last_trades_by_symbol(
     symbol: str,
-    limit: int = 100,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
     trade_service: TradeService = Depends(get_trade_service),
 ) -> list[TradeResponse]:
     """
-    Get last trades by symbol and return the trades.
+    Get last trades by symbol and return the trades, oldest first.
+    Older trades are paged with the cursor from the X-Next-Cursor header.
     """
 
-    return await trade_service.get_symbol_trades(symbol, limit)
+    trades, next_cursor = await trade_service.get_symbol_trades_page(
+        symbol, limit, cursor
+    )
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return trades[::-1]
 
 
 @router.get(
@@ -35,24 +45,53 @@ async def get_last_trades_by_symbol(
     status_code=status.HTTP_200_OK,
 )
 async def get_trades_by_user_id(
+    response: Response,
     symbol: str = None,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
     trade_service: TradeService = Depends(get_trade_service),
     authorization: str | None = Header(None, alias="Authorization"),
     http_bearer: str | None = Header(None, alias="HTTPBearer"),
 ) -> list[TradeResponse]:
     """
-    Get trades by user id and return the trades.
+    Get trades by user id and return the trades, newest first.
+    Older trades are paged with the cursor from the X-Next-Cursor header.
+    """
+
+    user_id = await get_current_user(
+        authorization=authorization, http_bearer=http_bearer
+    )
+    trades, next_cursor = await trade_service.get_user_trades_page(
+        user_id, symbol, limit, cursor
+    )
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return trades
+
+
+@router.get(
+    "/user/export",
+    summary="Export trades by user id",
+    description="Stream all trades of the user as newline delimited JSON.",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def export_trades_by_user_id(
+    symbol: str = None,
+    trade_service: TradeService = Depends(get_trade_service),
+    authorization: str | None = Header(None, alias="Authorization"),
+    http_bearer: str | None = Header(None, alias="HTTPBearer"),
+) -> StreamingResponse:
+    """
+    Stream all trades of the user as newline delimited JSON.
     """
 
     user_id = await get_current_user(
         authorization=authorization, http_bearer=http_bearer
     )
-    if symbol is not None:
-        return await trade_service.get_symbol_and_user_trades(
-            user_id, symbol, limit
-        )
-    return await trade_service.get_user_trades(user_id, limit)
+    return stream_ndjson(
+        trade_service.iterate_user_trades(user_id, symbol), TradeResponse
+    )
 
 
 @router.get(
@@ -1,39 +1,66 @@
+import asyncio
 from decimal import Decimal
-from fastapi import HTTPException
-import httpx
+from typing import AsyncIterator
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 
 from app.core import settings
-from app.core.exceptions.user import InvalidAuthorizationTokenException
+from app.core.exceptions import (
+    BalanceReservationTimeoutException,
+    NotEnoughBalanceException,
+)
 from app.core.rabbitmq import pika_client
-from app.schemas import OrderDB, UserSchema, TradeDB, NewTradesList, OrderLastResponseSchema
+from app.engine import (
+    Fill,
+    OrderRetryError,
+    candle_writer,
+    order_books,
+    order_journal,
+    tickers,
+)
+from app.schemas import (
+    CandleDB,
+    CandleResponse,
+    OrderDB,
+    TradeDB,
+    NewTradesList,
+)
 from app.services import OrderService, TradeService
 
 
-async def send_last_orders_by_symbol(
-    symbol: str,
-    order_service: OrderService,
-) -> None:
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def stream_ndjson(
+    items: AsyncIterator[BaseModel], schema: type[BaseModel]
+) -> StreamingResponse:
     """
-    Send last orders to websocket queue.
+    Stream items as newline delimited JSON, one line per item.
     """
 
-    last_buy_orders = await order_service.get_open_buy_orders_by_symbol(
-        symbol, limit=10, json=True
-    )
-    last_sell_orders = await order_service.get_open_sell_orders_by_symbol(
-        symbol, limit=10, json=True
-    )
-    message = {
-        "type": "broadcast",
-        "target": "last_orders",
-        "data": OrderLastResponseSchema(
-            buy=last_buy_orders,
-            sell=last_sell_orders,
-        ).to_json(by_alias=True),
-    }
+    async def lines() -> AsyncIterator[str]:
+        async for item in items:
+            yield schema(**item.dict()).json(by_alias=True) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+async def send_order_book_delta(symbol: str) -> None:
+    """
+    Send price levels changed since the previous delta to websocket queue.
+    Nothing is sent if the order book did not change.
+    """
+
+    delta = order_books.get_book(symbol).pop_changes()
+    if delta is None:
+        return
     await pika_client.send_message_to_websocket_queue(
         symbol=symbol,
-        message=message,
+        message={
+            "type": "broadcast",
+            "target": "order_book_delta",
+            "data": delta,
+        },
     )
 
 
@@ -56,20 +83,71 @@ async def send_new_trades(
     )
 
 
-async def send_executed_order(executed_order: OrderDB, qty: Decimal) -> None:
+async def send_candles(symbol: str, candles: list[CandleDB]) -> None:
+    """
+    Send updated candles to websocket queue,
+    decimals are sent as strings like in the candles endpoint.
+    """
+
+    await pika_client.send_message_to_websocket_queue(
+        symbol=symbol,
+        message={
+            "type": "broadcast",
+            "target": "candles",
+            "data": [
+                CandleResponse(**candle.dict()).to_json(by_alias=True)
+                for candle in candles
+            ],
+        },
+    )
+
+
+async def send_ticker(symbol: str, ticker: dict) -> None:
+    """
+    Send the 24h ticker of a symbol to websocket queue.
+    """
+
+    await pika_client.send_message_to_websocket_queue(
+        symbol=symbol,
+        message={
+            "type": "broadcast",
+            "target": "ticker",
+            "data": ticker,
+        },
+    )
+
+
+def _get_balance_key(order: OrderDB) -> tuple[str, str]:
+    to_buy, to_sell = order.symbol.split("-")
+    currency = to_buy if order.side == "buy" else to_sell
+    return order.user_id, currency
+
+
+async def send_executed_orders(new_order: OrderDB, fills: list[Fill]) -> None:
     """
-    Send executed order to accounts queue.
+    Send balance updates of all fills of an order to accounts queue
+    as a single message, amounts are summed per user and currency.
+    Updates reference the order id, an order is executed once,
+    so accounts can drop redelivered updates.
     """
 
-    to_buy, to_sell = executed_order.symbol.split("-")
-    currency = to_buy if executed_order.side == "buy" else to_sell
+    amounts: dict[tuple[str, str], Decimal] = {}
+    for fill in fills:
+        for order in (fill.order, new_order):
+            key = _get_balance_key(order)
+            amounts[key] = amounts.get(key, Decimal(0)) + fill.qty
 
     await pika_client.send_message_to_accounts_queue(
-        {
-            "user_id": executed_order.user_id,
-            "currency": str(currency),
-            "amount": str(qty),
-        }
+        [
+            {
+                "reason": "trade",
+                "ref_id": str(new_order.id),
+                "user_id": user_id,
+                "currency": str(currency),
+                "amount": str(amount),
+            }
+            for (user_id, currency), amount in amounts.items()
+        ]
     )
 
 
@@ -80,72 +158,97 @@ async def execute_order(
 ) -> None:
     """
     Execute a new order.
+    Matching runs against the resident order book of the symbol,
+    the results are persisted with one bulk write of orders and one
+    insert of trades, then the order and its fills are journaled
+    and sent to accounts with one message.
+    If the results cannot be persisted, the match is undone and
+    OrderRetryError is raised, so the worker executes the order again.
+    New trades are added to the 24h ticker of the symbol and queued
+    for the candle writer, candles are not written by the worker.
     """
 
-    orders = await order_service.get_orders_to_execute(new_order)
+    book = order_books.get_book(new_order.symbol)
+    fills = book.match(new_order)
     new_trades = []
-    for order in orders:
-        new_order, executed_order, qty = await order_service.execute_order(
-            new_order=new_order, order=order
-        )
-        await send_executed_order(executed_order, qty)
-        await send_executed_order(new_order, qty)
-        if new_order.user_id != executed_order.user_id:
-            new_trade = await trade_service.create_trade_from_orders(
-                order1=new_order,
-                order2=executed_order,
-                qty=qty,
+    if fills:
+        try:
+            await order_service.update_orders(
+                [fill.order for fill in fills] + [new_order]
             )
-            new_trades.append(new_trade)
-        if new_order.status == "closed":
-            break
-    await order_service.update_order(
-        new_order.id,
-        new_order,
-    )
-    await send_last_orders_by_symbol(new_order.symbol, order_service)
+            new_trades = await trade_service.create_trades(
+                [
+                    trade_service.get_trade_from_orders(
+                        order1=new_order, order2=fill.order, qty=fill.qty
+                    )
+                    for fill in fills
+                    if new_order.user_id != fill.order.user_id
+                ]
+            )
+        except Exception as e:
+            book.undo_match(new_order, fills)
+            raise OrderRetryError(e) from e
+    order_journal.append_accepted(new_order)
+    order_journal.append_fills(new_order, fills)
+    await order_journal.commit()
+    if fills:
+        await send_executed_orders(new_order, fills)
+    await send_order_book_delta(new_order.symbol)
     if new_trades:
-        print(new_trades)
+        tickers.add_trades(new_trades)
         await send_new_trades(new_trades)
+        candle_writer.add_trades(new_trades)
 
 
-async def update_user_balance(
-    order: OrderDB,
-    authorization: str | None = None,
-    http_bearer: str | None = None,
-) -> UserSchema:
+def _get_reserve_amount(order: OrderDB) -> tuple[str, Decimal]:
+    to_buy, to_sell = order.symbol.split("-")
+    if order.side == "buy":
+        return to_sell, order.init_qty * order.price
+    return to_buy, order.init_qty
+
+
+async def reserve_order_balance(order: OrderDB) -> None:
     """
-    Update user balance. Send a request to accounts service.
-    Raise HTTPException if response status code is not 200.
+    Reserve the balance an order needs.
+    The reserve command is sent to accounts queue and the reply
+    is awaited on the reply queue of this instance.
+    Raise NotEnoughBalanceException if accounts rejects the reservation,
+    BalanceReservationTimeoutException if it does not reply in time.
     """
 
-    if authorization is not None:
-        access_token = authorization
-    elif http_bearer is not None:
-        access_token = http_bearer
-    else:
-        raise InvalidAuthorizationTokenException()
-
-    to_buy, to_sell = order.symbol.split("-")
-    cost = order.init_qty * order.price
-    if order.side == "buy":
-        currency = to_sell
-        balance = cost
-    else:
-        currency = to_buy
-        balance = order.init_qty
-
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            url=settings.CREATE_NEW_ORDER_URL,
-            headers={"Authorization": access_token},
-            json={
+    currency, amount = _get_reserve_amount(order)
+    try:
+        reply = await pika_client.call_accounts_queue(
+            {
+                "user_id": order.user_id,
                 "currency": currency,
-                "amount": str(balance),
+                "amount": str(amount),
             },
+            message_type="reserve",
+            timeout=settings.BALANCE_RESERVE_TIMEOUT,
         )
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=response.status_code, detail=response.json()
-            )
-        return UserSchema(**response.json())
+    except asyncio.TimeoutError:
+        raise BalanceReservationTimeoutException()
+    if reply["status"] != "ok":
+        raise NotEnoughBalanceException()
+
+
+async def release_reserved_balance(reply: dict) -> None:
+    """
+    Return a reservation applied after its order was given up on,
+    the reply came after the timeout and no order was created.
+    """
+
+    if reply["status"] != "ok":
+        return
+    await pika_client.send_message_to_accounts_queue(
+        [
+            {
+                "reason": "release",
+                "ref_id": reply["reservation_id"],
+                "user_id": reply["user_id"],
+                "currency": reply["currency"],
+                "amount": reply["amount"],
+            }
+        ]
+    )
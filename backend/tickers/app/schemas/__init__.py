@@ -6,10 +6,19 @@ from app.schemas.order import (  # noqa: F401
     OrderUpdate,
     OrderCreateRequest,
     OrderResponseSchema,
-    OrderLastResponseSchema,
+    DepthLevelSchema,
+    OrderBookDepthSchema,
 )
 from app.schemas.trade import (  # noqa: F401
     TradeDB,
     TradeResponse,
     NewTradesList,
 )
+from app.schemas.candle import (  # noqa: F401
+    CANDLE_INTERVALS,
+    CandleDB,
+    CandleInterval,
+    CandleResponse,
+)
+from app.schemas.ticker import TickerResponse  # noqa: F401
+from app.schemas.journal import BookSnapshotDB, OrderEventDB  # noqa: F401
@@ -5,21 +5,54 @@ from bson.decimal128 import Decimal128
 from pydantic import BaseModel
 from pydantic.utils import to_lower_camel
 
+from app.schemas.codec import get_codec
+
 
 class BaseModelSchema(BaseModel):
-    def _check_field_type(self, data: dict, key: str):
-        if isinstance(data[key], Decimal):
-            data[key] = Decimal128(data[key])
-
-    def to_dict(self, *args, **kwargs):
-        data = self.dict(by_alias=True, *args, **kwargs)
-        for key in data:
-            self._check_field_type(data, key)
-        return data
-
-    def to_json(self, *args, **kwargs):
-        data = self.json(*args, **kwargs)
-        return json.loads(data)
+    @classmethod
+    def from_document(cls, document: dict):
+        """
+        Build the schema from a trusted database document
+        without validation.
+        """
+
+        return get_codec(cls).decode(document)
+
+    def to_dict(
+        self,
+        exclude_unset: bool = False,
+        exclude_none: bool = False,
+        **kwargs,
+    ) -> dict:
+        """
+        Return the schema as a Mongo document keyed by aliases.
+        Other arguments of pydantic dict() are passed on to it.
+        """
+
+        if kwargs:
+            data = self.dict(
+                by_alias=True,
+                exclude_unset=exclude_unset,
+                exclude_none=exclude_none,
+                **kwargs,
+            )
+            for key, value in data.items():
+                if isinstance(value, Decimal):
+                    data[key] = Decimal128(value)
+            return data
+        return get_codec(type(self)).to_document(
+            self, exclude_unset, exclude_none
+        )
+
+    def to_json(self, by_alias: bool = False, **kwargs) -> dict:
+        """
+        Return the schema as a JSON-ready dict.
+        Other arguments of pydantic json() are passed on to it.
+        """
+
+        if kwargs:
+            return json.loads(self.json(by_alias=by_alias, **kwargs))
+        return get_codec(type(self)).to_payload(self, by_alias)
 
     class Config:
         alias_generator = to_lower_camel
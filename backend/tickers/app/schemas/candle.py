@@ -0,0 +1,39 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Literal
+from bson import ObjectId
+from pydantic import Field
+
+from app.schemas import PyObjectId
+from app.schemas.base import BaseModelSchema
+
+CandleInterval = Literal["1s", "1m", "5m", "1h", "1d"]
+# Candle length in seconds by interval
+CANDLE_INTERVALS: dict[str, int] = {
+    "1s": 1,
+    "1m": 60,
+    "5m": 5 * 60,
+    "1h": 60 * 60,
+    "1d": 24 * 60 * 60,
+}
+
+
+class CandleDB(BaseModelSchema):
+    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    symbol: str
+    interval: CandleInterval
+    open_time: datetime
+    open: Decimal
+    high: Decimal
+    low: Decimal
+    close: Decimal
+    volume: Decimal
+    trades: int
+
+
+class CandleResponse(CandleDB):
+    class Config(CandleDB.Config):
+        json_encoders = {
+            ObjectId: str,
+            Decimal: str,
+        }
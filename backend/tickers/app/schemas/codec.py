@@ -0,0 +1,199 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON, ModelField
+from pydantic.json import decimal_encoder
+
+Decoder = Callable[[Any], Any]
+
+
+def _decode_decimal(value: Any) -> Decimal:
+    if isinstance(value, Decimal128):
+        return value.to_decimal()
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+def _decode_object_id(value: Any) -> ObjectId:
+    return value if isinstance(value, ObjectId) else ObjectId(value)
+
+
+_NATIVE_TYPES = {str, int, float, bool}
+# (id of encoders, type) -> encoder, encoders are Config class attributes
+_encoders: dict[tuple[int, type], Callable[[Any], Any] | None] = {}
+
+
+def _get_encoder(encoders: dict, type_: type) -> Callable[[Any], Any] | None:
+    key = (id(encoders), type_)
+    if key not in _encoders:
+        bases = type_.__mro__[:-1]
+        _encoders[key] = next(
+            (encoders[base] for base in bases if base in encoders), None
+        )
+    return _encoders[key]
+
+
+def encode_value(
+    value: Any, by_alias: bool = False, encoders: dict | None = None
+) -> Any:
+    """
+    Return a JSON-ready value, the single encoder of outbound payloads.
+    Custom encoders apply by type as in pydantic, including nested values,
+    decimals default to int or float as pydantic does.
+    """
+
+    if value is None:
+        return value
+    type_ = type(value)
+    if type_ in _NATIVE_TYPES:
+        return value
+    if type_ is list or type_ is tuple:
+        return [encode_value(item, by_alias, encoders) for item in value]
+    if type_ is dict:
+        return {
+            key: encode_value(item, by_alias, encoders)
+            for key, item in value.items()
+        }
+    if encoders:
+        encoder = _get_encoder(encoders, type_)
+        if encoder is not None:
+            return encode_value(encoder(value), by_alias)
+    if isinstance(value, Decimal):
+        return decimal_encoder(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, BaseModel):
+        return get_codec(type_).to_payload(value, by_alias, encoders)
+    if isinstance(value, (list, tuple, set)):
+        return [encode_value(item, by_alias, encoders) for item in value]
+    if isinstance(value, Decimal128):
+        return decimal_encoder(value.to_decimal())
+    return str(value)
+
+
+def _get_decoder(field: ModelField) -> Decoder | None:
+    type_ = field.type_
+    if not isinstance(type_, type):
+        return None
+    if issubclass(type_, BaseModel):
+        decode = get_codec(type_).decode
+    elif issubclass(type_, Decimal):
+        decode = _decode_decimal
+    elif issubclass(type_, ObjectId):
+        decode = _decode_object_id
+    else:
+        return None
+    if field.shape == SHAPE_LIST:
+        return lambda values: [decode(value) for value in values]
+    if field.shape == SHAPE_SINGLETON:
+        return decode
+    return None
+
+
+class SchemaCodec:
+    """
+    Validation-free conversion of a schema from trusted Mongo documents
+    and to documents and JSON-ready payloads.
+    Aliases, defaults and field decoders are computed once per schema,
+    so a row costs one pass over its fields.
+    """
+
+    def __init__(self, schema: type[BaseModel]) -> None:
+        self.schema = schema
+        self.fields: list[tuple[str, str, ModelField, Decoder | None]] = [
+            (name, field.alias, field, _get_decoder(field))
+            for name, field in schema.__fields__.items()
+        ]
+        self.encoders = schema.__config__.json_encoders
+
+    def decode(self, document: dict) -> BaseModel:
+        """
+        Build the schema from a trusted document without validation.
+        Decimal128 values are converted to Decimal.
+        """
+
+        values = {}
+        fields_set = set()
+        for name, alias, field, decode in self.fields:
+            if alias in document:
+                value = document[alias]
+            elif name in document:
+                value = document[name]
+            else:
+                values[name] = field.get_default()
+                continue
+            fields_set.add(name)
+            if decode is not None and value is not None:
+                value = decode(value)
+            values[name] = value
+        model = self.schema.__new__(self.schema)
+        object.__setattr__(model, "__dict__", values)
+        object.__setattr__(model, "__fields_set__", fields_set)
+        return model
+
+    def to_document(
+        self,
+        model: BaseModel,
+        exclude_unset: bool = False,
+        exclude_none: bool = False,
+    ) -> dict:
+        """
+        Return the model as a Mongo document keyed by aliases,
+        top level decimals are stored as Decimal128.
+        """
+
+        values = model.__dict__
+        document = {}
+        for name, alias, _, _ in self.fields:
+            if exclude_unset and name not in model.__fields_set__:
+                continue
+            value = values[name]
+            if value is None:
+                if exclude_none:
+                    continue
+            elif isinstance(value, Decimal):
+                value = Decimal128(value)
+            elif isinstance(value, BaseModel):
+                value = get_codec(type(value)).to_document(value)
+            elif isinstance(value, list) and value:
+                if isinstance(value[0], BaseModel):
+                    value = [
+                        get_codec(type(item)).to_document(item)
+                        for item in value
+                    ]
+            document[alias] = value
+        return document
+
+    def to_payload(
+        self,
+        model: BaseModel,
+        by_alias: bool = False,
+        encoders: dict | None = None,
+    ) -> dict:
+        """
+        Return the model as a JSON-ready dict, like json.loads(model.json()).
+        Nested models are encoded with the encoders of the outer one.
+        """
+
+        if encoders is None:
+            encoders = self.encoders
+        values = model.__dict__
+        payload = {}
+        for name, alias, _, _ in self.fields:
+            key = alias if by_alias else name
+            payload[key] = encode_value(values[name], by_alias, encoders)
+        return payload
+
+
+_codecs: dict[type[BaseModel], SchemaCodec] = {}
+
+
+def get_codec(schema: type[BaseModel]) -> SchemaCodec:
+    codec = _codecs.get(schema)
+    if codec is None:
+        codec = _codecs[schema] = SchemaCodec(schema)
+    return codec
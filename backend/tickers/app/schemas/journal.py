@@ -0,0 +1,42 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Literal
+from pydantic import Field
+
+from app.schemas import OrderDB, PyObjectId
+from app.schemas.base import BaseModelSchema
+
+
+class OrderEventDB(BaseModelSchema):
+    """
+    Event of the order journal of a symbol.
+    accepted carries the order as submitted, fill the qty executed
+    between a resting order and the incoming one, cancel the order id.
+    """
+
+    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    symbol: str
+    sequence: int
+    type: Literal["accepted", "fill", "cancel"]
+    order: OrderDB | None = None
+    order_id: PyObjectId | None = None
+    taker_id: PyObjectId | None = None
+    qty: Decimal | None = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class BookSnapshotDB(BaseModelSchema):
+    """
+    One part of the snapshot of a symbol's book after an event sequence.
+    Resting orders are stored in priority order, split into parts.
+    The parts of one snapshot share its snapshot_id.
+    """
+
+    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    snapshot_id: PyObjectId
+    symbol: str
+    sequence: int
+    part: int
+    parts: int
+    orders: list[OrderDB]
+    created_at: datetime = Field(default_factory=datetime.utcnow)
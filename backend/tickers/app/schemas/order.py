@@ -65,6 +65,17 @@ class OrderResponseSchema(OrderDB):
         by_alias = True
 
 
-class OrderLastResponseSchema(BaseModelSchema):
-    buy: list[OrderResponseSchema]
-    sell: list[OrderResponseSchema]
+class DepthLevelSchema(BaseModelSchema):
+    price: Decimal
+    qty: Decimal
+
+    class Config(BaseModelSchema.Config):
+        json_encoders = {Decimal: str}
+
+
+class OrderBookDepthSchema(BaseModelSchema):
+    symbol: str
+    epoch: str
+    sequence: int
+    buy: list[DepthLevelSchema]
+    sell: list[DepthLevelSchema]
@@ -0,0 +1,22 @@
+from decimal import Decimal
+from bson import ObjectId
+
+from app.schemas.base import BaseModelSchema
+
+
+class TickerResponse(BaseModelSchema):
+    symbol: str
+    last_price: Decimal
+    open_price: Decimal
+    high: Decimal
+    low: Decimal
+    price_change: Decimal
+    price_change_percent: Decimal
+    volume: Decimal
+    trades: int
+
+    class Config(BaseModelSchema.Config):
+        json_encoders = {
+            ObjectId: str,
+            Decimal: str,
+        }
@@ -1,3 +1,4 @@
 from app.services.base import BaseService  # noqa: F401
 from app.services.order import OrderService  # noqa: F401
 from app.services.trade import TradeService  # noqa: F401
+from app.services.candle import CandleService  # noqa: F401
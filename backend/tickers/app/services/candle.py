@@ -0,0 +1,156 @@
+import asyncio
+from datetime import datetime, timedelta
+from app.core import settings
+from app.repositories import CandleRepository, TradeRepository
+from app.schemas import CANDLE_INTERVALS, CandleDB, TradeDB
+from app.services import BaseService
+
+EPOCH = datetime(1970, 1, 1)
+BACKFILL_BATCH_SIZE = 1000
+
+
+def get_open_time(created_at: datetime, interval: str) -> datetime:
+    """
+    Return the open time of the candle of an interval a time falls into.
+    """
+
+    length = timedelta(seconds=CANDLE_INTERVALS[interval])
+    return EPOCH + (created_at - EPOCH) // length * length
+
+
+def build_candles(trades: list[TradeDB], interval: str) -> list[CandleDB]:
+    """
+    Build candles of an interval from trades ordered by time,
+    one per symbol and open time.
+    """
+
+    candles: dict[tuple[str, datetime], CandleDB] = {}
+    for trade in trades:
+        open_time = get_open_time(trade.created_at, interval)
+        candle = candles.get((trade.symbol, open_time))
+        if candle is None:
+            candles[trade.symbol, open_time] = CandleDB(
+                symbol=trade.symbol,
+                interval=interval,
+                open_time=open_time,
+                open=trade.price,
+                high=trade.price,
+                low=trade.price,
+                close=trade.price,
+                volume=trade.qty,
+                trades=1,
+            )
+            continue
+        candle.high = max(candle.high, trade.price)
+        candle.low = min(candle.low, trade.price)
+        candle.close = trade.price
+        candle.volume += trade.qty
+        candle.trades += 1
+    return list(candles.values())
+
+
+class CandleService(BaseService):
+    repository: CandleRepository
+
+    def __init__(
+        self,
+        repository: CandleRepository,
+        trade_repository: TradeRepository,
+    ) -> None:
+        super().__init__(repository)
+        self.trade_repository = trade_repository
+
+    def build_trade_candles(self, trades: list[TradeDB]) -> list[CandleDB]:
+        """
+        Build candles of every interval from new trades.
+        """
+
+        return [
+            candle
+            for interval in CANDLE_INTERVALS
+            for candle in build_candles(trades, interval)
+        ]
+
+    async def merge_candles(
+        self, candles: list[CandleDB]
+    ) -> tuple[list[CandleDB], list[CandleDB]]:
+        """
+        Merge candles of new trades into the stored ones, one upsert
+        per candle. Returns the merged candles and the candles that
+        failed, which can be merged again without counting the merged
+        ones twice.
+        """
+
+        result = await asyncio.gather(
+            *(self.repository.merge_candle(candle) for candle in candles),
+            return_exceptions=True,
+        )
+        merged, failed = [], []
+        for candle, merged_candle in zip(candles, result):
+            if isinstance(merged_candle, BaseException):
+                print(
+                    f"Failed to merge {candle.interval} candle"
+                    f" of {candle.symbol}: {merged_candle}"
+                )
+                failed.append(candle)
+            else:
+                merged.append(merged_candle)
+        return merged, failed
+
+    async def get_candles(
+        self,
+        symbol: str,
+        interval: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = 500,
+    ) -> list[CandleDB]:
+        """
+        Get candles of a symbol and interval from the database,
+        oldest first.
+        """
+
+        result = await self.repository.get_candles(
+            symbol, interval, start, end, limit
+        )
+        return result
+
+    async def backfill(self, symbol: str, since: datetime) -> int:
+        """
+        Rebuild the candles of a symbol from its trades since a time,
+        so candles missed while the service was down are restored.
+        Every interval is rebuilt from its last stored candle on,
+        older candles are already complete.
+        Returns the number of stored candles.
+        """
+
+        stored = 0
+        for interval in CANDLE_INTERVALS:
+            start = get_open_time(since, interval)
+            last = await self.repository.get_last_candle(symbol, interval)
+            if last is not None:
+                start = max(start, last.open_time)
+            batch = []
+            async for candle in self.trade_repository.aggregate_candles(
+                symbol, interval, start
+            ):
+                batch.append(candle)
+                if len(batch) == BACKFILL_BATCH_SIZE:
+                    stored += await self.repository.replace_candles(batch)
+                    batch = []
+            stored += await self.repository.replace_candles(batch)
+        return stored
+
+    async def backfill_all(self) -> int:
+        """
+        Rebuild the missed candles of all configured symbols,
+        at most for the backfill window.
+        """
+
+        since = datetime.utcnow() - timedelta(
+            days=settings.CANDLE_BACKFILL_DAYS
+        )
+        stored = 0
+        for symbol in settings.SYMBOLS:
+            stored += await self.backfill(symbol, since)
+        return stored
@@ -1,4 +1,4 @@
-from decimal import Decimal
+from typing import AsyncIterator
 from app.repositories import OrderRepository
 from app.schemas import OrderCreate, OrderDB, OrderUpdate
 from app.services import BaseService
@@ -36,6 +36,26 @@ class OrderService(BaseService):
         )
         return result
 
+    async def get_user_orders_page(
+        self, user_id: str, limit: int = 100, cursor: str | None = None
+    ) -> tuple[list[OrderDB], str | None]:
+        """
+        Get one page of orders from the database by user id,
+        together with the cursor of the next page.
+        """
+
+        result = await self.repository.get_orders_page_by_user_id(
+            user_id, limit=limit, cursor=cursor
+        )
+        return result
+
+    def iterate_user_orders(self, user_id: str) -> AsyncIterator[OrderDB]:
+        """
+        Iterate over all orders from the database by user id.
+        """
+
+        return self.repository.iterate_orders_by_user_id(user_id)
+
     async def close_order(self, order_id: str) -> OrderDB:
         """
         Close an order from the database by id.
@@ -100,6 +120,14 @@ class OrderService(BaseService):
         )
         return result
 
+    async def get_open_orders(self) -> list[OrderDB]:
+        """
+        Get all open orders from the database, oldest first.
+        """
+
+        result = await self.repository.get_open_orders()
+        return result
+
     async def get_user_orders_by_symbol(
         self, user_id: str, symbol: str, limit: int = 100
     ) -> list[OrderDB]:
@@ -122,40 +150,10 @@ class OrderService(BaseService):
         )
         return result
 
-    def _get_min_qty(self, order: OrderDB, sell_order: OrderDB) -> Decimal:
-        return min(
-            order.init_qty - order.executed_qty,
-            sell_order.init_qty - sell_order.executed_qty,
-        )
+    async def update_orders(self, orders: list[OrderDB]) -> int:
+        """
+        Write the execution state of many orders to the database at once.
+        """
 
-    async def get_orders_to_execute(self, order: OrderDB) -> list[OrderDB]:
-        order_to_db = order.to_dict()
-        side = "sell" if order.side == "buy" else "buy"
-        price = (
-            {"$gte" if order.side == "sell" else "$lte": order_to_db["price"]}
-            if order.type == "limit"
-            else None
-        )
-        orders = await self.repository.get_orders_by_symbol_and_filter(
-            symbol=order.symbol,
-            filter={"side": side, "status": "open", "price": price},
-            limit=None,
-        )
-        return orders
-
-    async def execute_order(
-        self, new_order: OrderDB, order: OrderDB
-    ) -> list[OrderDB, OrderDB, Decimal]:
-        qty = self._get_min_qty(new_order, order)
-        order.executed_qty += qty
-        new_order.executed_qty += qty
-
-        if order.executed_qty == order.init_qty:
-            order.status = "closed"
-        if new_order.executed_qty == new_order.init_qty:
-            new_order.status = "closed"
-
-        await self.repository.update_order_by_id(
-            order.id, order.to_dict(exclude_unset=True, exclude_none=True)
-        )
-        return new_order, order, qty
+        result = await self.repository.update_orders(orders)
+        return result
@@ -1,6 +1,8 @@
+from datetime import datetime
 from decimal import Decimal
+from typing import AsyncIterator
 from app.repositories import TradeRepository
-from app.schemas import TradeDB, OrderDB, UserTrade
+from app.schemas import CandleDB, TradeDB, OrderDB, UserTrade
 from app.services import BaseService
 
 
@@ -16,18 +18,17 @@ class TradeService(BaseService):
         result = await self.repository.create_trade(new_trade)
         return result
 
-    async def create_trade_from_orders(
+    def get_trade_from_orders(
         self, order1: OrderDB, order2: OrderDB, qty: Decimal | None = None
     ) -> TradeDB:
         """
-        Create a new trade in the database from two orders and return
-        the created trade.
+        Build a new trade from two orders, the second one sets the price.
         """
 
         if qty is None:
             qty = min(order1.init_qty, order2.init_qty)
 
-        new_trade = TradeDB(
+        return TradeDB(
             symbol=order1.symbol,
             orders=[order1.id, order2.id],
             price=order2.price,
@@ -44,9 +45,27 @@ class TradeService(BaseService):
                 ),
             ],
         )
+
+    async def create_trade_from_orders(
+        self, order1: OrderDB, order2: OrderDB, qty: Decimal | None = None
+    ) -> TradeDB:
+        """
+        Create a new trade in the database from two orders and return
+        the created trade.
+        """
+
+        new_trade = self.get_trade_from_orders(order1, order2, qty)
         result = await self.repository.create_trade(new_trade)
         return result
 
+    async def create_trades(self, trades: list[TradeDB]) -> list[TradeDB]:
+        """
+        Create many trades in the database at once and return them.
+        """
+
+        result = await self.repository.create_trades(trades)
+        return result
+
     async def get_trade(self, trade_id: str) -> TradeDB:
         """
         Get a trade from the database by id.
@@ -96,3 +115,52 @@ class TradeService(BaseService):
             symbol, user_id, limit
         )
         return result
+
+    async def get_symbol_trades_page(
+        self, symbol: str, limit: int = 100, cursor: str | None = None
+    ) -> tuple[list[TradeDB], str | None]:
+        """
+        Get one page of trades from the database by symbol,
+        together with the cursor of the next page.
+        """
+
+        result = await self.repository.get_trades_page_by_symbol(
+            symbol, limit, cursor
+        )
+        return result
+
+    async def get_user_trades_page(
+        self,
+        user_id: str,
+        symbol: str | None = None,
+        limit: int = 100,
+        cursor: str | None = None,
+    ) -> tuple[list[TradeDB], str | None]:
+        """
+        Get one page of trades from the database by user id
+        and optionally symbol, together with the cursor of the next page.
+        """
+
+        result = await self.repository.get_trades_page_by_user_id(
+            user_id, symbol, limit, cursor
+        )
+        return result
+
+    def iterate_user_trades(
+        self, user_id: str, symbol: str | None = None
+    ) -> AsyncIterator[TradeDB]:
+        """
+        Iterate over all trades from the database by user id.
+        """
+
+        return self.repository.iterate_trades_by_user_id(user_id, symbol)
+
+    def iterate_candles(
+        self, interval: str, since: datetime
+    ) -> AsyncIterator[CandleDB]:
+        """
+        Iterate over candles of all symbols built from trades since a time,
+        ordered by symbol and open time.
+        """
+
+        return self.repository.aggregate_candles(None, interval, since)
@@ -0,0 +1,89 @@
+"""
+Compare the schema codec with the pydantic path on a list of orders:
+reading documents, writing documents and building broadcast payloads.
+
+    python -m benchmarks.codec --orders 10000
+"""
+
+import argparse
+from decimal import Decimal
+import json
+import time
+from typing import Any, Callable
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+
+from app.schemas import OrderDB
+
+
+def _make_documents(count: int) -> list[dict]:
+    return [
+        OrderDB(
+            symbol="BTC-USD",
+            price=Decimal("100.5") + i % 100,
+            init_qty=Decimal("1.25"),
+            executed_qty=Decimal("0.5"),
+            type="limit",
+            side="buy" if i % 2 else "sell",
+            user_id=str(ObjectId()),
+        ).to_dict()
+        for i in range(count)
+    ]
+
+
+def _pydantic_to_dict(order: OrderDB) -> dict:
+    # The path before the codec, a pass over fields after .dict()
+    data = order.dict(by_alias=True)
+    for key in data:
+        if isinstance(data[key], Decimal):
+            data[key] = Decimal128(data[key])
+    return data
+
+
+def _pydantic_to_json(order: OrderDB) -> dict:
+    return json.loads(order.json())
+
+
+def _measure(name: str, func: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    print(f"{name:<28} {best * 1000:9.1f} ms")
+    return best
+
+
+def main(count: int, repeat: int) -> None:
+    documents = _make_documents(count)
+    orders = [OrderDB.from_document(document) for document in documents]
+    print(f"{count} orders, best of {repeat}")
+    cases = [
+        (
+            "read",
+            lambda: [OrderDB(**document) for document in documents],
+            lambda: [OrderDB.from_document(doc) for doc in documents],
+        ),
+        (
+            "write",
+            lambda: [_pydantic_to_dict(order) for order in orders],
+            lambda: [order.to_dict() for order in orders],
+        ),
+        (
+            "payload",
+            lambda: [_pydantic_to_json(order) for order in orders],
+            lambda: [order.to_json() for order in orders],
+        ),
+    ]
+    for name, pydantic_path, codec_path in cases:
+        before = _measure(f"{name}: pydantic", pydantic_path, repeat)
+        after = _measure(f"{name}: codec", codec_path, repeat)
+        print(f"{name}: {before / after:.1f}x faster")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.orders, args.repeat)
@@ -0,0 +1,115 @@
+"""
+Compare the time to rebuild order books on restart: loading open orders
+from the orders collection against the latest snapshots and the
+journal tail.
+
+Writes to DB_URL and drops the database afterwards, run it with the app
+environment against a scratch database:
+
+    python -m benchmarks.restart --open 100000 --closed 1000000
+"""
+
+import argparse
+import asyncio
+from decimal import Decimal
+import random
+import time
+
+from app.core import settings
+from app.db.client import get_client
+from app.db.utils import close_mongo_connection, connect_to_mongo
+from app.engine import OrderBookManager, OrderJournal
+from app.repositories import (
+    BookSnapshotRepository,
+    OrderEventRepository,
+    OrderRepository,
+)
+from app.schemas import OrderDB
+from app.services import OrderService
+
+SYMBOLS = ["BTC-USD", "ETH-USD", "SOL-USD"]
+BATCH_SIZE = 10000
+
+
+def _make_order(status: str) -> OrderDB:
+    # Buys below 100 and sells above, so resting orders never cross
+    side = random.choice(["buy", "sell"])
+    offset = Decimal(random.randint(1, 1000)) / 100
+    return OrderDB(
+        symbol=random.choice(SYMBOLS),
+        price=100 - offset if side == "buy" else 100 + offset,
+        init_qty=Decimal(1),
+        status=status,
+        type="limit",
+        side=side,
+        user_id="646be16ba7f9c69f0bdf2bc5",
+    )
+
+
+async def _seed(repository: OrderRepository, status: str, count: int) -> None:
+    for offset in range(0, count, BATCH_SIZE):
+        await repository.create_documents(
+            [
+                _make_order(status).to_dict()
+                for _ in range(min(BATCH_SIZE, count - offset))
+            ]
+        )
+
+
+async def _measure(name: str, restore) -> float:
+    started = time.perf_counter()
+    books = await restore()
+    elapsed = time.perf_counter() - started
+    orders = sum(len(book) for book in books.values())
+    print(f"{name:<24} {elapsed * 1000:9.1f} ms  {orders} resting orders")
+    return elapsed
+
+
+async def main(open_count: int, closed_count: int, tail: int) -> None:
+    await connect_to_mongo()
+    order_service = OrderService(repository=OrderRepository())
+    journal = OrderJournal()
+    journal.start(OrderEventRepository(), BookSnapshotRepository())
+    try:
+        await _seed(order_service.repository, "open", open_count)
+        await _seed(order_service.repository, "closed", closed_count)
+        print(f"{open_count} open and {closed_count} closed orders")
+
+        async def load() -> dict:
+            manager = OrderBookManager()
+            await manager.load(order_service)
+            return manager.books
+
+        await _measure("open orders", load)
+
+        manager = OrderBookManager()
+        await manager.restore(journal, order_service)
+        for _ in range(tail):
+            order = _make_order("open")
+            book = manager.get_book(order.symbol)
+            journal.append_accepted(order)
+            journal.append_fills(order, book.match(order))
+        await journal.commit()
+
+        async def replay() -> dict:
+            restored = OrderJournal()
+            restored.events = journal.events
+            restored.snapshots = journal.snapshots
+            manager = OrderBookManager()
+            await manager.restore(restored, order_service)
+            return manager.books
+
+        await _measure(f"snapshot + {tail} events", replay)
+    finally:
+        await journal.stop()
+        await get_client().drop_database(settings.DB_NAME)
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--open", type=int, default=100000)
+    parser.add_argument("--closed", type=int, default=1000000)
+    parser.add_argument("--tail", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(main(args.open, args.closed, args.tail))
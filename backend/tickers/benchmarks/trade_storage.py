@@ -0,0 +1,121 @@
+"""
+Compare trade storages: insert rate, range-scan throughput by symbol
+and time range, and storage size of data and indexes.
+
+Writes scratch collections to DB_URL and drops them afterwards,
+run it with the app environment against a scratch database.
+The sizing target is 100M trades, which needs a few hours to load:
+
+    python -m benchmarks.trade_storage --trades 1000000
+    python -m benchmarks.trade_storage --trades 100000000 --keep
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+import random
+import time
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core import settings
+from app.repositories import TradeRepository
+
+STORAGES = ["documents", "timeseries"]
+SYMBOLS = ["BTC-USD", "ETH-USD", "SOL-USD", "ADA-USD", "XRP-USD"]
+BATCH_SIZE = 10000
+
+
+def _make_batch(start: datetime, offset: int, count: int) -> list[dict]:
+    # One trade per 10 ms, spread over the symbols, as trades are stored
+    documents = []
+    for i in range(offset, offset + count):
+        documents.append(
+            {
+                "_id": ObjectId(),
+                "symbol": SYMBOLS[i % len(SYMBOLS)],
+                "orders": [ObjectId(), ObjectId()],
+                "price": Decimal128(Decimal(random.randint(9000, 11000))),
+                "qty": Decimal128(Decimal("0.0100")),
+                "users": [
+                    {"userId": str(i % 1000), "side": "buy"},
+                    {"userId": str(i % 1000 + 1), "side": "sell"},
+                ],
+                "createdAt": start + timedelta(milliseconds=10 * i),
+            }
+        )
+    return documents
+
+
+async def _load(repository: TradeRepository, count: int) -> float:
+    await repository.create_collection()
+    await repository.create_indexes()
+    start = datetime(2023, 1, 1)
+    started = time.perf_counter()
+    for offset in range(0, count, BATCH_SIZE):
+        await repository.create_documents(
+            _make_batch(start, offset, min(BATCH_SIZE, count - offset))
+        )
+    return count / (time.perf_counter() - started)
+
+
+async def _scan(repository: TradeRepository, count: int, scans: int) -> float:
+    # Scan random 1h windows of one symbol, as a chart or export does
+    start = datetime(2023, 1, 1)
+    span = timedelta(milliseconds=10 * count) - timedelta(hours=1)
+    scanned = 0
+    started = time.perf_counter()
+    for _ in range(scans):
+        since = start + span * random.random()
+        until = since + timedelta(hours=1)
+        cursor = repository.collection.find(
+            {
+                "symbol": random.choice(SYMBOLS),
+                "createdAt": {"$gte": since, "$lt": until},
+            }
+        ).sort("createdAt", 1)
+        async for _ in cursor:
+            scanned += 1
+    return scanned / (time.perf_counter() - started)
+
+
+async def _get_size(repository: TradeRepository) -> tuple[int, int]:
+    stats = await repository.db.command(
+        "collStats", repository.collection_name
+    )
+    return stats["storageSize"], stats["totalIndexSize"]
+
+
+async def main(count: int, scans: int, keep: bool) -> None:
+    client = AsyncIOMotorClient(settings.DB_URL)
+    print(f"{count} trades, {scans} range scans of 1h")
+    try:
+        for storage in STORAGES:
+            repository = TradeRepository(
+                client, f"benchmark_trades_{storage}", storage=storage
+            )
+            await repository.collection.drop()
+            insert_rate = await _load(repository, count)
+            scan_rate = await _scan(repository, count, scans)
+            storage_size, index_size = await _get_size(repository)
+            print(
+                f"{storage:<12} insert {insert_rate:9.0f} trades/s"
+                f"  scan {scan_rate:9.0f} trades/s"
+                f"  data {storage_size / 2**20:9.1f} MiB"
+                f"  indexes {index_size / 2**20:9.1f} MiB"
+            )
+            if not keep:
+                await repository.collection.drop()
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trades", type=int, default=1000000)
+    parser.add_argument("--scans", type=int, default=100)
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.trades, args.scans, args.keep))
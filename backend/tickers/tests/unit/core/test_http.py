@@ -0,0 +1,49 @@
+from unittest.mock import patch
+import httpx
+import pytest
+
+from app.core.http import HTTPClient
+
+
+def _client(responses: list) -> HTTPClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    client = HTTPClient()
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+@pytest.mark.asyncio
+@patch("app.core.http.asyncio.sleep")
+async def test_request_retries_connect_errors(mock_sleep):
+    client = _client(
+        [httpx.ConnectError("refused"), httpx.Response(200, json={})]
+    )
+    response = await client.post("http://accounts/user/new-order")
+    assert response.status_code == 200
+    assert mock_sleep.call_count == 1
+    metrics = client.get_metrics()
+    assert metrics["requests"] == 1
+    assert metrics["retries"] == 1
+    assert metrics["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+@patch("app.core.http.asyncio.sleep")
+async def test_request_does_not_retry_sent_post(mock_sleep):
+    client = _client([httpx.ReadTimeout("timeout"), httpx.Response(200)])
+    with pytest.raises(httpx.ReadTimeout):
+        await client.post("http://accounts/user/new-order")
+    assert client.get_metrics()["failures"] == 1
+    response = await client.get("http://accounts/auth/verify-token")
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_request_requires_start():
+    with pytest.raises(RuntimeError):
+        await HTTPClient().get("http://accounts/auth/verify-token")
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+import time
+from unittest.mock import AsyncMock, patch
+import httpx
+from jose import jwt
+import pytest
+
+from app.core import security, settings
+from app.core.exceptions import (
+    InvalidAuthorizationTokenException,
+    PermissionDeniedException,
+)
+from app.core.security import TokenCache, handle_auth_event, token_cache
+from app.core.utils import check_superuser, get_current_user
+
+
+def _create_token(
+    user_id: str, minutes: int = 5, active: bool = True, verified: bool = True
+) -> str:
+    now = datetime.utcnow()
+    return jwt.encode(
+        {
+            "exp": now + timedelta(minutes=minutes),
+            "iat": now - timedelta(seconds=1),
+            "sub": "test@test.com",
+            "uid": user_id,
+            "act": active,
+            "ver": verified,
+        },
+        settings.JWT_SECRET_KEY,
+        settings.JWT_ALGORITHM,
+    )
+
+
+@pytest.fixture(autouse=True)
+def reset_token_cache():
+    yield
+    token_cache.tokens.clear()
+    token_cache.revoked.clear()
+
+
+def test_token_cache_evicts_least_recently_used():
+    cache = TokenCache(maxsize=2, ttl=60)
+    expires_at = time.time() + 60
+    cache.set("a", "user1", expires_at)
+    cache.set("b", "user2", expires_at)
+    assert cache.get("a") == "user1"
+    cache.set("c", "user3", expires_at)
+    assert cache.get("b") is None
+    assert cache.get("a") == "user1"
+    cache.set("d", "user4", time.time() - 1)
+    assert cache.get("d") is None
+
+
+def test_token_cache_revoke():
+    cache = TokenCache(maxsize=10, ttl=60)
+    cache.set("a", "user1", time.time() + 60)
+    revoked_at = int(time.time())
+    cache.revoke("user1", revoked_at)
+    assert cache.get("a") is None
+    assert cache.is_revoked("user1", revoked_at - 10) is True
+    assert cache.is_revoked("user1", revoked_at) is False
+    assert cache.is_revoked("user1", revoked_at + 10) is False
+    assert cache.is_revoked("user2", 0) is False
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_verifies_locally():
+    token = _create_token("646be16ba7f9c69f0bdf2bc5")
+    user_id = await get_current_user(f"Bearer {token}")
+    assert user_id == "646be16ba7f9c69f0bdf2bc5"
+    assert token_cache.get(token) == user_id
+    handle_auth_event(
+        settings.RABBITMQ_AUTH_EVENTS_ROUTING_KEY,
+        {
+            "type": "revoke",
+            "user_id": user_id,
+            "revoked_at": int(time.time()),
+        },
+    )
+    with pytest.raises(InvalidAuthorizationTokenException):
+        await get_current_user(f"Bearer {token}")
+
+
+@pytest.mark.asyncio
+@patch("app.core.utils.http_client.get", new_callable=AsyncMock)
+async def test_get_current_user_checks_user_state(mock_get):
+    mock_get.return_value = httpx.Response(401, json={"detail": "inactive"})
+    for token in (
+        _create_token("user", active=False),
+        _create_token("user", verified=False),
+    ):
+        with pytest.raises(InvalidAuthorizationTokenException):
+            await get_current_user(f"Bearer {token}")
+    assert mock_get.await_count == 2
+    mock_get.return_value = httpx.Response(200, json={"id": "user"})
+    token = _create_token("user", active=False)
+    assert await get_current_user(f"Bearer {token}") == "user"
+
+
+def test_security_module_matches_websocket():
+    # The module is shared with the websocket service
+    path = Path(__file__).parents[4] / "websocket/app/core/security.py"
+    if not path.exists():
+        pytest.skip("websocket service is not checked out")
+    assert path.read_text() == Path(security.__file__).read_text()
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_invalid_token():
+    with pytest.raises(InvalidAuthorizationTokenException):
+        await get_current_user(f"Bearer {_create_token('user', -5)}")
+    with pytest.raises(InvalidAuthorizationTokenException):
+        await get_current_user()
+
+
+@pytest.mark.asyncio
+@patch("app.core.utils.http_client.get", new_callable=AsyncMock)
+async def test_check_superuser(mock_get):
+    mock_get.return_value = httpx.Response(200, json={"isSuperuser": True})
+    await check_superuser("Bearer token")
+    mock_get.return_value = httpx.Response(200, json={"isSuperuser": False})
+    with pytest.raises(PermissionDeniedException):
+        await check_superuser("Bearer token")
+    mock_get.return_value = httpx.Response(401, json={"detail": "invalid"})
+    with pytest.raises(InvalidAuthorizationTokenException):
+        await check_superuser("Bearer token")
+    with pytest.raises(InvalidAuthorizationTokenException):
+        await check_superuser()
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+from bson import ObjectId
+import pytest
+
+from app.db.migrate_trades import migrate_trades
+
+
+class FakeTradeRepository:
+    timeseries = None
+
+    def __init__(self, documents: list[dict]) -> None:
+        self.documents = documents
+        self.collection = AsyncMock()
+        self.create_collection = AsyncMock()
+        self.create_indexes = AsyncMock()
+
+    def _key(self, document: dict) -> tuple:
+        return document["createdAt"], document["_id"]
+
+    async def get_documents_after(self, value, document_id, limit):
+        documents = sorted(self.documents, key=self._key)
+        if document_id is not None:
+            documents = [
+                document
+                for document in documents
+                if self._key(document) > (value, document_id)
+            ]
+        elif value is not None:
+            documents = [
+                document
+                for document in documents
+                if document["createdAt"] >= value
+            ]
+        return documents[:limit]
+
+    async def get_existing_ids(self, document_ids, filter):
+        ids = {document["_id"] for document in self.documents}
+        return ids & set(document_ids)
+
+    async def get_last_trade_time(self):
+        return max(
+            (document["createdAt"] for document in self.documents),
+            default=None,
+        )
+
+    async def create_documents(self, documents):
+        self.documents.extend(documents)
+
+
+@pytest.mark.asyncio
+async def test_migrate_trades_resumes_before_last_trade():
+    start = datetime(2023, 1, 1)
+    # Ids do not follow time, as ids and times come from different workers
+    trades = [
+        {"_id": ObjectId(), "createdAt": start + timedelta(seconds=i)}
+        for i in range(10)
+    ]
+    trades.reverse()
+    source = FakeTradeRepository(list(trades))
+    copied = [trade for trade in trades if trade["createdAt"].second != 7]
+    target = FakeTradeRepository(copied[:6])
+
+    result = await migrate_trades(source, target, 3, timedelta(seconds=10))
+
+    assert result == 4
+    assert len(target.documents) == 10
+    assert {trade["_id"] for trade in target.documents} == {
+        trade["_id"] for trade in trades
+    }
+    source.collection.create_index.assert_awaited_once()
@@ -0,0 +1,187 @@
+from decimal import Decimal
+
+from app.engine import OrderBook
+from app.schemas import OrderDB
+
+
+def _order(side: str, price: str, qty: str = "1", **kwargs) -> OrderDB:
+    data = {
+        "symbol": "BTC-USD",
+        "price": price,
+        "init_qty": qty,
+        "type": "limit",
+        "side": side,
+        "user_id": "646be16ba7f9c69f0bdf2bc5",
+    }
+    data.update(kwargs)
+    return OrderDB(**data)
+
+
+def test_add_order_keeps_price_priority():
+    book = OrderBook("BTC-USD")
+    book.add_order(_order("buy", "10"))
+    book.add_order(_order("buy", "12"))
+    book.add_order(_order("sell", "15"))
+    book.add_order(_order("sell", "13"))
+    assert book.best_price("buy") == Decimal("12")
+    assert book.best_price("sell") == Decimal("13")
+    assert [o.price for o in book.get_orders("buy")] == [12, 10]
+    assert [o.price for o in book.get_orders("sell")] == [13, 15]
+
+
+def test_match_no_cross_rests_order():
+    book = OrderBook("BTC-USD")
+    book.add_order(_order("sell", "11"))
+    order = _order("buy", "10")
+    fills = book.match(order)
+    assert fills == []
+    assert order.id in book
+    assert book.best_price("buy") == Decimal("10")
+
+
+def test_match_is_fifo_within_level():
+    book = OrderBook("BTC-USD")
+    first = _order("sell", "10")
+    second = _order("sell", "10")
+    book.add_order(first)
+    book.add_order(second)
+    fills = book.match(_order("buy", "10"))
+    assert len(fills) == 1
+    assert fills[0].order is first
+    assert first.status == "closed"
+    assert second.id in book
+
+
+def test_match_sweeps_levels_and_partially_fills():
+    book = OrderBook("BTC-USD")
+    book.add_order(_order("sell", "10", "1"))
+    book.add_order(_order("sell", "11", "2"))
+    book.add_order(_order("sell", "12", "1"))
+    order = _order("buy", "11", "2")
+    fills = book.match(order)
+    assert [(f.order.price, f.qty) for f in fills] == [(10, 1), (11, 1)]
+    assert order.status == "closed"
+    assert order.ended_at is not None
+    assert order.id not in book
+    resting = book.get_orders("sell")
+    assert resting[0].price == 11
+    assert resting[0].executed_qty == 1
+    assert resting[0].status == "open"
+
+
+def test_match_market_order_ignores_price():
+    book = OrderBook("BTC-USD")
+    book.add_order(_order("buy", "10"))
+    book.add_order(_order("buy", "5"))
+    order = _order("sell", "20", "2", type="market")
+    fills = book.match(order)
+    assert [f.order.price for f in fills] == [10, 5]
+    assert order.status == "closed"
+    assert len(book) == 0
+
+
+def test_remove_order():
+    book = OrderBook("BTC-USD")
+    order = _order("buy", "10")
+    book.add_order(order)
+    assert book.remove_order(order.id) is order
+    assert book.remove_order(order.id) is None
+    assert book.best_price("buy") is None
+
+
+def test_depth_follows_orders():
+    book = OrderBook("BTC-USD")
+    first = _order("sell", "10", "2")
+    book.add_order(first)
+    book.add_order(_order("sell", "10", "1"))
+    book.add_order(_order("sell", "11", "4"))
+    book.add_order(_order("buy", "9", "1"))
+    assert book.get_depth("sell") == [(10, 3), (11, 4)]
+    book.match(_order("buy", "10", "1.5"))
+    assert book.get_depth("sell") == [(10, Decimal("1.5")), (11, 4)]
+    book.remove_order(first.id)
+    assert book.get_depth("sell", limit=1) == [(10, 1)]
+    assert book.get_snapshot(limit=1) == {
+        "symbol": "BTC-USD",
+        "epoch": book.epoch,
+        "sequence": 0,
+        "buy": [{"price": "9", "qty": "1"}],
+        "sell": [{"price": "10", "qty": "1.0"}],
+    }
+
+
+def test_pop_changes_numbers_level_deltas():
+    book = OrderBook("BTC-USD")
+    assert book.pop_changes() is None
+    book.add_order(_order("sell", "10", "2"))
+    book.add_order(_order("sell", "11", "1"))
+    delta = book.pop_changes()
+    assert delta["sequence"] == 1
+    assert delta["changes"] == [
+        {"action": "insert", "side": "sell", "price": "10", "qty": "2"},
+        {"action": "insert", "side": "sell", "price": "11", "qty": "1"},
+    ]
+    book.match(_order("buy", "11", "2.5"))
+    delta = book.pop_changes()
+    assert delta["sequence"] == 2
+    assert delta["changes"] == [
+        {"action": "remove", "side": "sell", "price": "10", "qty": "0"},
+        {"action": "update", "side": "sell", "price": "11", "qty": "0.5"},
+    ]
+    assert book.get_snapshot()["sequence"] == 2
+
+
+def test_pop_changes_skips_transient_levels():
+    book = OrderBook("BTC-USD")
+    order = _order("buy", "10")
+    book.add_order(order)
+    book.remove_order(order.id)
+    assert book.pop_changes() is None
+    assert book.sequence == 0
+
+
+def test_fill_order_applies_recorded_fill():
+    book = OrderBook("BTC-USD")
+    resting = _order("sell", "10", "2")
+    book.add_order(resting)
+    order = _order("buy", "10", "3")
+
+    book.fill_order(order, resting.id, Decimal("1"))
+    assert resting.executed_qty == 1
+    assert book.get_depth("sell") == [(Decimal("10"), Decimal("1"))]
+
+    book.fill_order(order, resting.id, Decimal("1"))
+    assert resting.status == "closed"
+    assert resting.id not in book
+    assert book.best_price("sell") is None
+    assert order.executed_qty == 2
+    assert order.status == "open"
+
+
+def test_undo_match_restores_book():
+    book = OrderBook("BTC-USD")
+    first = _order("sell", "10", "1")
+    second = _order("sell", "10", "1")
+    for order in (first, second, _order("sell", "11", "2")):
+        book.add_order(order)
+    before = [
+        (o.id, o.executed_qty, o.status) for o in book.get_orders("sell")
+    ]
+    depth = book.get_depth("sell")
+    order = _order("buy", "12", "5")
+
+    fills = book.match(order)
+    assert order.id in book
+    book.undo_match(order, fills)
+
+    assert [
+        (o.id, o.executed_qty, o.status) for o in book.get_orders("sell")
+    ] == before
+    assert all(o.ended_at is None for o in book.get_orders("sell"))
+    assert book.get_depth("sell") == depth
+    assert order.id not in book
+    assert order.executed_qty == 0 and order.status == "open"
+    assert [f.order.id for f in book.match(order)][:2] == [
+        first.id,
+        second.id,
+    ]
@@ -0,0 +1,95 @@
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+import pytest
+
+from app.engine import CandleWriter
+from app.schemas import CandleDB, TradeDB, UserTrade
+from app.services.candle import build_candles
+
+
+def _trade(price: str, symbol: str = "BTC-USD") -> TradeDB:
+    return TradeDB(
+        symbol=symbol,
+        orders=["6463a3b2b4b0d6f5b0b3f1a1", "6463a3b2b4b0d6f5b0b3f1a2"],
+        price=Decimal(price),
+        qty=Decimal("1"),
+        users=[
+            UserTrade(user_id="1", side="buy"),
+            UserTrade(user_id="2", side="sell"),
+        ],
+        created_at=datetime(2023, 5, 16, 13, 47, 1),
+    )
+
+
+class FakeCandleService:
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.calls: list[list[CandleDB]] = []
+
+    def build_trade_candles(self, trades: list[TradeDB]) -> list[CandleDB]:
+        return build_candles(trades, "1m")
+
+    async def merge_candles(self, candles: list[CandleDB]) -> tuple:
+        self.calls.append(candles)
+        # The first candles fail, the others are merged
+        failed = candles[: self.failures]
+        self.failures -= len(failed)
+        return candles[len(failed) :], failed
+
+
+@pytest.mark.asyncio
+async def test_candle_writer_merges_pending_trades_together():
+    service = FakeCandleService()
+    published: dict[str, list[CandleDB]] = {}
+
+    async def publish(symbol: str, candles: list[CandleDB]) -> None:
+        published[symbol] = candles
+
+    writer = CandleWriter()
+    writer.start(service, publish)
+    writer.add_trades([_trade("10")])
+    writer.add_trades([_trade("12"), _trade("5", "ETH-USD")])
+    await asyncio.sleep(0)
+    await writer.stop()
+
+    # Three trades of two symbols, merged as two candles
+    assert len(service.calls) == 1
+    assert len(service.calls[0]) == 2
+    (candle,) = published["BTC-USD"]
+    assert (candle.open, candle.close, candle.trades) == (
+        Decimal("10"),
+        Decimal("12"),
+        2,
+    )
+    assert published["ETH-USD"][0].close == Decimal("5")
+
+
+@pytest.mark.asyncio
+@patch("app.engine.candle.RETRY_DELAY", 0)
+async def test_candle_writer_retries_failed_candles_only():
+    service = FakeCandleService(failures=1)
+    published = []
+
+    async def publish(symbol: str, candles: list[CandleDB]) -> None:
+        published.extend(candles)
+
+    writer = CandleWriter()
+    writer.start(service, publish)
+    writer.add_trades([_trade("10"), _trade("5", "ETH-USD")])
+    while len(published) < 2:
+        await asyncio.sleep(0)
+    await writer.stop()
+
+    first, second = service.calls
+    assert [candle.symbol for candle in first] == ["BTC-USD", "ETH-USD"]
+    assert second == first[:1]
+    assert [candle.symbol for candle in published] == ["ETH-USD", "BTC-USD"]
+    assert writer.pending == [] and writer.unmerged == []
+
+
+def test_candle_writer_ignores_trades_until_started():
+    writer = CandleWriter()
+    writer.add_trades([_trade("10")])
+    assert writer.pending == []
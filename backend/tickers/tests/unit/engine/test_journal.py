@@ -0,0 +1,182 @@
+import asyncio
+from decimal import Decimal
+import pytest
+
+from app.engine import OrderBook, OrderJournal
+from app.engine import journal as journal_module
+from app.schemas import BookSnapshotDB, OrderDB, OrderEventDB
+
+
+class MemoryEventRepository:
+    def __init__(self) -> None:
+        self.documents: list[dict] = []
+        self.inserts = 0
+
+    async def create_events(self, documents: list[dict]) -> None:
+        await asyncio.sleep(0)
+        self.inserts += 1
+        self.documents.extend(documents)
+
+    async def iterate_events(self, symbol: str, after: int = 0):
+        for document in self.documents:
+            if document["symbol"] == symbol and document["sequence"] > after:
+                yield OrderEventDB.from_document(document)
+
+    async def get_symbols(self) -> list[str]:
+        return list({document["symbol"] for document in self.documents})
+
+    async def delete_events(self, symbol: str, until: int) -> int:
+        self.documents = [
+            document
+            for document in self.documents
+            if document["symbol"] != symbol or document["sequence"] > until
+        ]
+
+
+class FailingEventRepository(MemoryEventRepository):
+    def __init__(self, failures: int) -> None:
+        super().__init__()
+        self.failures = failures
+
+    async def create_events(self, documents: list[dict]) -> None:
+        if self.failures:
+            self.failures -= 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("insert failed")
+        await super().create_events(documents)
+
+
+class MemorySnapshotRepository:
+    def __init__(self) -> None:
+        self.snapshots: dict[str, tuple[int, list[dict]]] = {}
+
+    async def create_snapshot(self, symbol, sequence, orders, chunk_size):
+        self.snapshots[symbol] = (sequence, orders)
+
+    async def get_latest_snapshot(self, symbol: str):
+        if symbol not in self.snapshots:
+            return None
+        sequence, orders = self.snapshots[symbol]
+        snapshot = BookSnapshotDB.from_document(
+            {
+                "symbol": symbol,
+                "sequence": sequence,
+                "part": 0,
+                "parts": 1,
+                "orders": orders,
+            }
+        )
+        return snapshot.sequence, snapshot.orders
+
+    async def get_symbols(self) -> list[str]:
+        return list(self.snapshots)
+
+    async def delete_snapshots(self, symbol: str, before: int) -> int:
+        return 0
+
+
+def _order(side: str, price: str, qty: str = "1") -> OrderDB:
+    return OrderDB(
+        symbol="BTC-USD",
+        price=price,
+        init_qty=qty,
+        type="limit",
+        side=side,
+        user_id="646be16ba7f9c69f0bdf2bc5",
+    )
+
+
+def _execute(journal: OrderJournal, book: OrderBook, order: OrderDB) -> None:
+    # The journaling part of execute_order
+    journal.append_accepted(order)
+    journal.append_fills(order, book.match(order))
+
+
+def _state(book: OrderBook) -> list[tuple]:
+    return [
+        (str(order.id), order.price, order.executed_qty)
+        for side in ("buy", "sell")
+        for order in book.get_orders(side)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_commit_groups_events_into_one_insert():
+    events = MemoryEventRepository()
+    journal = OrderJournal()
+    journal.start(events, MemorySnapshotRepository())
+    book = OrderBook("BTC-USD")
+
+    _execute(journal, book, _order("sell", "10"))
+    _execute(journal, book, _order("buy", "10"))
+    await journal.commit()
+    await journal.stop()
+
+    assert [document["type"] for document in events.documents] == [
+        "accepted",
+        "accepted",
+        "fill",
+    ]
+    assert [document["sequence"] for document in events.documents] == [
+        1,
+        2,
+        3,
+    ]
+    assert events.inserts == 1
+
+
+@pytest.mark.asyncio
+async def test_load_book_replays_journal_after_snapshot():
+    events = MemoryEventRepository()
+    snapshots = MemorySnapshotRepository()
+    journal = OrderJournal()
+    journal.start(events, snapshots)
+    book = OrderBook("BTC-USD")
+
+    _execute(journal, book, _order("sell", "10", "2"))
+    _execute(journal, book, _order("sell", "11", "1"))
+    assert await journal.write_snapshot(book)
+    _execute(journal, book, _order("buy", "11", "2.5"))
+    _execute(journal, book, _order("buy", "9", "1"))
+    resting = _order("sell", "12")
+    book.add_order(resting)
+    journal.append_accepted(resting)
+    book.remove_order(resting.id)
+    journal.append_cancel(resting)
+    await journal.stop()
+
+    # Events covered by the snapshot are deleted
+    assert events.documents[0]["sequence"] == 3
+    journal = OrderJournal()
+    journal.start(events, snapshots)
+    restored = await journal.load_book("BTC-USD")
+    await journal.stop()
+
+    assert _state(restored) == _state(book)
+    assert _state(restored)[-1][2] == Decimal("0.5")
+    assert journal.sequences["BTC-USD"] == 8
+
+
+@pytest.mark.asyncio
+async def test_failed_insert_is_retried(monkeypatch):
+    monkeypatch.setattr(journal_module, "RETRY_DELAY", 0)
+    events = FailingEventRepository(failures=2)
+    journal = OrderJournal()
+    journal.start(events, MemorySnapshotRepository())
+    book = OrderBook("BTC-USD")
+
+    _execute(journal, book, _order("sell", "10"))
+    first = asyncio.create_task(journal.commit())
+    # Appended while the first insert is failing
+    await asyncio.sleep(0.005)
+    _execute(journal, book, _order("buy", "10"))
+    await journal.commit()
+    await first
+    await journal.stop()
+
+    assert [document["sequence"] for document in events.documents] == [
+        1,
+        2,
+        3,
+    ]
+    assert journal.get_metrics()["retries"] == 2
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+
+from app.engine import RollingTicker, TickerManager
+from app.schemas import TradeDB, UserTrade
+
+NOW = datetime(2023, 5, 16, 12, 0, 30)
+
+
+def _trade(
+    price: str, qty: str, created_at: datetime, symbol: str = "BTC-USD"
+) -> TradeDB:
+    return TradeDB(
+        symbol=symbol,
+        orders=["6463a3b2b4b0d6f5b0b3f1a1", "6463a3b2b4b0d6f5b0b3f1a2"],
+        price=Decimal(price),
+        qty=Decimal(qty),
+        users=[
+            UserTrade(user_id="1", side="buy"),
+            UserTrade(user_id="2", side="sell"),
+        ],
+        created_at=created_at,
+    )
+
+
+def test_rolling_ticker_stats():
+    ticker = RollingTicker("BTC-USD")
+    ticker.add_trade(_trade("10", "1", NOW - timedelta(hours=20)))
+    ticker.add_trade(_trade("15", "2", NOW - timedelta(hours=10)))
+    ticker.add_trade(_trade("8", "1", NOW - timedelta(hours=5)))
+    ticker.add_trade(_trade("12", "0.5", NOW))
+
+    stats = ticker.get_stats(NOW)
+
+    assert stats.last_price == Decimal("12")
+    assert stats.open_price == Decimal("10")
+    assert stats.high == Decimal("15")
+    assert stats.low == Decimal("8")
+    assert stats.price_change == Decimal("2")
+    assert stats.price_change_percent == Decimal("20.00")
+    assert stats.volume == Decimal("4.5")
+    assert stats.trades == 4
+
+
+def test_rolling_ticker_drops_old_buckets():
+    ticker = RollingTicker("BTC-USD")
+    ticker.add_trade(_trade("20", "1", NOW - timedelta(hours=30)))
+    ticker.add_trade(_trade("10", "1", NOW - timedelta(hours=20)))
+    ticker.add_trade(_trade("12", "2", NOW - timedelta(hours=1)))
+
+    stats = ticker.get_stats(NOW + timedelta(hours=4))
+
+    assert stats.open_price == Decimal("12")
+    assert stats.high == stats.low == Decimal("12")
+    assert stats.volume == Decimal("2")
+    assert stats.trades == 1
+
+    stats = ticker.get_stats(NOW + timedelta(days=2))
+
+    assert stats.last_price == stats.open_price == Decimal("12")
+    assert stats.price_change == Decimal("0")
+    assert stats.volume == Decimal("0")
+    assert stats.trades == 0
+
+
+def test_rolling_ticker_counts_late_trades_in_newest_bucket():
+    ticker = RollingTicker("BTC-USD")
+    ticker.add_trade(_trade("10", "1", NOW))
+    ticker.add_trade(_trade("9", "1", NOW - timedelta(minutes=5)))
+
+    stats = ticker.get_stats(NOW)
+
+    assert stats.low == Decimal("9")
+    assert stats.last_price == Decimal("9")
+    assert stats.trades == 2
+
+
+@pytest.mark.asyncio
+async def test_manager_publishes_changed_tickers():
+    manager = TickerManager()
+    now = datetime.utcnow()
+    manager.add_trades(
+        [_trade("10", "1", now), _trade("5", "1", now, symbol="ETH-USD")]
+    )
+    published = []
+
+    async def publish(symbol: str, ticker: dict) -> None:
+        published.append((symbol, ticker))
+
+    await manager.publish_changes(publish)
+    assert [symbol for symbol, _ in published] == ["BTC-USD", "ETH-USD"]
+    assert published[0][1]["lastPrice"] == "10"
+
+    published.clear()
+    manager.add_trades([_trade("11", "1", now)])
+    await manager.publish_changes(publish)
+    assert [symbol for symbol, _ in published] == ["BTC-USD"]
@@ -0,0 +1,211 @@
+import asyncio
+from unittest.mock import patch
+import pytest
+
+from app.core.exceptions import (
+    OrderQueueFullException,
+    UnknownSymbolException,
+)
+from app.engine import (
+    MatchingWorker,
+    OrderBook,
+    OrderBookManager,
+    OrderRetryError,
+)
+from app.schemas import OrderDB
+
+
+def _order(symbol: str = "BTC-USD") -> OrderDB:
+    return OrderDB(
+        symbol=symbol,
+        price="10",
+        init_qty="1",
+        type="limit",
+        side="buy",
+        user_id="646be16ba7f9c69f0bdf2bc5",
+    )
+
+
+@pytest.mark.asyncio
+async def test_worker_handles_orders_one_at_a_time():
+    running = []
+    handled = []
+
+    async def handler(order: OrderDB) -> None:
+        running.append(order.id)
+        assert len(running) == 1
+        await asyncio.sleep(0)
+        handled.append(order.id)
+        running.remove(order.id)
+
+    worker = MatchingWorker("BTC-USD", handler, maxsize=10)
+    worker.start()
+    orders = [_order() for _ in range(5)]
+    for order in orders:
+        assert worker.reserve()
+        worker.submit(order)
+    await worker.queue.join()
+    await worker.stop()
+    assert handled == [order.id for order in orders]
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_handler_error():
+    handled = []
+
+    async def handler(order: OrderDB) -> None:
+        if not handled:
+            handled.append(None)
+            raise ValueError("boom")
+        handled.append(order.id)
+
+    worker = MatchingWorker("BTC-USD", handler, maxsize=10)
+    worker.start()
+    second = _order()
+    for order in (_order(), second):
+        assert worker.reserve()
+        worker.submit(order)
+    await worker.queue.join()
+    await worker.stop()
+    assert handled == [None, second.id]
+    metrics = worker.get_metrics()
+    assert metrics["handled"] == 1 and metrics["failed"] == 1
+    assert "boom" in metrics["last_error"]
+
+
+@pytest.mark.asyncio
+@patch("app.engine.worker.RETRY_DELAY", 0)
+async def test_worker_retries_order_before_next_ones():
+    handled = []
+
+    async def handler(order: OrderDB) -> None:
+        handled.append(order.id)
+        if len(handled) < 3:
+            raise OrderRetryError("not stored")
+
+    worker = MatchingWorker("BTC-USD", handler, maxsize=10)
+    worker.start()
+    first, second = _order(), _order()
+    for order in (first, second):
+        assert worker.reserve()
+        worker.submit(order)
+    await worker.queue.join()
+    await worker.stop()
+    assert handled == [first.id, first.id, first.id, second.id]
+    assert worker.get_metrics()["retries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_worker_stop_handles_queued_orders():
+    handled = []
+
+    async def handler(order: OrderDB) -> None:
+        await asyncio.sleep(0)
+        handled.append(order.id)
+
+    worker = MatchingWorker("BTC-USD", handler, maxsize=10)
+    worker.start()
+    orders = [_order() for _ in range(3)]
+    for order in orders:
+        assert worker.reserve()
+        worker.submit(order)
+    await worker.stop()
+    assert handled == [order.id for order in orders]
+
+
+@pytest.mark.asyncio
+@patch("app.engine.manager.settings.MATCHING_QUEUE_SIZE", 2)
+async def test_manager_reserve():
+    event = asyncio.Event()
+
+    async def handler(order: OrderDB) -> None:
+        await event.wait()
+
+    manager = OrderBookManager()
+    manager.start(handler)
+    manager.reserve("BTC-USD")
+    manager.submit(_order())
+    await asyncio.sleep(0)
+    # One order is being handled, one slot is queued and one reserved
+    manager.reserve("BTC-USD")
+    manager.submit(_order())
+    manager.reserve("BTC-USD")
+    with pytest.raises(OrderQueueFullException):
+        manager.reserve("BTC-USD")
+    manager.release("BTC-USD")
+    manager.reserve("BTC-USD")
+    manager.release("BTC-USD")
+    manager.reserve("ETH-USD")
+    assert set(manager.workers) == {"BTC-USD", "ETH-USD"}
+    event.set()
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_manager_rejects_orders_when_stopping():
+    async def handler(order: OrderDB) -> None:
+        pass
+
+    manager = OrderBookManager()
+    manager.start(handler)
+    manager.reserve("BTC-USD")
+    manager.release("BTC-USD")
+    await manager.stop()
+    with pytest.raises(OrderQueueFullException):
+        manager.reserve("BTC-USD")
+
+
+class FakeJournal:
+    def __init__(self, book: OrderBook) -> None:
+        self.book = book
+
+    async def get_symbols(self) -> set[str]:
+        return {self.book.symbol}
+
+    async def load_book(self, symbol: str) -> OrderBook:
+        return self.book
+
+
+class FakeOrderService:
+    def __init__(self, orders: list[OrderDB]) -> None:
+        self.orders = orders
+
+    async def get_open_orders(self) -> list[OrderDB]:
+        return self.orders
+
+
+@pytest.mark.asyncio
+async def test_manager_restore_recovers_unjournaled_orders():
+    journaled, queued = _order(), _order()
+    book = OrderBook("BTC-USD")
+    book.add_order(journaled)
+    handled = []
+
+    async def handler(order: OrderDB) -> None:
+        handled.append(order.id)
+
+    manager = OrderBookManager()
+    await manager.restore(
+        FakeJournal(book), FakeOrderService([journaled, queued])
+    )
+    assert [order.id for order in manager.recovered] == [queued.id]
+
+    manager.start(handler)
+    assert await manager.submit_recovered() == 1
+    await manager.stop()
+    assert handled == [queued.id]
+    assert manager.recovered == []
+
+
+def test_manager_check_symbol():
+    manager = OrderBookManager()
+    manager.check_symbol("BTC-USD")
+    with pytest.raises(UnknownSymbolException):
+        manager.check_symbol("UNKNOWN")
+
+
+def test_manager_get_snapshot_does_not_create_book():
+    manager = OrderBookManager()
+    snapshot = manager.get_snapshot("BTC-USD")
+    assert snapshot["buy"] == [] and snapshot["sell"] == []
+    assert manager.books == {}
@@ -1,5 +1,8 @@
+from datetime import datetime, timedelta
+from bson import ObjectId
 import pytest
 
+from app.core.exceptions import InvalidCursorException
 from app.repositories import BaseRepository
 
 
@@ -10,6 +13,16 @@ async def test_create_document(base_repository: BaseRepository):
     assert data["test"] == "test"
 
 
+@pytest.mark.asyncio
+async def test_create_documents(base_repository: BaseRepository):
+    result = await base_repository.create_documents(
+        [{"test": "test"}, {"test": "test1"}]
+    )
+    data = await base_repository.get_document_by_id(result[1])
+    assert len(result) == 2
+    assert data["test"] == "test1"
+
+
 @pytest.mark.asyncio
 async def test_get_document_by_id(base_repository: BaseRepository):
     result = await base_repository.create_document({"test": "test"})
@@ -50,6 +63,18 @@ async def test_update_document_by_id(base_repository: BaseRepository):
     assert data["test"] == "test1"
 
 
+@pytest.mark.asyncio
+async def test_update_documents_by_id(base_repository: BaseRepository):
+    first = await base_repository.create_document({"test": "test"})
+    second = await base_repository.create_document({"test": "test"})
+    modified = await base_repository.update_documents_by_id(
+        {first: {"test": "test1"}, second: {"test": "test2"}}
+    )
+    assert modified == 2
+    data = await base_repository.get_document_by_id(second)
+    assert data["test"] == "test2"
+
+
 @pytest.mark.asyncio
 async def test_delete_document_by_id(base_repository: BaseRepository):
     result = await base_repository.create_document({"test": "test"})
@@ -57,3 +82,87 @@ async def test_delete_document_by_id(base_repository: BaseRepository):
     deleted = await base_repository.get_document_by_id(result)
     assert data["test"] == "test"
     assert deleted is None
+
+
+class IndexedRepository(BaseRepository):
+    indexes = [[("a", 1), ("b", 1), ("createdAt", -1)]]
+
+
+class UniqueIndexedRepository(BaseRepository):
+    unique_indexes = [[("c", 1), ("createdAt", 1)]]
+
+
+@pytest.mark.asyncio
+async def test_create_indexes(db):
+    repository = IndexedRepository(collection_name="test_collection")
+    result = await repository.create_indexes()
+    assert result == ["a_1_b_1_createdAt_-1"]
+    result = await repository.create_indexes()
+    assert result == ["a_1_b_1_createdAt_-1"]
+
+
+@pytest.mark.asyncio
+async def test_create_unique_indexes(db):
+    repository = UniqueIndexedRepository(collection_name="test_collection")
+    assert await repository.create_indexes() == ["c_1_createdAt_1"]
+    info = await repository.collection.index_information()
+    assert info["c_1_createdAt_1"]["unique"] is True
+
+
+def test_is_covered():
+    assert IndexedRepository.is_covered({"a"}, "b")
+    assert IndexedRepository.is_covered({"b", "a"}, "createdAt")
+    assert IndexedRepository.is_covered({"_id"}, None)
+    assert not IndexedRepository.is_covered({"b"}, "createdAt")
+    assert not IndexedRepository.is_covered({"a"}, "createdAt")
+    assert not BaseRepository.is_covered({"a"}, None)
+    assert UniqueIndexedRepository.is_covered({"c"}, "createdAt")
+    assert IndexedRepository.is_covered({"a", "b"}, ("createdAt",))
+    assert IndexedRepository.is_covered({"a"}, ("a", "b", "createdAt"))
+    assert not IndexedRepository.is_covered({"a", "b"}, ("createdAt", "_id"))
+
+
+@pytest.mark.asyncio
+async def test_get_documents_page(base_repository: BaseRepository):
+    now = datetime.utcnow().replace(microsecond=0)
+    ids = [
+        await base_repository.create_document(
+            {"test": "test", "createdAt": now - timedelta(seconds=i % 2)}
+        )
+        for i in range(5)
+    ]
+    first, cursor = await base_repository.get_documents_page(
+        {"test": "test"}, limit=3
+    )
+    second, last_cursor = await base_repository.get_documents_page(
+        {"test": "test"}, limit=3, cursor=cursor
+    )
+    assert len(first) == 3
+    assert len(second) == 2
+    assert last_cursor is None
+    assert {d["_id"] for d in first + second} == set(ids)
+
+
+@pytest.mark.asyncio
+async def test_iterate_documents(base_repository: BaseRepository):
+    await base_repository.create_documents(
+        [{"test": "test", "createdAt": datetime.utcnow()} for _ in range(3)]
+    )
+    result = [
+        document
+        async for document in base_repository.iterate_documents(
+            {"test": "test"}, batch_size=2
+        )
+    ]
+    assert len(result) == 3
+
+
+def test_decode_cursor(base_repository: BaseRepository):
+    document = {"_id": ObjectId(), "createdAt": datetime.utcnow()}
+    cursor = base_repository._encode_cursor(document)
+    assert base_repository._decode_cursor(cursor) == (
+        document["createdAt"],
+        document["_id"],
+    )
+    with pytest.raises(InvalidCursorException):
+        base_repository._decode_cursor("invalid")
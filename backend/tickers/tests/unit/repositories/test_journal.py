@@ -0,0 +1,59 @@
+from datetime import datetime
+from bson import ObjectId
+import pytest
+
+from app.repositories import BookSnapshotRepository, OrderEventRepository
+from app.schemas import OrderDB, OrderEventDB
+
+
+def _order(price: str) -> OrderDB:
+    return OrderDB(
+        symbol="BTC-USD",
+        price=price,
+        init_qty="1",
+        type="limit",
+        side="buy",
+        user_id="646be16ba7f9c69f0bdf2bc5",
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_latest_snapshot_skips_interrupted_snapshot():
+    repository = BookSnapshotRepository()
+    # Only the first part of a snapshot at the same sequence was stored
+    await repository.create_documents(
+        [
+            {
+                "_id": ObjectId(),
+                "snapshotId": ObjectId(),
+                "symbol": "BTC-USD",
+                "sequence": 5,
+                "part": 0,
+                "parts": 2,
+                "orders": [_order("9").to_dict()],
+                "createdAt": datetime.utcnow(),
+            }
+        ]
+    )
+    order = _order("10")
+    await repository.create_snapshot("BTC-USD", 5, [order.to_dict()], 10)
+
+    sequence, orders = await repository.get_latest_snapshot("BTC-USD")
+    assert sequence == 5
+    assert [o.id for o in orders] == [order.id]
+
+
+@pytest.mark.asyncio
+async def test_create_events_skips_stored_events():
+    repository = OrderEventRepository()
+    events = [
+        OrderEventDB(symbol="BTC-USD", sequence=sequence, type="cancel")
+        for sequence in (1, 2)
+    ]
+    await repository.create_events([events[0].to_dict()])
+    await repository.create_events([event.to_dict() for event in events])
+
+    result = [
+        event.sequence async for event in repository.iterate_events("BTC-USD")
+    ]
+    assert result == [1, 2]
@@ -1,3 +1,4 @@
+from decimal import Decimal
 import pytest
 
 from app.repositories import OrderRepository
@@ -63,6 +64,18 @@ async def test_get_all_orders(
     assert data[0].user_id == order_data["user_id"]
 
 
+@pytest.mark.asyncio
+async def test_get_open_orders(
+    order_repository: OrderRepository, order_data: dict
+):
+    first = await order_repository.create_order(OrderCreate(**order_data))
+    second = await order_repository.create_order(OrderCreate(**order_data))
+    await order_repository.update_order_by_id(second.id, {"status": "closed"})
+    third = await order_repository.create_order(OrderCreate(**order_data))
+    data = await order_repository.get_open_orders()
+    assert [order.id for order in data] == [first.id, third.id]
+
+
 @pytest.mark.asyncio
 async def test_update_order_by_id(
     order_repository: OrderRepository, order_data: dict
@@ -86,6 +99,24 @@ async def test_update_order_by_id_schema(
     assert data.executed_qty == 1
 
 
+@pytest.mark.asyncio
+async def test_update_orders(
+    order_repository: OrderRepository, order_data: dict
+):
+    first = await order_repository.create_order(OrderCreate(**order_data))
+    second = await order_repository.create_order(OrderCreate(**order_data))
+    first.executed_qty = 1
+    first.status = "closed"
+    second.executed_qty = Decimal("0.5")
+    modified = await order_repository.update_orders([first, second])
+    assert modified == 2
+    data = await order_repository.get_order_by_id(first.id)
+    assert data.status == "closed"
+    data = await order_repository.get_order_by_id(second.id)
+    assert data.executed_qty == Decimal("0.5")
+    assert data.status == "open"
+
+
 @pytest.mark.asyncio
 async def test_delete_order_by_id(
     order_repository: OrderRepository, order_data: dict
@@ -95,3 +126,17 @@ async def test_delete_order_by_id(
     deleted_data = await order_repository.get_order_by_id(result.id)
     assert data.symbol == order_data["symbol"]
     assert deleted_data is None
+
+
+@pytest.mark.parametrize(
+    "fields, order_by",
+    [
+        ({"status", "side", "symbol"}, "price"),
+        ({"status"}, "createdAt"),
+        ({"userId"}, "createdAt"),
+        ({"symbol", "userId"}, "createdAt"),
+        ({"userId"}, ("createdAt", "_id")),
+    ],
+)
+def test_indexes_cover_queries(fields: set, order_by: str):
+    assert OrderRepository.is_covered(fields, order_by)
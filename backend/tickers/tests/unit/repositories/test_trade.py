@@ -1,5 +1,7 @@
+from motor.motor_asyncio import AsyncIOMotorClient
 import pytest
 
+from app.core import settings
 from app.repositories import TradeRepository
 from app.schemas import TradeDB
 
@@ -13,6 +15,17 @@ async def test_create_trade(
     assert data.symbol == trade_data["symbol"]
 
 
+@pytest.mark.asyncio
+async def test_create_trades(
+    trade_repository: TradeRepository, trade_data: dict
+):
+    trades = [TradeDB(**trade_data), TradeDB(**trade_data)]
+    result = await trade_repository.create_trades(trades)
+    data = await trade_repository.get_trade_by_id(str(result[1].id))
+    assert data.id == trades[1].id
+    assert data.symbol == trade_data["symbol"]
+
+
 @pytest.mark.asyncio
 async def test_get_trade_by_id(
     trade_repository: TradeRepository, trade_data: dict
@@ -127,3 +140,31 @@ async def test_get_all_trades(
     await trade_repository.create_trade(TradeDB(**trade_data))
     data = await trade_repository.get_all_trades()
     assert len(data) == 2
+
+
+@pytest.mark.parametrize(
+    "fields, order_by",
+    [
+        ({"symbol"}, "createdAt"),
+        ({"users.userId"}, "createdAt"),
+        ({"orders"}, "createdAt"),
+        ({"symbol", "users.userId"}, "createdAt"),
+        ({"symbol"}, ("createdAt", "_id")),
+        ({"users.userId"}, ("createdAt", "_id")),
+        ({"symbol", "users.userId"}, ("createdAt", "_id")),
+    ],
+)
+def test_indexes_cover_queries(fields: set, order_by: str):
+    assert TradeRepository.is_covered(fields, order_by)
+
+
+def test_timeseries_storage():
+    client = AsyncIOMotorClient(settings.DB_URL)
+    repository = TradeRepository(client, storage="timeseries")
+    assert repository.collection_name == "trades_timeseries"
+    assert repository.timeseries["timeField"] == "createdAt"
+    assert repository.timeseries["metaField"] == "symbol"
+
+    repository = TradeRepository(client, storage="documents")
+    assert repository.collection_name == "trades"
+    assert repository.timeseries is None
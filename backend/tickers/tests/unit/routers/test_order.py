@@ -47,23 +47,25 @@ async def test_get_order_by_id(
 async def test_get_last_orders_by_symbol(
     mock_close_connection, mock_connect, order_service: OrderService
 ) -> None:
+    await _create_order(order_service)
+    await _create_order(order_service)
+    await _create_order(
+        order_service,
+        order_data={
+            "symbol": "AAPL",
+            "price": 120.0,
+            "init_qty": 1.0,
+            "type": "limit",
+            "side": "sell",
+            "user_id": "646be16ba7f9c69f0bdf2bc5",
+        },
+    )
     with TestClient(app) as client:
-        buy_order = await _create_order(order_service)
-        sell_order = await _create_order(
-            order_service,
-            order_data={
-                "symbol": "AAPL",
-                "price": 120.0,
-                "init_qty": 1.0,
-                "type": "limit",
-                "side": "sell",
-                "user_id": "646be16ba7f9c69f0bdf2bc5",
-            },
-        )
         response = client.get("/orders/last/AAPL")
         assert response.status_code == status.HTTP_200_OK
-        assert response.json()["buy"][0]["side"] == buy_order.side
-        assert response.json()["sell"][0]["side"] == sell_order.side
+        assert response.json()["buy"] == [{"price": "100.0", "qty": "2.0"}]
+        assert response.json()["sell"] == [{"price": "120.0", "qty": "1.0"}]
+        assert response.json()["sequence"] == 0
 
 
 @pytest.mark.asyncio
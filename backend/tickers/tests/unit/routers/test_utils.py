@@ -0,0 +1,159 @@
+import asyncio
+from decimal import Decimal
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+import pytest
+
+from app.core.exceptions import (
+    BalanceReservationTimeoutException,
+    NotEnoughBalanceException,
+)
+from app.engine import Fill, OrderRetryError, order_books
+from app.routers.utils import (
+    execute_order,
+    release_reserved_balance,
+    reserve_order_balance,
+    send_executed_orders,
+    send_order_book_delta,
+    stream_ndjson,
+)
+from app.schemas import OrderDB, OrderResponseSchema
+
+
+def _order(side: str, user_id: str) -> OrderDB:
+    return OrderDB(
+        symbol="BTC-USD",
+        price="10",
+        init_qty="5",
+        type="limit",
+        side=side,
+        user_id=user_id,
+    )
+
+
+@pytest.mark.asyncio
+@patch(
+    "app.routers.utils.pika_client.send_message_to_accounts_queue",
+    new_callable=AsyncMock,
+)
+async def test_send_executed_orders(mock_send_message):
+    new_order = _order("buy", "taker")
+    fills = [
+        Fill(order=_order("sell", "maker1"), qty=Decimal("1")),
+        Fill(order=_order("sell", "maker2"), qty=Decimal("2")),
+        Fill(order=_order("sell", "maker1"), qty=Decimal("0.5")),
+    ]
+    await send_executed_orders(new_order, fills)
+    mock_send_message.assert_awaited_once()
+    message = mock_send_message.call_args.args[0]
+    assert {(item.pop("reason"), item.pop("ref_id")) for item in message} == {
+        ("trade", str(new_order.id))
+    }
+    assert message == [
+        {"user_id": "maker1", "currency": "USD", "amount": "1.5"},
+        {"user_id": "taker", "currency": "BTC", "amount": "3.5"},
+        {"user_id": "maker2", "currency": "USD", "amount": "2"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_ndjson():
+    orders = [_order("buy", "user1"), _order("sell", "user2")]
+
+    async def items():
+        for order in orders:
+            yield order
+
+    response = stream_ndjson(items(), OrderResponseSchema)
+    lines = [line async for line in response.body_iterator]
+    assert response.media_type == "application/x-ndjson"
+    assert len(lines) == 2
+    assert json.loads(lines[1])["userId"] == "user2"
+    assert json.loads(lines[1])["_id"] == str(orders[1].id)
+
+
+@pytest.mark.asyncio
+@patch(
+    "app.routers.utils.pika_client.send_message_to_websocket_queue",
+    new_callable=AsyncMock,
+)
+async def test_send_order_book_delta(mock_send_message):
+    order_books.books = {}
+    await send_order_book_delta("BTC-USD")
+    mock_send_message.assert_not_awaited()
+    order_books.get_book("BTC-USD").add_order(_order("buy", "user1"))
+    await send_order_book_delta("BTC-USD")
+    message = mock_send_message.call_args.kwargs["message"]
+    assert message["target"] == "order_book_delta"
+    assert message["data"]["sequence"] == 1
+    assert message["data"]["changes"] == [
+        {"action": "insert", "side": "buy", "price": "10", "qty": "5"}
+    ]
+    order_books.books = {}
+
+
+@pytest.mark.asyncio
+@patch(
+    "app.routers.utils.pika_client.send_message_to_accounts_queue",
+    new_callable=AsyncMock,
+)
+async def test_execute_order_undoes_match_when_not_stored(mock_send_message):
+    order_books.books = {}
+    book = order_books.get_book("BTC-USD")
+    resting = _order("sell", "maker")
+    book.add_order(resting)
+    order_service = MagicMock()
+    order_service.update_orders = AsyncMock(side_effect=OSError("down"))
+    new_order = _order("buy", "taker")
+
+    with pytest.raises(OrderRetryError):
+        await execute_order(new_order, order_service, MagicMock())
+
+    assert book.get_orders("sell") == [resting]
+    assert resting.executed_qty == 0 and resting.status == "open"
+    assert new_order.executed_qty == 0 and new_order.id not in book
+    mock_send_message.assert_not_awaited()
+    order_books.books = {}
+
+
+@pytest.mark.asyncio
+@patch(
+    "app.routers.utils.pika_client.call_accounts_queue",
+    new_callable=AsyncMock,
+)
+async def test_reserve_order_balance(mock_call):
+    mock_call.return_value = {"status": "ok"}
+    await reserve_order_balance(_order("buy", "user1"))
+    assert mock_call.call_args.args[0] == {
+        "user_id": "user1",
+        "currency": "USD",
+        "amount": "50",
+    }
+    assert mock_call.call_args.kwargs["message_type"] == "reserve"
+
+    mock_call.return_value = {"status": "error"}
+    with pytest.raises(NotEnoughBalanceException):
+        await reserve_order_balance(_order("sell", "user1"))
+
+    mock_call.side_effect = asyncio.TimeoutError()
+    with pytest.raises(BalanceReservationTimeoutException):
+        await reserve_order_balance(_order("sell", "user1"))
+
+
+@pytest.mark.asyncio
+@patch(
+    "app.routers.utils.pika_client.send_message_to_accounts_queue",
+    new_callable=AsyncMock,
+)
+async def test_release_reserved_balance(mock_send_message):
+    reply = {"user_id": "user1", "currency": "BTC", "amount": "5"}
+    await release_reserved_balance(
+        {**reply, "reservation_id": "1", "status": "error"}
+    )
+    mock_send_message.assert_not_awaited()
+    await release_reserved_balance(
+        {**reply, "reservation_id": "1", "status": "ok"}
+    )
+    mock_send_message.assert_awaited_once_with(
+        [{"reason": "release", "ref_id": "1", **reply}]
+    )
@@ -0,0 +1,85 @@
+from decimal import Decimal
+import json
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+
+from app.schemas import (
+    NewTradesList,
+    OrderDB,
+    OrderUpdate,
+    TradeDB,
+    TradeResponse,
+)
+
+
+def _order() -> OrderDB:
+    return OrderDB(
+        symbol="BTC-USD",
+        price=Decimal("100.5"),
+        init_qty=Decimal("2"),
+        type="limit",
+        side="buy",
+        user_id="user1",
+    )
+
+
+def _trade() -> TradeDB:
+    return TradeDB(
+        symbol="BTC-USD",
+        orders=[ObjectId(), ObjectId()],
+        price=Decimal("100.5"),
+        qty=Decimal("1"),
+        users=[
+            {"user_id": "user1", "side": "buy"},
+            {"user_id": "user2", "side": "sell"},
+        ],
+    )
+
+
+def test_to_dict():
+    order = _order()
+    document = order.to_dict()
+    assert document["_id"] == order.id
+    assert document["price"] == Decimal128("100.5")
+    assert document["initQty"] == Decimal128("2")
+    assert document["endedAt"] is None
+    assert OrderUpdate(status="closed").to_dict(
+        exclude_unset=True, exclude_none=True
+    ) == {"status": "closed"}
+    assert order.to_dict(include={"id", "price"}) == {
+        "_id": order.id,
+        "price": Decimal128("100.5"),
+    }
+
+
+def test_from_document():
+    order = _order()
+    document = order.to_dict()
+    document["executedQty"] = 1
+    del document["endedAt"]
+    decoded = OrderDB.from_document(document)
+    assert decoded.price == Decimal("100.5")
+    assert decoded.executed_qty == Decimal("1")
+    assert decoded.ended_at is None
+    assert "ended_at" not in decoded.__fields_set__
+    trade = _trade()
+    assert TradeDB.from_document(trade.to_dict()) == trade
+
+
+def test_to_json_matches_pydantic():
+    order = _order()
+    assert order.to_json() == json.loads(order.json())
+    assert order.to_json(exclude={"id"}) == json.loads(
+        order.json(exclude={"id"})
+    )
+    trades = NewTradesList(new_trades=[_trade()])
+    assert trades.to_json(by_alias=True) == json.loads(
+        trades.json(by_alias=True)
+    )
+
+
+def test_to_json_uses_json_encoders():
+    trade = TradeResponse(**_trade().dict())
+    payload = trade.to_json(by_alias=True)
+    assert payload == json.loads(trade.json(by_alias=True))
+    assert payload["price"] == str(trade.price)
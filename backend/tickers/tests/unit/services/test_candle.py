@@ -0,0 +1,132 @@
+from datetime import datetime
+from decimal import Decimal
+import pytest
+
+from app.schemas import CANDLE_INTERVALS, CandleResponse, TradeDB, UserTrade
+from app.services.candle import CandleService, build_candles, get_open_time
+
+
+def _trade(price: str, qty: str, created_at: datetime) -> TradeDB:
+    return TradeDB(
+        symbol="BTC-USD",
+        orders=["6463a3b2b4b0d6f5b0b3f1a1", "6463a3b2b4b0d6f5b0b3f1a2"],
+        price=Decimal(price),
+        qty=Decimal(qty),
+        users=[
+            UserTrade(user_id="1", side="buy"),
+            UserTrade(user_id="2", side="sell"),
+        ],
+        created_at=created_at,
+    )
+
+
+def test_get_open_time():
+    time = datetime(2023, 5, 16, 13, 47, 31, 250000)
+    assert get_open_time(time, "1s") == datetime(2023, 5, 16, 13, 47, 31)
+    assert get_open_time(time, "1m") == datetime(2023, 5, 16, 13, 47)
+    assert get_open_time(time, "5m") == datetime(2023, 5, 16, 13, 45)
+    assert get_open_time(time, "1h") == datetime(2023, 5, 16, 13)
+    assert get_open_time(time, "1d") == datetime(2023, 5, 16)
+
+
+def test_build_candles():
+    trades = [
+        _trade("10", "1", datetime(2023, 5, 16, 13, 47, 1)),
+        _trade("12", "2", datetime(2023, 5, 16, 13, 47, 20)),
+        _trade("9", "0.5", datetime(2023, 5, 16, 13, 47, 59)),
+        _trade("11", "1", datetime(2023, 5, 16, 13, 48, 5)),
+    ]
+
+    first, second = build_candles(trades, "1m")
+
+    assert first.open_time == datetime(2023, 5, 16, 13, 47)
+    assert (first.open, first.high, first.low, first.close) == (
+        Decimal("10"),
+        Decimal("12"),
+        Decimal("9"),
+        Decimal("9"),
+    )
+    assert first.volume == Decimal("3.5")
+    assert first.trades == 3
+    assert second.open_time == datetime(2023, 5, 16, 13, 48)
+    assert second.open == second.close == Decimal("11")
+    assert second.trades == 1
+
+    (candle,) = build_candles(trades, "1h")
+    assert candle.close == Decimal("11")
+    assert candle.volume == Decimal("4.5")
+    assert candle.trades == 4
+
+
+def test_candle_payload_sends_decimals_as_strings():
+    (candle,) = build_candles(
+        [_trade("10.5", "1", datetime(2023, 5, 16, 13, 47, 1))], "1d"
+    )
+
+    payload = CandleResponse(**candle.dict()).to_json(by_alias=True)
+
+    assert payload["openTime"] == "2023-05-16T00:00:00"
+    assert payload["close"] == "10.5"
+    assert payload["trades"] == 1
+
+
+class FakeCandleRepository:
+    def __init__(self, last_open_time: datetime | None) -> None:
+        self.last_open_time = last_open_time
+
+    async def get_last_candle(self, symbol: str, interval: str):
+        if self.last_open_time is None or interval != "1m":
+            return None
+        (candle,) = build_candles(
+            [_trade("10", "1", self.last_open_time)], interval
+        )
+        return candle
+
+    async def replace_candles(self, candles: list) -> int:
+        return len(candles)
+
+    async def merge_candle(self, candle):
+        if candle.interval == "1h":
+            raise RuntimeError("write failed")
+        return candle
+
+
+class FakeTradeRepository:
+    def __init__(self) -> None:
+        self.starts: dict[str, datetime] = {}
+
+    async def aggregate_candles(
+        self, symbol: str, interval: str, since: datetime
+    ):
+        self.starts[interval] = since
+        return
+        yield
+
+
+@pytest.mark.asyncio
+async def test_backfill_starts_at_last_stored_candle():
+    trade_repository = FakeTradeRepository()
+    service = CandleService(
+        FakeCandleRepository(datetime(2023, 5, 16, 13, 47)),
+        trade_repository,
+    )
+
+    await service.backfill("BTC-USD", datetime(2023, 5, 10, 8, 30, 5))
+
+    assert set(trade_repository.starts) == set(CANDLE_INTERVALS)
+    assert trade_repository.starts["1m"] == datetime(2023, 5, 16, 13, 47)
+    assert trade_repository.starts["1h"] == datetime(2023, 5, 10, 8)
+
+
+@pytest.mark.asyncio
+async def test_merge_candles_returns_failed_candles():
+    service = CandleService(FakeCandleRepository(None), FakeTradeRepository())
+    candles = service.build_trade_candles(
+        [_trade("10", "1", datetime(2023, 5, 16, 13, 47, 1))]
+    )
+
+    merged, failed = await service.merge_candles(candles)
+
+    assert len(candles) == len(CANDLE_INTERVALS)
+    assert [candle.interval for candle in failed] == ["1h"]
+    assert len(merged) == len(CANDLE_INTERVALS) - 1
@@ -0,0 +1,40 @@
+import httpx
+
+from app.core import settings
+
+
+class HTTPClient:
+    """
+    App-scoped pool of keep-alive connections to other services,
+    so requests made per subscription do not open new connections.
+    """
+
+    def __init__(self) -> None:
+        self.client: httpx.AsyncClient | None = None
+
+    def start(self) -> None:
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                settings.HTTP_TIMEOUT,
+                connect=settings.HTTP_CONNECT_TIMEOUT,
+                pool=settings.HTTP_POOL_TIMEOUT,
+            ),
+        )
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        if self.client is None:
+            raise RuntimeError("HTTP client is not started")
+        return await self.client.get(url, **kwargs)
+
+
+http_client = HTTPClient()
@@ -0,0 +1,137 @@
+import asyncio
+from itertools import count
+
+from app.core.rabbitmq import pika_client
+
+
+class SubscriberOverflowError(Exception):
+    pass
+
+
+def get_conflation_key(message: dict) -> tuple | None:
+    """
+    Return the key of messages superseded by a newer one with the same key,
+    or None if every message must be delivered.
+    Order book deltas are sequenced, so they are never conflated.
+    """
+
+    if message.get("target") == "balances":
+        return ("balances",)
+    if message.get("target") == "candles":
+        return ("candles",)
+    if message.get("target") == "ticker":
+        return ("ticker", message["data"]["symbol"])
+    return None
+
+
+def conflate(buffered: dict, message: dict) -> dict:
+    """
+    Return the message that replaces a buffered one with the same key.
+    Balances are merged per currency, the newer amount wins.
+    Candles are merged per symbol, interval and open time, the newer
+    candle wins, it already includes the trades of the older one.
+    Tickers are keyed by symbol, so the newer one replaces the older one.
+    """
+
+    if message.get("target") == "balances":
+        data = {item["currency"]: item for item in buffered["data"]}
+        data.update({item["currency"]: item for item in message["data"]})
+        return {**message, "data": list(data.values())}
+    if message.get("target") == "candles":
+        data = {
+            (item["symbol"], item["interval"], item["openTime"]): item
+            for item in buffered["data"]
+        }
+        data.update(
+            {
+                (item["symbol"], item["interval"], item["openTime"]): item
+                for item in message["data"]
+            }
+        )
+        return {**message, "data": list(data.values())}
+    return message
+
+
+class Subscriber:
+    """
+    Outbound buffer of one websocket connection.
+    The buffer is bounded. A message with a conflation key is conflated
+    with the buffered one with the same key, other messages are appended.
+    When the buffer overflows the subscriber is marked as overflowed
+    and get() raises SubscriberOverflowError.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.buffer: dict[object, dict] = {}
+        self.counter = count()
+        self.event = asyncio.Event()
+        self.overflowed = False
+        self.keys: set[str] = set()
+
+    def put(self, message: dict) -> None:
+        if self.overflowed:
+            return
+        key = get_conflation_key(message)
+        if key is None:
+            key = next(self.counter)
+        elif key in self.buffer:
+            self.buffer[key] = conflate(self.buffer[key], message)
+            return
+        if len(self.buffer) >= self.maxsize:
+            self.overflowed = True
+            self.buffer = {}
+        else:
+            self.buffer[key] = message
+        self.event.set()
+
+    async def get(self) -> dict:
+        while not self.buffer and not self.overflowed:
+            self.event.clear()
+            await self.event.wait()
+        if self.overflowed:
+            raise SubscriberOverflowError()
+        return self.buffer.pop(next(iter(self.buffer)))
+
+
+class MessageHub:
+    """
+    Holds one broker consumer per routing key, symbol or user,
+    and fans its messages out to the local subscribers of the key.
+    The consumer is started with the first subscriber
+    and stopped with the last one.
+    """
+
+    def __init__(self) -> None:
+        self.subscribers: dict[str, set[Subscriber]] = {}
+        self.lock = asyncio.Lock()
+
+    def publish(self, key: str, message: dict) -> None:
+        for subscriber in self.subscribers.get(key, ()):
+            subscriber.put(message)
+
+    async def subscribe(self, key: str, subscriber: Subscriber) -> None:
+        async with self.lock:
+            subscribers = self.subscribers.setdefault(key, set())
+            if not subscribers:
+                await pika_client.start_consuming(key, self.publish)
+            subscribers.add(subscriber)
+            subscriber.keys.add(key)
+
+    async def unsubscribe(self, key: str, subscriber: Subscriber) -> None:
+        async with self.lock:
+            subscriber.keys.discard(key)
+            subscribers = self.subscribers.get(key)
+            if subscribers is None or subscriber not in subscribers:
+                return
+            subscribers.remove(subscriber)
+            if not subscribers:
+                del self.subscribers[key]
+                await pika_client.stop_consuming(key)
+
+    async def unsubscribe_all(self, subscriber: Subscriber) -> None:
+        for key in list(subscriber.keys):
+            await self.unsubscribe(key, subscriber)
+
+
+hub = MessageHub()
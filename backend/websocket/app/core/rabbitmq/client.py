@@ -1,5 +1,8 @@
+import json
+from typing import Callable
 import aio_pika
 from aio_pika import Queue, ExchangeType
+from aio_pika.abc import AbstractIncomingMessage
 
 from app.core import settings
 
@@ -8,6 +11,7 @@ class PikaClient:
     def __init__(self) -> None:
         self.exchange_name = settings.RABBITMQ_EXCHANGE_NAME
         self.websocket_queue_name = settings.RABBITMQ_WEBSOCKET_QUEUE_NAME
+        self.consumers: dict[str, tuple[Queue, str]] = {}
 
     async def connect(self) -> None:
         self.connection = await aio_pika.connect_robust(
@@ -25,62 +29,28 @@ class PikaClient:
     def create_queue_name(self, symbol: str) -> str:
         return f"{self.websocket_queue_name}_{symbol}"
 
-    async def declare_user_queue(
-        self,
-        symbol: str | None = None,
-        user_id: str | None = None,
-        queue: Queue | None = None,
-    ) -> Queue:
-        if queue is None:
-            queue = await self.channel.declare_queue(user_id, auto_delete=True)
+    async def start_consuming(
+        self, routing_key: str, callback: Callable[[str, dict], None]
+    ) -> None:
+        """
+        Consume messages of a routing key from a dedicated queue,
+        passing each decoded message to the callback.
+        """
 
-        if user_id is not None:
-            await queue.bind(
-                self.exchange,
-                routing_key=user_id,
-            )
-        if symbol is not None:
-            broadcast_queue_name = self.create_queue_name(symbol)
-            await queue.bind(
-                self.exchange,
-                routing_key=broadcast_queue_name,
-            )
-        return queue
+        queue = await self.channel.declare_queue(exclusive=True)
+        await queue.bind(self.exchange, routing_key=routing_key)
 
-    async def close_queue(
-        self,
-        queue: Queue,
-        symbol: str | None = None,
-        user_id: str | None = None,
-    ) -> None:
-        broadcast_queue_name = self.create_queue_name(symbol)
-        if user_id is not None:
-            await queue.unbind(
-                self.exchange,
-                routing_key=user_id,
-            )
-        if symbol is not None:
-            await queue.unbind(
-                self.exchange,
-                routing_key=broadcast_queue_name,
-            )
-        await queue.delete(if_unused=False)
+        async def on_message(message: AbstractIncomingMessage) -> None:
+            async with message.process():
+                callback(routing_key, json.loads(message.body))
 
-    async def change_broadcast_queue(
-        self, queue: Queue, symbol: str, unbind_symbol: str | None = None
-    ) -> Queue:
-        broadcast_queue_name = self.create_queue_name(symbol)
-        unbind_broadcast_queue_name = self.create_queue_name(unbind_symbol)
-        if unbind_symbol is not None:
-            await queue.unbind(
-                self.exchange,
-                routing_key=unbind_broadcast_queue_name,
-            )
-        await queue.bind(
-            self.exchange,
-            routing_key=broadcast_queue_name,
-        )
-        return queue
+        consumer_tag = await queue.consume(on_message)
+        self.consumers[routing_key] = (queue, consumer_tag)
+
+    async def stop_consuming(self, routing_key: str) -> None:
+        queue, consumer_tag = self.consumers.pop(routing_key)
+        await queue.cancel(consumer_tag)
+        await queue.delete(if_unused=False)
 
 
 pika_client = PikaClient()
@@ -7,10 +7,35 @@ class Settings(BaseSettings):
     APP_TITLE: str = "Websocket"
     # USER
     USER_INFO_URL: str
+    JWT_SECRET_KEY: str
+    JWT_ALGORITHM: str = "HS256"
+    JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL: int = 300
+    # TICKERS
+    ORDER_BOOK_URL: str
+    # symbols clients can subscribe to, as configured in tickers
+    SYMBOLS: list[str] = [
+        "BTC-USD",
+        "ETH-USD",
+        "SOL-USD",
+        "ADA-USD",
+        "XRP-USD",
+    ]
+    # HTTP CLIENT
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_TIMEOUT: float = 5.0
+    HTTP_CONNECT_TIMEOUT: float = 2.0
+    HTTP_POOL_TIMEOUT: float = 2.0
     # RABBITMQ
     RABBITMQ_URL: str
     RABBITMQ_EXCHANGE_NAME: str
     RABBITMQ_WEBSOCKET_QUEUE_NAME: str
+    RABBITMQ_AUTH_EVENTS_ROUTING_KEY: str = "auth_events"
+    # WEBSOCKET
+    WEBSOCKET_BUFFER_SIZE: int = 100
 
     class Config:
         case_sensitive = True
@@ -1,17 +1,54 @@
-import httpx
-
 from app.core import settings
+from app.core.http import http_client
+from app.core.security import (
+    decode_access_token,
+    get_token,
+    get_trusted_user_id,
+    token_cache,
+)
+
+
+class InvalidTokenError(Exception):
+    pass
+
+
+async def _fetch_user_id(authorization: str) -> str:
+    response = await http_client.get(
+        settings.USER_INFO_URL,
+        headers={"Authorization": authorization},
+    )
+    if response.status_code != 200:
+        raise InvalidTokenError(response.json()["detail"])
+    return response.json()["id"]
 
 
 async def get_current_user(authorization: str) -> str:
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            settings.USER_INFO_URL,
-            headers={"Authorization": authorization},
-        )
-        if response.status_code != 200:
-            raise Exception(
-                status_code=response.status_code,
-                detail=response.json()["detail"],
-            )
-        return response.json()["id"]
+    """
+    Return the id of the user the access token belongs to.
+    The token is verified locally with the shared JWT secret,
+    verified tokens are cached until they expire or are revoked.
+    Tokens without the user id and an active and verified user
+    are verified by accounts.
+    """
+
+    token = get_token(authorization)
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        return user_id
+
+    claims = decode_access_token(token)
+    if claims is None:
+        raise InvalidTokenError("Invalid token")
+    user_id = get_trusted_user_id(claims)
+    if user_id is None:
+        user_id = await _fetch_user_id(authorization)
+    if token_cache.is_revoked(user_id, claims.get("iat", 0)):
+        raise InvalidTokenError("Token revoked")
+    token_cache.set(token, user_id, claims["exp"])
+    return user_id
+
+
+async def get_order_book_snapshot(symbol: str) -> dict:
+    response = await http_client.get(f"{settings.ORDER_BOOK_URL}/{symbol}")
+    response.raise_for_status()
+    return response.json()
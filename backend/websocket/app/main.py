@@ -2,7 +2,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core import settings
+from app.core.http import http_client
 from app.core.rabbitmq import pika_client
+from app.core.security import handle_auth_event
 from app.routers import websocket_router
 
 app = FastAPI(title=settings.APP_TITLE)
@@ -23,8 +25,12 @@ app.include_router(websocket_router)
 @app.on_event("startup")
 async def startup_event():
     print("Starting up...")
+    http_client.start()
     print("Connecting to RabbitMQ...")
     await pika_client.connect()
+    await pika_client.start_consuming(
+        settings.RABBITMQ_AUTH_EVENTS_ROUTING_KEY, handle_auth_event
+    )
     print("Connection to RabbitMQ established.")
 
 
@@ -34,3 +40,4 @@ async def shutdown_event():
     print("Closing connection to RabbitMQ...")
     await pika_client.connection.close()
     print("Connection to RabbitMQ closed.")
+    await http_client.close()
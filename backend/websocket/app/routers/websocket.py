@@ -1,13 +1,16 @@
 import asyncio
-import json
-from aio_pika import Queue
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
-from app.core.utils import get_current_user
+from app.core import settings
+from app.core.hub import Subscriber, SubscriberOverflowError, hub
+from app.core.utils import get_current_user, get_order_book_snapshot
 from app.core.rabbitmq import pika_client
 
 router = APIRouter(prefix="", tags=["websocket"])
 
+# Sent when the client does not read messages as fast as they arrive
+SLOW_CONSUMER_CLOSE_CODE = 4008
+
 
 @router.websocket("/ws")
 async def websocket_endpoint(
@@ -15,55 +18,87 @@ async def websocket_endpoint(
 ):
     await websocket.accept()
 
-    # Create a new queue for this client
-    queue = await pika_client.declare_user_queue()
+    # Messages are fanned out to the client by the shared hub consumers
+    subscriber = Subscriber(settings.WEBSOCKET_BUFFER_SIZE)
     context = {
-        "queue": queue,
         "user_id": None,
         "symbol": None,
     }
 
+    async def send_order_book_snapshot(symbol: str | None):
+        # Deltas with a higher sequence than the snapshot
+        # are applied by the client on top of it
+        if symbol is None:
+            await websocket.send_json({"error": "subscribe first"})
+            return
+        try:
+            snapshot = await get_order_book_snapshot(symbol)
+        except Exception as e:
+            print(f"Failed to get order book snapshot of {symbol}: {e}")
+            await websocket.send_json({"error": "order book unavailable"})
+            return
+        await websocket.send_json(
+            {"type": "snapshot", "target": "order_book", "data": snapshot}
+        )
+
     async def handle_websocket_messages(context: dict):
         while True:
             data: dict = await websocket.receive_json()
             data_type = data.get("type")
             if data_type is None:
-                websocket.send_json({"error": "type is required"})
+                await websocket.send_json({"error": "type is required"})
             elif data_type == "subscribe":
-                await pika_client.change_broadcast_queue(
-                    context["queue"],
-                    symbol=data["target"],
-                    unbind_symbol=context["symbol"],
+                symbol = data.get("target")
+                if symbol not in settings.SYMBOLS:
+                    await websocket.send_json({"error": "unknown symbol"})
+                    continue
+                if context["symbol"] is not None:
+                    await hub.unsubscribe(
+                        pika_client.create_queue_name(context["symbol"]),
+                        subscriber,
+                    )
+                context["symbol"] = symbol
+                await hub.subscribe(
+                    pika_client.create_queue_name(context["symbol"]),
+                    subscriber,
                 )
-                context["symbol"] = data["target"]
+                await send_order_book_snapshot(context["symbol"])
+            elif data_type == "snapshot":
+                await send_order_book_snapshot(context["symbol"])
             elif data_type == "auth":
                 try:
-                    context["user_id"] = await get_current_user(data["token"])
-                    context["queue"] = await pika_client.declare_user_queue(
-                        queue=context["queue"],
-                        symbol=context["symbol"],
-                        user_id=context["user_id"],
-                    )
+                    user_id = await get_current_user(data.get("token"))
+                    if context["user_id"] is not None:
+                        await hub.unsubscribe(context["user_id"], subscriber)
+                    context["user_id"] = user_id
+                    await hub.subscribe(user_id, subscriber)
                 except Exception as e:
-                    await websocket.send_json({"error": str(e)})
+                    print(f"Failed to authenticate websocket client: {e}")
+                    await websocket.send_json(
+                        {"error": "authentication failed"}
+                    )
 
-    async def handle_rabbitmq_messages(context: dict[str, str | Queue | None]):
-        async with context["queue"].iterator() as queue_iter:
-            async for message in queue_iter:
-                async with message.process():
-                    data = json.loads(message.body)
-                    await websocket.send_json(data)
+    async def handle_hub_messages():
+        while True:
+            try:
+                message = await subscriber.get()
+            except SubscriberOverflowError:
+                await websocket.close(
+                    code=SLOW_CONSUMER_CLOSE_CODE, reason="slow consumer"
+                )
+                raise WebSocketDisconnect(code=SLOW_CONSUMER_CLOSE_CODE)
+            await websocket.send_json(message)
 
+    tasks = [
+        asyncio.create_task(handle_websocket_messages(context)),
+        asyncio.create_task(handle_hub_messages()),
+    ]
     try:
-        tasks = [
-            asyncio.create_task(handle_websocket_messages(context)),
-            asyncio.create_task(handle_rabbitmq_messages(context)),
-        ]
         await asyncio.gather(*tasks)
     except (WebSocketDisconnect, asyncio.CancelledError):
         print("Closing websocket connection...")
+    finally:
+        # Any error ends the connection, its subscriptions go with it
         for task in tasks:
             task.cancel()
-        await pika_client.close_queue(
-            context["queue"], context["symbol"], context["user_id"]
-        )
+        await hub.unsubscribe_all(subscriber)
@@ -0,0 +1,134 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+import pytest
+
+from app.core.hub import MessageHub, Subscriber, SubscriberOverflowError
+
+
+def _delta(sequence: int) -> dict:
+    return {
+        "target": "order_book",
+        "data": {"symbol": "BTC-USD", "sequence": sequence},
+    }
+
+
+def _candle(symbol: str, open_time: str, close: str) -> dict:
+    return {
+        "symbol": symbol,
+        "interval": "1m",
+        "openTime": open_time,
+        "close": close,
+    }
+
+
+@pytest.mark.asyncio
+async def test_subscriber_delivers_deltas_in_order():
+    subscriber = Subscriber(10)
+    for sequence in range(3):
+        subscriber.put(_delta(sequence))
+    messages = [await subscriber.get() for _ in range(3)]
+    assert [m["data"]["sequence"] for m in messages] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_subscriber_conflates_balances():
+    subscriber = Subscriber(10)
+    subscriber.put(
+        {
+            "target": "balances",
+            "data": [
+                {"currency": "USD", "amount": "1"},
+                {"currency": "BTC", "amount": "2"},
+            ],
+        }
+    )
+    subscriber.put(
+        {"target": "balances", "data": [{"currency": "USD", "amount": "3"}]}
+    )
+    message = await subscriber.get()
+    assert message["data"] == [
+        {"currency": "USD", "amount": "3"},
+        {"currency": "BTC", "amount": "2"},
+    ]
+    assert not subscriber.buffer
+
+
+@pytest.mark.asyncio
+async def test_subscriber_conflates_candles_per_symbol():
+    subscriber = Subscriber(10)
+    subscriber.put(
+        {
+            "target": "candles",
+            "data": [
+                _candle("BTC-USD", "t0", "1"),
+                _candle("ETH-USD", "t0", "2"),
+            ],
+        }
+    )
+    subscriber.put(
+        {"target": "candles", "data": [_candle("BTC-USD", "t0", "3")]}
+    )
+    message = await subscriber.get()
+    assert message["data"] == [
+        _candle("BTC-USD", "t0", "3"),
+        _candle("ETH-USD", "t0", "2"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_subscriber_conflates_tickers_by_symbol():
+    subscriber = Subscriber(10)
+    subscriber.put({"target": "ticker", "data": {"symbol": "BTC-USD"}})
+    subscriber.put({"target": "ticker", "data": {"symbol": "ETH-USD"}})
+    subscriber.put(
+        {"target": "ticker", "data": {"symbol": "BTC-USD", "last": "2"}}
+    )
+    first = await subscriber.get()
+    second = await subscriber.get()
+    assert first["data"] == {"symbol": "BTC-USD", "last": "2"}
+    assert second["data"] == {"symbol": "ETH-USD"}
+
+
+@pytest.mark.asyncio
+async def test_subscriber_overflow():
+    subscriber = Subscriber(2)
+    for sequence in range(3):
+        subscriber.put(_delta(sequence))
+    assert subscriber.overflowed
+    with pytest.raises(SubscriberOverflowError):
+        await subscriber.get()
+
+
+@pytest.mark.asyncio
+async def test_subscriber_get_waits_for_message():
+    subscriber = Subscriber(10)
+    task = asyncio.create_task(subscriber.get())
+    await asyncio.sleep(0)
+    assert not task.done()
+    subscriber.put(_delta(1))
+    assert await task == _delta(1)
+
+
+@pytest.mark.asyncio
+@patch("app.core.hub.pika_client")
+async def test_hub_fans_out_with_one_consumer(mock_pika_client):
+    mock_pika_client.start_consuming = AsyncMock()
+    mock_pika_client.stop_consuming = AsyncMock()
+    hub = MessageHub()
+    first, second, other = Subscriber(10), Subscriber(10), Subscriber(10)
+    await hub.subscribe("BTC-USD", first)
+    await hub.subscribe("BTC-USD", second)
+    await hub.subscribe("ETH-USD", other)
+    assert mock_pika_client.start_consuming.await_count == 2
+
+    hub.publish("BTC-USD", _delta(1))
+    assert await first.get() == _delta(1)
+    assert await second.get() == _delta(1)
+    assert not other.buffer
+
+    await hub.unsubscribe("BTC-USD", first)
+    mock_pika_client.stop_consuming.assert_not_awaited()
+    await hub.unsubscribe_all(second)
+    await hub.unsubscribe_all(other)
+    assert mock_pika_client.stop_consuming.await_count == 2
+    assert hub.subscribers == {}
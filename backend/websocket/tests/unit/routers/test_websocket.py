@@ -0,0 +1,82 @@
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+import pytest
+
+from app.core.hub import hub
+from app.core.rabbitmq import pika_client
+from app.main import app
+from app.routers.websocket import SLOW_CONSUMER_CLOSE_CODE
+
+
+def _mock_pika_clients(mock_main_pika_client, mock_hub_pika_client) -> None:
+    mock_main_pika_client.connect = AsyncMock()
+    mock_main_pika_client.start_consuming = AsyncMock()
+    mock_main_pika_client.connection.close = AsyncMock()
+    mock_hub_pika_client.start_consuming = AsyncMock()
+    mock_hub_pika_client.stop_consuming = AsyncMock()
+
+
+@patch("app.routers.websocket.settings.WEBSOCKET_BUFFER_SIZE", 2)
+@patch("app.routers.websocket.get_order_book_snapshot")
+@patch("app.core.hub.pika_client")
+@patch("app.main.pika_client")
+def test_slow_consumer_is_closed(
+    mock_main_pika_client, mock_hub_pika_client, mock_get_snapshot
+) -> None:
+    _mock_pika_clients(mock_main_pika_client, mock_hub_pika_client)
+
+    async def get_order_book_snapshot(symbol: str) -> dict:
+        # More deltas arrive than the client buffer holds
+        for sequence in range(3):
+            hub.publish(
+                pika_client.create_queue_name(symbol),
+                {"target": "order_book", "data": {"sequence": sequence}},
+            )
+        return {"symbol": symbol, "sequence": 0, "buy": [], "sell": []}
+
+    mock_get_snapshot.side_effect = get_order_book_snapshot
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws") as websocket:
+            websocket.send_json({"type": "subscribe", "target": "BTC-USD"})
+            with pytest.raises(WebSocketDisconnect) as e:
+                while True:
+                    websocket.receive_json()
+            assert e.value.code == SLOW_CONSUMER_CLOSE_CODE
+    assert hub.subscribers == {}
+
+
+@patch("app.core.hub.pika_client")
+@patch("app.main.pika_client")
+def test_unknown_symbol_is_rejected(
+    mock_main_pika_client, mock_hub_pika_client
+) -> None:
+    _mock_pika_clients(mock_main_pika_client, mock_hub_pika_client)
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws") as websocket:
+            websocket.send_json({"type": "subscribe", "target": "../x"})
+            assert websocket.receive_json() == {"error": "unknown symbol"}
+            websocket.send_json({"type": "subscribe"})
+            assert websocket.receive_json() == {"error": "unknown symbol"}
+            assert hub.subscribers == {}
+    mock_hub_pika_client.start_consuming.assert_not_awaited()
+
+
+@patch("app.routers.websocket.get_order_book_snapshot")
+@patch("app.core.hub.pika_client")
+@patch("app.main.pika_client")
+def test_subscriptions_are_removed_on_error(
+    mock_main_pika_client, mock_hub_pika_client, mock_get_snapshot
+) -> None:
+    _mock_pika_clients(mock_main_pika_client, mock_hub_pika_client)
+    mock_get_snapshot.return_value = {"sequence": 0, "buy": [], "sell": []}
+    with TestClient(app) as client:
+        with pytest.raises(Exception):
+            with client.websocket_connect("/ws") as websocket:
+                websocket.send_json({"type": "subscribe", "target": "BTC-USD"})
+                websocket.receive_json()
+                assert hub.subscribers != {}
+                websocket.send_text("not json")
+                websocket.receive_json()
+    assert hub.subscribers == {}
+    mock_hub_pika_client.stop_consuming.assert_awaited()
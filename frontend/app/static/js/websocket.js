@@ -2,17 +2,72 @@ const ws = new WebSocket('ws://localhost:8080/ws');
 const accessToken = localStorage.getItem('accessToken') || null;
 // const tradingPairsSelect = document.getElementById('trading-pairs');
 
-const fetchLastOrders = async (tradingPair) => {
-    let orders = await fetch(
-        `http://localhost:8000/orders/last/${tradingPair}`,
-        {
-            method: 'GET',
-            headers: {
-                'Content-Type': 'application/json'
-            }
+// Local copy of the order book, kept in sync with sequence numbered deltas.
+// Levels are keyed by numeric price, as "10" and "10.0" are the same level.
+let orderBook = {
+    symbol: null,
+    epoch: null,
+    sequence: null,
+    buy: new Map(),
+    sell: new Map()
+};
+
+const requestOrderBookSnapshot = () => {
+    orderBook.sequence = null;
+    ws.send(JSON.stringify({type: 'snapshot'}));
+};
+
+const applyOrderBookSnapshot = (snapshot) => {
+    orderBook = {
+        symbol: snapshot.symbol,
+        epoch: snapshot.epoch,
+        sequence: snapshot.sequence,
+        buy: new Map(snapshot.buy.map(level => [Number(level.price), level])),
+        sell: new Map(snapshot.sell.map(level => [Number(level.price), level]))
+    };
+    renderOrderBook();
+};
+
+const applyOrderBookDelta = (delta) => {
+    if (delta.symbol !== orderBook.symbol || orderBook.sequence === null) {
+        return;
+    }
+    if (delta.epoch !== orderBook.epoch) {
+        // Order book was rebuilt on the server
+        requestOrderBookSnapshot();
+        return;
+    }
+    if (delta.sequence <= orderBook.sequence) {
+        return;
+    }
+    if (delta.sequence !== orderBook.sequence + 1) {
+        // Some deltas were missed
+        requestOrderBookSnapshot();
+        return;
+    }
+    delta.changes.forEach(change => {
+        if (change.action === 'remove') {
+            orderBook[change.side].delete(Number(change.price));
+        } else {
+            orderBook[change.side].set(Number(change.price), change);
         }
-    ).then(response => response.json());
-    return orders;
+    });
+    orderBook.sequence = delta.sequence;
+    renderOrderBook();
+};
+
+const getBestLevels = (levels, descending, limit = 10) => {
+    return Array.from(levels.keys())
+        .sort((a, b) => descending ? b - a : a - b)
+        .slice(0, limit)
+        .map(price => levels.get(price));
+};
+
+const renderOrderBook = () => {
+    fillLastOrders({
+        buy: getBestLevels(orderBook.buy, true),
+        sell: getBestLevels(orderBook.sell, false)
+    });
 };
 
 const fillLastOrders = (lastOrders) => {
@@ -22,25 +77,25 @@ const fillLastOrders = (lastOrders) => {
     buyOrders.innerHTML = '';
     sellOrders.innerHTML = '';
 
-    lastOrders.buy.forEach(order => {
+    lastOrders.buy.forEach(level => {
         let orderElement = document.createElement('div');
         orderElement.className = 'order';
         let priceElement = document.createElement('span');
-        priceElement.textContent = order.price;
+        priceElement.textContent = level.price;
         let amountElement = document.createElement('span');
-        amountElement.textContent = order.initQty - order.executedQty;
+        amountElement.textContent = level.qty;
         orderElement.appendChild(priceElement);
         orderElement.appendChild(amountElement);
         buyOrders.appendChild(orderElement);
     });
 
-    lastOrders.sell.forEach(order => {
+    lastOrders.sell.forEach(level => {
         let orderElement = document.createElement('div');
         orderElement.className = 'order';
         let priceElement = document.createElement('span');
-        priceElement.textContent = order.price;
+        priceElement.textContent = level.price;
         let amountElement = document.createElement('span');
-        amountElement.textContent = order.initQty - order.executedQty;
+        amountElement.textContent = level.qty;
         orderElement.appendChild(priceElement);
         orderElement.appendChild(amountElement);
         sellOrders.appendChild(orderElement);
@@ -103,8 +158,9 @@ document.getElementById('trading-pairs').addEventListener('change', async (event
             target: event.target.value
         }));
         console.log(event.target.value);
-        let lastOrders = await fetchLastOrders(event.target.value);
-        fillLastOrders(lastOrders);
+        // Snapshot of the new symbol is sent back by the server
+        orderBook.symbol = event.target.value;
+        orderBook.sequence = null;
         let lastTrades = await fetchLastTrades(event.target.value);
         fillLastTrades(lastTrades);
 
@@ -132,9 +188,13 @@ ws.onopen = function() {
 
 ws.onmessage = function(event) {
     let data = JSON.parse(event.data);
-    if (data.type === 'broadcast') {
-        if (data.target === "last_orders") {
-            fillLastOrders(data.data);
+    if (data.type === 'snapshot') {
+        if (data.target === "order_book" && data.data.symbol === orderBook.symbol) {
+            applyOrderBookSnapshot(data.data);
+        }
+    } else if (data.type === 'broadcast') {
+        if (data.target === "order_book_delta") {
+            applyOrderBookDelta(data.data);
         } else if (data.target === "new_trades") {
             console.log(data.data.newTrades);
             fillLastTrades(data.data.newTrades);
@@ -144,11 +204,12 @@ ws.onmessage = function(event) {
             );
         }
     } else if (data.type === 'update') {
-        if (data.target === "balance") {
+        if (data.target === "balances") {
             console.log(data.data);
-            let balance = data.data;
-            let balanceElement = document.getElementById(balance.currency);
-            balanceElement.textContent = `${balance.currency.toUpperCase()}: ${balance.amount}`;
+            data.data.forEach(balance => {
+                let balanceElement = document.getElementById(balance.currency);
+                balanceElement.textContent = `${balance.currency.toUpperCase()}: ${balance.amount}`;
+            });
         }
     }
 };